@@ -0,0 +1,84 @@
+"""Benchmark of AlphaBeta, with and without its transposition table, against the full width minimax it replaced:
+nodes searched and time to each depth.
+
+Run from the repository root: python -m benchmarks.alphabeta_bench
+"""
+import argparse
+import random
+import time
+
+from magent.mancala import MancalaEnv
+from magent.side import Side
+from magent.treesearch.alphabeta.alphabeta import AlphaBeta
+
+parser = argparse.ArgumentParser(description="Nodes searched and time to depth of AlphaBeta and plain minimax")
+parser.add_argument('-d', '--depth', default=5, type=int, help="Deepest search")
+parser.add_argument('-p', '--positions', default=4, type=int, help="Number of positions from random games")
+parser.add_argument('-s', '--seed', default=0, type=int, help="Seed of the random games")
+
+
+class Minimax(object):
+    """The previous AlphaBeta: no cutoffs, no ordering, and every move counts as a ply."""
+
+    def __init__(self, depth: int):
+        self.depth = depth
+        self.nodes = 0
+
+    def search(self, game: MancalaEnv):
+        state = MancalaEnv.clone(game)
+        values = []
+        for action in state.get_legal_moves():
+            record = state.apply_move(action)
+            values.append((action, self._search(state, self.depth)))
+            state.undo_move(record)
+        if game.side_to_move == Side.SOUTH:
+            return max(values, key=lambda x: x[1])[0]
+        return min(values, key=lambda x: x[1])[0]
+
+    def _search(self, game: MancalaEnv, depth: int):
+        self.nodes += 1
+        if depth == 0 or game.is_game_over():
+            return game.get_player_utility()
+        values = []
+        for move in game.get_legal_moves():
+            record = game.apply_move(move)
+            values.append(self._search(game, depth - 1))
+            game.undo_move(record)
+        return max(values) if game.side_to_move == Side.SOUTH else min(values)
+
+
+def random_positions(count: int, rng: random.Random) -> [MancalaEnv]:
+    positions = [MancalaEnv()]
+    while len(positions) < count:
+        state = MancalaEnv()
+        for _ in range(rng.randint(4, 20)):
+            state.perform_move(rng.choice(state.get_legal_moves()))
+            if state.is_game_over():
+                break
+        if not state.is_game_over():
+            positions.append(state)
+    return positions
+
+
+def main():
+    args = parser.parse_args()
+    positions = random_positions(args.positions, random.Random(args.seed))
+    print('%5s %12s %10s %12s %10s %12s %10s %8s' % ('depth', 'minimax', 'time', 'alphabeta', 'time', 'with TT', 'time',
+                                                   'TT hits'))
+    for depth in range(1, args.depth + 1):
+        row = []
+        searches = [Minimax(depth), AlphaBeta(depth, tt_memory_mb=0), AlphaBeta(depth)]
+        for search in searches:
+            nodes = 0
+            start = time.perf_counter()
+            for state in positions:
+                search.search(state)
+                nodes += search.nodes
+                search.nodes = 0
+            row += [nodes, time.perf_counter() - start]
+        row.append(100 * searches[-1].table.hit_rate())
+        print('%5d %12d %9.2fs %12d %9.2fs %12d %9.2fs %7.0f%%' % (depth, *row))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,51 @@
+"""Throughput of BatchMancalaEnv against stepping MancalaEnv games one at a time, in random games per second.
+
+Run from the repository root: python -m benchmarks.batch_bench
+"""
+import argparse
+import random
+import time
+
+import numpy as np
+
+from magent.batch_mancala import BatchMancalaEnv
+from magent.mancala import MancalaEnv
+
+parser = argparse.ArgumentParser(description="Random games per second, batched and sequential")
+parser.add_argument('-n', '--games', default=[100, 1000, 10000], type=int, nargs='+', help="Batch sizes")
+parser.add_argument('-s', '--sequential-games', default=500, type=int)
+
+
+def play_batch(games: int, rng: np.random.RandomState):
+    batch = BatchMancalaEnv(games)
+    while not batch.done.all():
+        mask = batch.get_legal_moves_mask()
+        # Pick a uniformly random legal action in every game
+        batch.step(np.argmax(rng.random_sample(mask.shape) * mask, axis=1))
+
+
+def play_sequential(games: int, rng: random.Random):
+    for _ in range(games):
+        env = MancalaEnv()
+        while not env.is_game_over():
+            env.perform_move(rng.choice(env.get_legal_moves()))
+
+
+def main():
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    play_sequential(args.sequential_games, random.Random(0))
+    elapsed = time.perf_counter() - start
+    print('MancalaEnv            %6d games: %10.0f games/sec' % (args.sequential_games,
+                                                              args.sequential_games / elapsed))
+
+    for games in args.games:
+        start = time.perf_counter()
+        play_batch(games, np.random.RandomState(0))
+        elapsed = time.perf_counter() - start
+        print('BatchMancalaEnv       %6d games: %10.0f games/sec' % (games, games / elapsed))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+"""What batched playouts buy MCTS: playouts per second from the start position of MonteCarloDefaultPolicy and of
+BatchMonteCarloDefaultPolicy with K games per leaf, and matches of MCTS with the batched policy against MCTS with
+MonteCarloDefaultPolicy at the same time per move, played from random openings, each of them once from each side.
+
+Run from the repository root: python -m benchmarks.batch_playout_bench
+"""
+import argparse
+import random
+import time
+
+import numpy as np
+
+from benchmarks.quiescence_bench import random_openings, play
+from magent.mancala import MancalaEnv
+from magent.treesearch.mcts.batch_playout import RANDOM, SOFTMAX
+from magent.treesearch.mcts.graph.node import Node
+from magent.treesearch.mcts.mcts import MCTS
+from magent.treesearch.mcts.policies.default_policy import DefaultPolicy, MonteCarloDefaultPolicy, \
+    BatchMonteCarloDefaultPolicy
+from magent.treesearch.mcts.policies.rollout_policy import MonteCarloRollOutPolicy
+from magent.treesearch.mcts.policies.tree_policy import MonteCarloTreePolicy
+
+parser = argparse.ArgumentParser(description="Playouts per second and strength of batched Monte Carlo playouts")
+parser.add_argument('-k', '--playouts', default=[8, 32, 128], type=int, nargs='+', help="Games per batch")
+parser.add_argument('-t', '--time', default=3, type=float, help="Seconds of playouts of each policy")
+parser.add_argument('-m', '--move-time', default=1, type=float, help="Seconds per move of the MCTS matches")
+parser.add_argument('-o', '--openings', default=2, type=int, help="Openings of each match, 0 to skip the matches")
+parser.add_argument('--plies', default=2, type=int, help="Random moves in each opening")
+parser.add_argument('-s', '--seed', default=0, type=int, help="Seed of the openings and of the playouts")
+
+
+def playouts_per_second(policy: DefaultPolicy, playouts: int, seconds: float) -> float:
+    root = Node(state=MancalaEnv())
+    played = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        policy.simulate(root)
+        played += playouts
+    return played / (time.perf_counter() - start)
+
+
+def mcts(playouts: int, move_time: float) -> MCTS:
+    policy = BatchMonteCarloDefaultPolicy(playouts) if playouts > 1 else MonteCarloDefaultPolicy()
+    return MCTS(MonteCarloTreePolicy(), policy, MonteCarloRollOutPolicy(), time_sec=move_time)
+
+
+def match(playouts: int, move_time: float, openings: [list]) -> float:
+    """Returns the score of MCTS with playouts batched games per leaf against MCTS with MonteCarloDefaultPolicy."""
+    score = 0.0
+    for opening in openings:
+        # New searches for every game, so that no tree is kept from the game before
+        score += play(mcts(playouts, move_time), mcts(1, move_time), opening)
+        score += 1.0 - play(mcts(1, move_time), mcts(playouts, move_time), opening)
+    return score / (2 * len(openings))
+
+
+def main():
+    args = parser.parse_args()
+    np.random.seed(args.seed)
+
+    print('%-8s %6s %14s' % ('policy', 'K', 'playouts/sec'))
+    print('%-8s %6d %14.1f' % ('single', 1, playouts_per_second(MonteCarloDefaultPolicy(), 1, args.time)))
+    for playouts in args.playouts:
+        for policy in (SOFTMAX, RANDOM):
+            batched = BatchMonteCarloDefaultPolicy(playouts, policy, rng=np.random.RandomState(args.seed))
+            print('%-8s %6d %14.1f' % (policy, playouts, playouts_per_second(batched, playouts, args.time)))
+
+    if args.openings > 0:
+        openings = random_openings(args.openings, args.plies, random.Random(args.seed))
+        print('MCTS with K batched softmax playouts per leaf against MCTS with one, %.1fs per move' % args.move_time)
+        for playouts in args.playouts:
+            print('%6d %6.0f%%' % (playouts, 100 * match(playouts, args.move_time, openings)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+"""Micro-benchmark for Board cloning and sowing throughput.
+
+Run from the repository root: python -m benchmarks.board_bench
+"""
+import argparse
+import random
+import timeit
+
+from magent.board import Board
+from magent.mancala import MancalaEnv
+
+parser = argparse.ArgumentParser(description="Board clone and sowing micro-benchmark")
+parser.add_argument('-g', '--games', default=200, type=int, help="Number of recorded random games to replay")
+parser.add_argument('-r', '--repeat', default=5, type=int, help="Number of timing runs (best one is reported)")
+parser.add_argument('-s', '--seed', default=0, type=int)
+
+
+def record_games(games: int, seed: int) -> list:
+    """Plays random games and records the (move, north_moved) pairs needed to replay them with make_move."""
+    rng = random.Random(seed)
+    recorded = []
+    for _ in range(games):
+        env = MancalaEnv()
+        moves = []
+        while not env.is_game_over():
+            move = rng.choice(env.get_legal_moves())
+            moves.append((move, env.north_moved))
+            env.perform_move(move)
+        recorded.append(moves)
+    return recorded
+
+
+def replay(recorded: list, make_move=MancalaEnv.make_move):
+    for moves in recorded:
+        board = Board(7, 7)
+        for move, north_moved in moves:
+            make_move(board, move, north_moved)
+
+
+def main():
+    args = parser.parse_args()
+
+    board = Board(7, 7)
+    clone_runs = 100000
+    clone_time = min(timeit.repeat(lambda: Board.clone(board), number=clone_runs, repeat=args.repeat))
+    print('Board.clone: %10.0f clones/sec' % (clone_runs / clone_time))
+
+    env = MancalaEnv()
+    env_time = min(timeit.repeat(lambda: MancalaEnv.clone(env), number=clone_runs, repeat=args.repeat))
+    print('MancalaEnv.clone: %10.0f clones/sec' % (clone_runs / env_time))
+
+    recorded = record_games(args.games, args.seed)
+    total_moves = sum(len(moves) for moves in recorded)
+    sow_time = min(timeit.repeat(lambda: replay(recorded), number=1, repeat=args.repeat))
+    print('MancalaEnv.make_move: %10.0f moves/sec (%d moves)' % (total_moves / sow_time, total_moves))
+
+    reference_time = min(timeit.repeat(lambda: replay(recorded, MancalaEnv.make_move_reference), number=1,
+                                       repeat=args.repeat))
+    print('MancalaEnv.make_move_reference: %10.0f moves/sec' % (total_moves / reference_time))
+
+
+if __name__ == '__main__':
+    main()
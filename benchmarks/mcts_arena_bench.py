@@ -0,0 +1,62 @@
+"""Benchmark of ArenaMCTS against MCTS with the Monte Carlo policies: simulations per second and memory per node
+after searching the start position for the same time.
+
+The memory of MCTS is what a second, traced search keeps allocated (with tracemalloc, which slows it down too much to
+time it) per node of its tree, and that of ArenaMCTS is the size of the arrays of its NodeArena per node.
+
+Run from the repository root: python -m benchmarks.mcts_arena_bench
+"""
+import argparse
+import gc
+import tracemalloc
+
+from magent.mancala import MancalaEnv
+from magent.treesearch.mcts.arena_mcts import ArenaMCTS
+from magent.treesearch.mcts.mcts import MCTS
+from magent.treesearch.mcts.policies.default_policy import MonteCarloDefaultPolicy
+from magent.treesearch.mcts.policies.rollout_policy import MonteCarloRollOutPolicy
+from magent.treesearch.mcts.policies.tree_policy import MonteCarloTreePolicy
+
+parser = argparse.ArgumentParser(description="Simulations per second and memory per node of MCTS and ArenaMCTS")
+parser.add_argument('-t', '--time', default=10, type=float, help="Seconds of each search")
+
+
+def _count_nodes(root) -> int:
+    seen = {id(root)}
+    frontier = [root]
+    while frontier:
+        node = frontier.pop()
+        for child in node.children:
+            if id(child) not in seen:
+                seen.add(id(child))
+                frontier.append(child)
+    return len(seen)
+
+
+def main():
+    args = parser.parse_args()
+    print('%-10s %12s %10s %10s %12s' % ('search', 'simulations', 'per sec', 'nodes', 'bytes/node'))
+
+    mcts = MCTS(MonteCarloTreePolicy(), MonteCarloDefaultPolicy(), MonteCarloRollOutPolicy(), time_sec=args.time)
+    mcts.search(MancalaEnv())
+    simulations, nodes = mcts.root.visits, _count_nodes(mcts.root)
+
+    traced = MCTS(MonteCarloTreePolicy(), MonteCarloDefaultPolicy(), MonteCarloRollOutPolicy(), time_sec=args.time)
+    gc.collect()
+    tracemalloc.start()
+    traced.search(MancalaEnv())
+    gc.collect()
+    allocated, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print('%-10s %12d %10.1f %10d %12d' % ('MCTS', simulations, simulations / args.time, nodes,
+                                           allocated // _count_nodes(traced.root)))
+
+    arena_mcts = ArenaMCTS(MonteCarloDefaultPolicy(), time_sec=args.time)
+    arena_mcts.search(MancalaEnv())
+    arena = arena_mcts.arena
+    print('%-10s %12d %10.1f %10d %12d' % ('ArenaMCTS', arena_mcts.simulations, arena_mcts.simulations / args.time,
+                                           arena.size, arena.node_bytes))
+
+
+if __name__ == '__main__':
+    main()
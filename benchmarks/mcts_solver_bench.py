@@ -0,0 +1,62 @@
+"""How much of the endgame search time the proven outcomes of MCTS save: MCTS searches endgame positions with a time
+limit, and stops early once it has proven the outcome. Reports the mean time of the searches, how many were proven
+and how the proven outcomes came out. The positions are taken from random games once few enough seeds are left in
+the holes. Without the proofs every search takes the whole limit.
+
+Run from the repository root: python -m benchmarks.mcts_solver_bench
+"""
+import argparse
+import random
+import time
+
+from magent.mancala import MancalaEnv
+from magent.side import Side
+from magent.treesearch.mcts.mcts import MCTS
+from magent.treesearch.mcts.policies.default_policy import MonteCarloDefaultPolicy
+from magent.treesearch.mcts.policies.rollout_policy import MonteCarloRollOutPolicy
+from magent.treesearch.mcts.policies.tree_policy import MonteCarloTreePolicy
+
+parser = argparse.ArgumentParser(description="Endgame search time of MCTS with proven outcomes")
+parser.add_argument('-t', '--time', default=10, type=float, help="Time limit of each search")
+parser.add_argument('--seeds', default=[10, 15, 20], type=int, nargs='+', help="Most seeds left in the holes")
+parser.add_argument('-p', '--positions', default=5, type=int, help="Positions for each number of seeds")
+parser.add_argument('-s', '--seed', default=0, type=int, help="Seed of the random games")
+
+
+def endgame(rng: random.Random, seeds: int) -> MancalaEnv or None:
+    """Plays a random game until at most seeds seeds are left in the holes; None if it ends before."""
+    state = MancalaEnv()
+    while not state.is_game_over():
+        if state.board.get_seeds_in_store(Side.NORTH) + state.board.get_seeds_in_store(Side.SOUTH) >= 98 - seeds:
+            return state
+        state.perform_move(rng.choice(state.get_legal_moves()))
+    return None
+
+
+def main():
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+    print('%5s %10s %8s %10s %6s %6s %6s' % ('seeds', 'positions', 'proven', 'mean time', 'wins', 'draws',
+                                             'losses'))
+    for seeds in args.seeds:
+        outcomes = {1: 0, 0.5: 0, 0: 0}
+        seconds, positions = 0.0, 0
+        while positions < args.positions:
+            state = endgame(rng, seeds)
+            if state is None or len(state.get_legal_moves()) == 1:
+                continue
+            positions += 1
+            mcts = MCTS(MonteCarloTreePolicy(), MonteCarloDefaultPolicy(), MonteCarloRollOutPolicy(),
+                        time_sec=args.time)
+            start = time.perf_counter()
+            mcts.search(state)
+            seconds += time.perf_counter() - start
+            chosen = mcts.root.proven_child()
+            if chosen is not None:
+                outcomes[chosen.proven] += 1
+        print('%5d %10d %8d %9.2fs %6d %6d %6d' % (seeds, positions, sum(outcomes.values()), seconds / positions,
+                                                   outcomes[1], outcomes[0.5], outcomes[0]))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,45 @@
+"""Benchmark of legal move generation as Move lists, int actions and bitmasks.
+
+Run from the repository root: python -m benchmarks.movegen_bench
+"""
+import argparse
+import random
+import time
+
+from magent.mancala import MancalaEnv
+
+parser = argparse.ArgumentParser(description="Legal move generations per second on positions from random games")
+parser.add_argument('-p', '--positions', default=10000, type=int, help="Number of positions to generate moves for")
+parser.add_argument('-r', '--repeats', default=10, type=int, help="Runs per method; the best one is reported")
+parser.add_argument('-s', '--seed', default=0, type=int, help="Seed of the random games")
+
+
+def random_positions(count: int, rng: random.Random) -> [MancalaEnv]:
+    positions = []
+    state = MancalaEnv()
+    while len(positions) < count:
+        if state.is_game_over():
+            state = MancalaEnv()
+        positions.append(MancalaEnv.clone(state))
+        state.perform_move(rng.choice(state.get_legal_moves()))
+    return positions
+
+
+def main():
+    args = parser.parse_args()
+    positions = random_positions(args.positions, random.Random(args.seed))
+    methods = [('Move list', MancalaEnv.get_legal_moves),
+               ('int actions', MancalaEnv.get_legal_actions),
+               ('bitmask', MancalaEnv.get_legal_moves_bitmask)]
+    for name, generate in methods:
+        best = float('inf')
+        for _ in range(args.repeats):
+            start = time.perf_counter()
+            for state in positions:
+                generate(state)
+            best = min(best, time.perf_counter() - start)
+        print('%-12s %10.0f generations/sec' % (name, len(positions) / best))
+
+
+if __name__ == '__main__':
+    main()
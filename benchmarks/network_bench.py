@@ -0,0 +1,98 @@
+"""Microseconds per position of the forward pass of the network: NumpyACNetwork on single positions and on batches,
+against the ACNetwork of a TensorFlow session when TensorFlow is installed.
+
+NumpyACNetwork loads the weights exported by models.a3c.export, or random weights of the same shapes if they have
+not been exported; the TensorFlow network is restored from the checkpoint A3Client loads. Neither changes the speed.
+
+Run from the repository root: python -m benchmarks.network_bench
+"""
+import argparse
+import os
+import time
+
+import numpy as np
+
+from magent.mancala import MancalaEnv
+from magent.side import Side
+from models.a3c.numpy_model import NumpyACNetwork, DEFAULT_PATH
+
+parser = argparse.ArgumentParser(description="Microseconds per position of the network")
+parser.add_argument('-b', '--batch-sizes', default=[1, 16, 64], type=int, nargs='+', help="Batch sizes")
+parser.add_argument('-t', '--time', default=2, type=float, help="Seconds of each measurement")
+parser.add_argument('-s', '--seed', default=0, type=int, help="Seed of the positions and of the random weights")
+
+
+def random_weights(rng: np.random.RandomState) -> dict:
+    shapes = [('dense', 16, 20), ('dense_1', 20, 20), ('dense_2', 20, 10), ('dense_3', 10, 7), ('dense_4', 10, 1)]
+    weights = {}
+    for layer, inputs, units in shapes:
+        weights[layer + '/kernel'] = rng.normal(scale=0.5, size=(inputs, units)).astype(np.float32)
+        weights[layer + '/bias'] = np.zeros(units, dtype=np.float32)
+    return weights
+
+
+def random_positions(count: int, rng: np.random.RandomState) -> (np.ndarray, np.ndarray):
+    """Board images and masks of positions of random games, from the side to move."""
+    images, masks = [], []
+    state = MancalaEnv()
+    while len(images) < count:
+        moves = state.get_legal_moves()
+        if len(moves) == 0:
+            state = MancalaEnv()
+            continue
+        state.perform_move(moves[rng.randint(len(moves))])
+        if not state.is_game_over():
+            images.append(state.board.get_board_image(flipped=state.side_to_move == Side.NORTH))
+            masks.append(state.get_action_mask_with_no_pie())
+    return np.array(images), np.array(masks)
+
+
+def measure(evaluate, images: np.ndarray, masks: np.ndarray, batch_size: int, seconds: float) -> float:
+    """Microseconds per position of evaluate on batches of batch_size positions."""
+    positions = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        for first in range(0, len(images) - batch_size + 1, batch_size):
+            evaluate(images[first:first + batch_size], masks[first:first + batch_size])
+            positions += batch_size
+    return 1e6 * (time.perf_counter() - start) / positions
+
+
+def report(name: str, network, images: np.ndarray, masks: np.ndarray, args):
+    single = measure(lambda states, masks: network.evaluate_move(masks[0], states[0]), images, masks, 1, args.time)
+    print('%-24s %10.1f' % (name + ' evaluate_move', single))
+    for batch_size in args.batch_sizes:
+        batched = measure(lambda states, masks: network.evaluate_moves(masks, states), images, masks, batch_size,
+                          args.time)
+        print('%-24s %10.1f' % ('%s batch %d' % (name, batch_size), batched))
+
+
+def main():
+    args = parser.parse_args()
+    rng = np.random.RandomState(args.seed)
+    images, masks = random_positions(max(args.batch_sizes) * 16, rng)
+    print('%-24s %10s' % ('network', 'us/position'))
+
+    if os.path.exists(DEFAULT_PATH):
+        network = NumpyACNetwork.load(DEFAULT_PATH)
+    else:
+        network = NumpyACNetwork(random_weights(rng))
+    report('numpy', network, images, masks, args)
+
+    try:
+        import tensorflow as tf
+        from models.client import A3Client
+    except ImportError as e:
+        print('tensorflow: not measured (%s)' % e)
+        return
+    with tf.Session() as sess:
+        with tf.variable_scope("global"):
+            client = A3Client(sess)
+        uninitialized = set(sess.run(tf.report_uninitialized_variables()))
+        sess.run(tf.variables_initializer([variable for variable in tf.global_variables()
+                                           if variable.op.name.encode() in uninitialized]))
+        report('tensorflow', client.network, images, masks, args)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,55 @@
+"""Scaling of ParallelAlphaBeta with the number of worker processes on the position suite of search_compare: time to
+search every position to a depth, speedup over AlphaBeta, and how often both choose the same move.
+
+There is no point in more workers than cores; the default goes up to the number of cores.
+
+Run from the repository root: python -m benchmarks.parallel_bench
+"""
+import argparse
+import os
+import random
+import time
+
+from benchmarks.search_compare import position_suite
+from magent.treesearch.alphabeta.alphabeta import AlphaBeta
+from magent.treesearch.alphabeta.parallel import ParallelAlphaBeta
+
+parser = argparse.ArgumentParser(description="Speedup of ParallelAlphaBeta from 1 to N worker processes")
+parser.add_argument('-d', '--depth', default=6, type=int, help="Depth of the searches")
+parser.add_argument('-w', '--workers', default=os.cpu_count() or 1, type=int, help="Most worker processes")
+parser.add_argument('-p', '--positions', default=12, type=int, help="Number of positions in the suite")
+parser.add_argument('-s', '--seed', default=0, type=int, help="Seed of the random games the suite is taken from")
+
+
+def run(search: AlphaBeta, positions: list) -> (float, int, list):
+    """Returns the time to search all the positions, the nodes searched and the moves chosen."""
+    nodes, moves = 0, []
+    start = time.perf_counter()
+    for state in positions:
+        moves.append(search.search(state))
+        nodes += search.nodes
+    return time.perf_counter() - start, nodes, moves
+
+
+def main():
+    args = parser.parse_args()
+    positions = position_suite(args.positions, random.Random(args.seed))
+    # No tables, so that every search starts from scratch and the moves can be compared
+    serial_time, serial_nodes, serial_moves = run(AlphaBeta(args.depth, tt_memory_mb=0), positions)
+    print('%8s %10s %9s %8s %10s' % ('workers', 'nodes', 'time', 'speedup', 'same move'))
+    print('%8s %10d %8.2fs %7.2fx %10s' % ('serial', serial_nodes, serial_time, 1.0, '-'))
+    for workers in range(1, args.workers + 1):
+        search = ParallelAlphaBeta(args.depth, tt_memory_mb=0, workers=workers)
+        try:
+            # Starts the worker processes, which is left out of the time
+            search.search(positions[0])
+            elapsed, nodes, moves = run(search, positions)
+        finally:
+            search.close()
+        same_move = sum(move == serial_move for move, serial_move in zip(moves, serial_moves))
+        print('%8d %10d %8.2fs %7.2fx %8d/%d' % (workers, nodes, elapsed, serial_time / elapsed, same_move,
+                                                 len(positions)))
+
+
+if __name__ == '__main__':
+    main()
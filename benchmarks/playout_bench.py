@@ -0,0 +1,70 @@
+"""Rollouts per second from the start position of the playouts of MonteCarloDefaultPolicy: the loop it used to run
+(clone the node, score each move with evaluation.get_score, sample from a numpy softmax) against PlayoutEngine.
+
+Run from the repository root: python -m benchmarks.playout_bench
+"""
+import argparse
+import random
+import time
+
+import numpy as np
+
+from magent.mancala import MancalaEnv
+from magent.move import Move
+from magent.treesearch import evaluation
+from magent.treesearch.mcts.graph.node import Node
+from magent.treesearch.mcts.playout import PlayoutEngine
+
+parser = argparse.ArgumentParser(description="Rollouts per second of the Monte Carlo playouts")
+parser.add_argument('-t', '--time', default=5, type=float, help="Seconds of rollouts of each engine")
+parser.add_argument('-s', '--seed', default=0, type=int, help="Seed of the random generators")
+
+
+def reference_playout(root: Node) -> MancalaEnv:
+    """The playout of MonteCarloDefaultPolicy before PlayoutEngine."""
+    node = Node.clone(root)
+    while not node.is_terminal():
+        final_reward = node.state.probe_tablebase()
+        if final_reward is not None:
+            node.state.finish_game(final_reward)
+            break
+
+        side_to_move = node.state.side_to_move
+        moves = [-1e80 for _ in range(node.state.board.holes + 1)]
+        for move in node.state.get_legal_moves():
+            record = node.state.apply_move(move)
+            moves[move.index] = evaluation.get_score(state=node.state, parent_side=side_to_move)
+            node.state.undo_move(record)
+
+        moves_dist = np.asarray(moves, dtype=np.float64).flatten()
+        exp = np.exp(moves_dist - np.max(moves_dist))
+        dist = exp / np.sum(exp)
+
+        move_to_make = int(np.random.choice(range(len(moves)), p=dist))
+        node.state.perform_move(Move.of(node.state.side_to_move, move_to_make))
+    return node.state
+
+
+def rollouts_per_second(playout, seconds: float) -> float:
+    root = Node(state=MancalaEnv())
+    rollouts = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        playout(root)
+        rollouts += 1
+    return rollouts / (time.perf_counter() - start)
+
+
+def main():
+    args = parser.parse_args()
+    np.random.seed(args.seed)
+    engine = PlayoutEngine(rng=random.Random(args.seed))
+
+    reference = rollouts_per_second(reference_playout, args.time)
+    print('%-16s %10.1f rollouts/s' % ('reference', reference))
+    fast = rollouts_per_second(lambda root: engine.play(MancalaEnv.clone(root.state)), args.time)
+    print('%-16s %10.1f rollouts/s (%.1fx)' % ('PlayoutEngine', fast, fast / reference))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,103 @@
+"""How much depth the quiescence search of AlphaBeta saves: matches of AlphaBeta at depth d with quiescence against
+AlphaBeta without it at depth d, d + 1, ..., and the nodes each of them searches per move.
+
+The depth saved at d is the largest extra depth the plain search needs before it scores at least as well as the
+quiescence search does. Every match is played from the same random openings, each of them once from each side.
+
+Run from the repository root: python -m benchmarks.quiescence_bench
+"""
+import argparse
+import random
+import time
+
+from magent.mancala import MancalaEnv
+from magent.side import Side
+from magent.treesearch.alphabeta.alphabeta import AlphaBeta
+
+parser = argparse.ArgumentParser(description="Match AlphaBeta with quiescence against deeper AlphaBeta without it")
+parser.add_argument('-d', '--depth', default=4, type=int, help="Deepest quiescence search")
+parser.add_argument('-e', '--extra', default=2, type=int, help="Most extra depth given to the plain search")
+parser.add_argument('-o', '--openings', default=8, type=int, help="Number of random openings")
+parser.add_argument('--plies', default=2, type=int, help="Random moves in each opening")
+parser.add_argument('-s', '--seed', default=0, type=int, help="Seed of the openings")
+
+
+def random_openings(count: int, plies: int, rng: random.Random) -> [list]:
+    openings = []
+    while len(openings) < count:
+        state, moves = MancalaEnv(), []
+        for _ in range(plies):
+            move = rng.choice(state.get_legal_moves())
+            state.perform_move(move)
+            moves.append(move)
+        if not state.is_game_over() and moves not in openings:
+            openings.append(moves)
+    return openings
+
+
+class TimedEngine(object):
+    """An AlphaBeta that keeps count of its moves, the nodes it searched and the time it took."""
+
+    def __init__(self, engine: AlphaBeta):
+        self.engine = engine
+        self.moves = 0
+        self.nodes = 0
+        self.seconds = 0.0
+
+    def search(self, state: MancalaEnv):
+        start = time.perf_counter()
+        move = self.engine.search(state)
+        self.seconds += time.perf_counter() - start
+        self.nodes += self.engine.nodes
+        self.moves += 1
+        return move
+
+
+def play(south: TimedEngine, north: TimedEngine, opening: list) -> float:
+    """Plays a game from the opening and returns the score of the engine that starts as SOUTH: 1, 0.5 or 0."""
+    players = {Side.SOUTH: south, Side.NORTH: north}
+    state = MancalaEnv()
+    moves = list(opening)
+    while not state.is_game_over():
+        move = moves.pop(0) if moves else players[state.side_to_move].search(state)
+        if move.index == 0:
+            # The pie rule swaps the sides of the players
+            players[Side.SOUTH], players[Side.NORTH] = players[Side.NORTH], players[Side.SOUTH]
+        state.perform_move(move)
+    winner = state.get_winner()
+    if winner is None:
+        return 0.5
+    return 1.0 if players[winner] is south else 0.0
+
+
+def match(depth: int, plain_depth: int, openings: [list]) -> (float, TimedEngine, TimedEngine):
+    """Returns the score of AlphaBeta at depth with quiescence against plain_depth without it, and both engines."""
+    quiescent, plain = TimedEngine(AlphaBeta(depth, quiescence=True)), TimedEngine(AlphaBeta(plain_depth))
+    score = 0.0
+    for opening in openings:
+        score += play(quiescent, plain, opening)
+        score += 1.0 - play(plain, quiescent, opening)
+    return score / (2 * len(openings)), quiescent, plain
+
+
+def main():
+    args = parser.parse_args()
+    openings = random_openings(args.openings, args.plies, random.Random(args.seed))
+    print('%5s %6s %7s %12s %12s %10s %10s' % ('depth', 'plain', 'score', 'nodes/move', 'plain nodes', 'time',
+                                               'plain time'))
+    for depth in range(1, args.depth + 1):
+        saved = 0
+        for extra in range(args.extra + 1):
+            score, quiescent, plain = match(depth, depth + extra, openings)
+            print('%5d %6d %6.0f%% %12d %12d %9.3fs %9.3fs' % (depth, depth + extra, 100 * score,
+                                                              quiescent.nodes // quiescent.moves,
+                                                              plain.nodes // plain.moves,
+                                                              quiescent.seconds / quiescent.moves,
+                                                              plain.seconds / plain.moves))
+            if score >= 0.5:
+                saved = extra
+        print('depth %d with quiescence plays at least as well as depth %d without it' % (depth, depth + saved))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+"""Scaling of RootParallelMCTS with the number of worker processes: simulations per second from the start position,
+added up over the workers, against MCTS in this process.
+
+Every search starts new workers, so that none goes on from the tree of the search before; the workers are started
+before the clock of the search, so their start-up does not count against it. There is no point in more workers than
+cores; the default goes up to the number of cores.
+
+Run from the repository root: python -m benchmarks.root_parallel_bench
+"""
+import argparse
+import os
+
+from magent.mancala import MancalaEnv
+from magent.treesearch.mcts.mcts import MCTS
+from magent.treesearch.mcts.policies.default_policy import MonteCarloDefaultPolicy
+from magent.treesearch.mcts.policies.rollout_policy import MonteCarloRollOutPolicy
+from magent.treesearch.mcts.policies.tree_policy import MonteCarloTreePolicy
+from magent.treesearch.mcts.root_parallel import RootParallelMCTS
+
+parser = argparse.ArgumentParser(description="Simulations per second of RootParallelMCTS from 1 to N workers")
+parser.add_argument('-w', '--workers', default=os.cpu_count() or 1, type=int, help="Most worker processes")
+parser.add_argument('-t', '--time', default=5, type=float, help="Seconds of each search")
+parser.add_argument('-r', '--repeats', default=3, type=int, help="Searches for each number of workers")
+parser.add_argument('-s', '--seed', default=0, type=int, help="Seed of the workers")
+
+
+def main():
+    args = parser.parse_args()
+    print('%-8s %8s %12s %12s %8s' % ('workers', 'searches', 'simulations', 'per sec', 'speedup'))
+
+    simulations = 0
+    for _ in range(args.repeats):
+        mcts = MCTS(MonteCarloTreePolicy(), MonteCarloDefaultPolicy(), MonteCarloRollOutPolicy(), time_sec=args.time)
+        mcts.search(MancalaEnv())
+        simulations += mcts.root.visits
+    base = simulations / (args.repeats * args.time)
+    print('%-8s %8d %12d %12.1f %7.2fx' % ('MCTS', args.repeats, simulations, base, 1.0))
+
+    for workers in range(1, args.workers + 1):
+        search = RootParallelMCTS(time_sec=args.time, workers=workers, seed=args.seed)
+        simulations = 0
+        try:
+            for _ in range(args.repeats):
+                search.close()
+                search.search(MancalaEnv())
+                simulations += search.root.visits
+        finally:
+            search.close()
+        per_second = simulations / (args.repeats * args.time)
+        print('%-8d %8d %12d %12.1f %7.2fx' % (workers, args.repeats, simulations, per_second, per_second / base))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+"""Comparison of AlphaBeta, PrincipalVariationSearch and MTDF on a fixed suite of positions.
+
+For every depth it reports the nodes searched to reach the depth (shallower iterations included), nodes per second
+and how often each engine chooses the same move as AlphaBeta, and finds the same value.
+
+Run from the repository root: python -m benchmarks.search_compare
+"""
+import argparse
+import random
+import time
+
+from magent.mancala import MancalaEnv
+from magent.treesearch.alphabeta.alphabeta import AlphaBeta
+from magent.treesearch.alphabeta.pvs import PrincipalVariationSearch, MTDF
+
+parser = argparse.ArgumentParser(description="Compare the alpha-beta engines on a fixed suite of positions")
+parser.add_argument('-d', '--depth', default=6, type=int, help="Deepest search")
+parser.add_argument('-p', '--positions', default=12, type=int, help="Number of positions in the suite")
+parser.add_argument('-s', '--seed', default=0, type=int, help="Seed of the random games the suite is taken from")
+
+ENGINES = [('alphabeta', AlphaBeta), ('pvs', PrincipalVariationSearch), ('mtdf', MTDF)]
+
+
+def position_suite(count: int, rng: random.Random) -> [MancalaEnv]:
+    """The start position and positions after 2 to 40 random moves, all of them not over."""
+    positions = [MancalaEnv()]
+    while len(positions) < count:
+        state = MancalaEnv()
+        for _ in range(rng.randint(2, 40)):
+            state.perform_move(rng.choice(state.get_legal_moves()))
+            if state.is_game_over():
+                break
+        if not state.is_game_over():
+            positions.append(state)
+    return positions
+
+
+def main():
+    args = parser.parse_args()
+    positions = position_suite(args.positions, random.Random(args.seed))
+    print('%5s %-10s %10s %9s %12s %10s %10s' % ('depth', 'engine', 'nodes', 'time', 'nodes/sec', 'same move',
+                                                 'same value'))
+    for depth in range(1, args.depth + 1):
+        reference = None
+        for name, engine in ENGINES:
+            # A fresh engine per position, so no position benefits from the tables of the previous one. Allocating
+            # the tables is left out of the time.
+            searches = [engine(depth) for _ in positions]
+            results = []
+            start = time.perf_counter()
+            for search, state in zip(searches, positions):
+                results.append(search.evaluate(state))
+            elapsed = time.perf_counter() - start
+            nodes = sum(search.nodes for search in searches)
+            if reference is None:
+                reference = results
+            same_move = sum(move == reference_move for (move, _), (reference_move, _) in zip(results, reference))
+            same_value = sum(value == reference_value for (_, value), (_, reference_value) in zip(results, reference))
+            print('%5d %-10s %10d %8.2fs %12.0f %9d/%d %9d/%d' % (depth, name, nodes, elapsed, nodes / elapsed,
+                                                                 same_move, len(positions), same_value,
+                                                                 len(positions)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+"""Seconds from launching the agent of magent.main (mcts_main) to its first move, next to the start-up of a bare
+Python interpreter and, when TensorFlow is installed, to the import of TensorFlow that every agent used to pay.
+
+The agent runs in a scratch directory with an opening book that holds the start position, so it answers START;South
+from the book and the time is its start-up and pre-warm, not a search. The endgame tablebase of saved_ckpt is linked
+into the scratch directory if it has been built, so that mapping it is counted.
+
+Run from the repository root: python -m benchmarks.startup_bench
+"""
+import argparse
+import importlib.util
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from magent import opening_book, tablebase
+from magent.mancala import MancalaEnv
+from magent.opening_book import OpeningBook
+
+parser = argparse.ArgumentParser(description="Seconds from launching the agent to its first move")
+parser.add_argument('-r', '--repeats', default=5, type=int, help="Launches of each command")
+
+
+def prepare(directory: str):
+    """Lays out directory as the agent expects its working directory."""
+    os.makedirs(os.path.join(directory, 'logs'))
+    os.makedirs(os.path.join(directory, 'saved_ckpt'))
+    state = MancalaEnv()
+    # Any legal move will do: the book only has to answer the first move
+    move = state.get_legal_moves()[0]
+    book = OpeningBook(np.array([state.key], dtype='<u8'), np.zeros(1, dtype='<f4'),
+                       np.array([move.index], dtype='i1'), np.zeros(1, dtype='u1'))
+    book.save(os.path.join(directory, opening_book.DEFAULT_PATH))
+    if os.path.exists(tablebase.DEFAULT_PATH):
+        os.symlink(os.path.abspath(tablebase.DEFAULT_PATH), os.path.join(directory, tablebase.DEFAULT_PATH))
+
+
+def first_move(directory: str, environment: dict) -> float:
+    """Seconds from launching the agent in directory to its answer to START;South."""
+    start = time.perf_counter()
+    agent = subprocess.Popen([sys.executable, '-m', 'magent.main'], cwd=directory, env=environment,
+                             stdin=subprocess.PIPE, stdout=subprocess.PIPE, universal_newlines=True)
+    agent.stdin.write('START;South\n')
+    agent.stdin.flush()
+    answer = agent.stdout.readline()
+    seconds = time.perf_counter() - start
+    agent.communicate('END\n')
+    if not answer.startswith('MOVE;'):
+        raise ValueError('The agent answered %r instead of a move' % answer)
+    return seconds
+
+
+def run(command: [str], environment: dict) -> float:
+    start = time.perf_counter()
+    subprocess.run(command, env=environment, check=True)
+    return time.perf_counter() - start
+
+
+def report(name: str, seconds: [float]):
+    print('%-24s %8.3f %8.3f' % (name, min(seconds), statistics.median(seconds)))
+
+
+def main():
+    args = parser.parse_args()
+    environment = dict(os.environ)
+    # The agent runs in the scratch directory and imports magent from here
+    environment['PYTHONPATH'] = os.getcwd()
+    print('%-24s %8s %8s' % ('command', 'min', 'median'))
+    report('python', [run([sys.executable, '-c', 'pass'], environment) for _ in range(args.repeats)])
+    with tempfile.TemporaryDirectory() as directory:
+        prepare(directory)
+        report('agent first move', [first_move(directory, environment) for _ in range(args.repeats)])
+    if importlib.util.find_spec('tensorflow') is None:
+        print('import tensorflow: not measured (TensorFlow is not installed)')
+        return
+    report('import tensorflow', [run([sys.executable, '-c', 'import tensorflow'], environment)
+                                 for _ in range(args.repeats)])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+"""Leaves per second of TreeParallelMCTS against batch size, next to the MCTS of TreesFactory.alpha_mcts, which runs
+the network on one position at a time, and the sizes of the batches the network is run on.
+
+Needs TensorFlow. The network is restored from the checkpoint A3Client loads; without one it has random weights,
+which does not change the speed.
+
+Run from the repository root: python -m benchmarks.tree_parallel_bench
+"""
+import argparse
+import time
+
+import numpy as np
+import tensorflow as tf
+
+from magent.mancala import MancalaEnv
+from magent.treesearch.mcts.mcts import MCTS
+from magent.treesearch.mcts.policies.default_policy import AlphaGoDefaultPolicy
+from magent.treesearch.mcts.policies.rollout_policy import AlphaGoRollOutPolicy
+from magent.treesearch.mcts.policies.tree_policy import AlphaGoTreePolicy
+from magent.treesearch.mcts.tree_parallel import TreeParallelMCTS
+from models.client import A3Client
+
+parser = argparse.ArgumentParser(description="Leaves per second of TreeParallelMCTS by batch size")
+parser.add_argument('-b', '--batch-sizes', default=[1, 4, 16, 64], type=int, nargs='+', help="Batch sizes")
+parser.add_argument('-t', '--time', default=10, type=float, help="Seconds of each search")
+
+
+class CountingClient(object):
+    """An A3Client that counts the positions of each run of the network."""
+
+    def __init__(self, client: A3Client):
+        self.client = client
+        self.batch_sizes = []
+
+    def evaluate_state(self, env: MancalaEnv):
+        self.batch_sizes.append(1)
+        return self.client.evaluate_state(env)
+
+    def sample_state(self, env: MancalaEnv):
+        self.batch_sizes.append(1)
+        return self.client.sample_state(env)
+
+    def evaluate_games(self, batch, games: np.ndarray):
+        self.batch_sizes.append(len(games))
+        return self.client.evaluate_games(batch, games)
+
+
+def report(name: str, leaves: int, seconds: float, batch_sizes: list):
+    print('%-16s %8d %12.1f %12.1f %10.1f %10d' % (name, leaves, leaves / seconds, len(batch_sizes) / seconds,
+                                                   np.mean(batch_sizes), batch_sizes.count(1)))
+
+
+def main():
+    args = parser.parse_args()
+    with tf.Session() as sess:
+        with tf.variable_scope("global"):
+            client = A3Client(sess)
+        uninitialized = set(sess.run(tf.report_uninitialized_variables()))
+        sess.run(tf.variables_initializer([variable for variable in tf.global_variables()
+                                           if variable.op.name.encode() in uninitialized]))
+
+        print('%-16s %8s %12s %12s %10s %10s' % ('search', 'leaves', 'leaves/sec', 'runs/sec', 'mean batch',
+                                                 'batches of 1'))
+        network = CountingClient(client)
+        mcts = MCTS(AlphaGoTreePolicy(network), AlphaGoDefaultPolicy(network), AlphaGoRollOutPolicy(network),
+                    time_sec=args.time)
+        start = time.perf_counter()
+        mcts.search(MancalaEnv())
+        report('alpha_mcts', mcts.root.visits, time.perf_counter() - start, network.batch_sizes)
+
+        for batch_size in args.batch_sizes:
+            network = CountingClient(client)
+            search = TreeParallelMCTS(network, time_sec=args.time, batch_size=batch_size)
+            start = time.perf_counter()
+            search.search(MancalaEnv())
+            report('batch %d' % batch_size, search.leaves, time.perf_counter() - start, network.batch_sizes)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,45 @@
+"""Benchmark of tree walking with cloned children versus apply_move/undo_move.
+
+Run from the repository root: python -m benchmarks.undo_bench
+"""
+import argparse
+import time
+
+from magent.mancala import MancalaEnv
+
+parser = argparse.ArgumentParser(description="Positions per second when walking the game tree")
+parser.add_argument('-d', '--depth', default=5, type=int, help="Depth of the full-width walk from the start position")
+
+
+def walk_with_clones(state: MancalaEnv, depth: int) -> int:
+    if depth == 0 or state.is_game_over():
+        return 1
+    positions = 1
+    for _, child in state.next_states():
+        positions += walk_with_clones(child, depth - 1)
+    return positions
+
+
+def walk_in_place(state: MancalaEnv, depth: int) -> int:
+    if depth == 0 or state.is_game_over():
+        return 1
+    positions = 1
+    for move in state.get_legal_moves():
+        record = state.apply_move(move)
+        positions += walk_in_place(state, depth - 1)
+        state.undo_move(record)
+    return positions
+
+
+def main():
+    args = parser.parse_args()
+    for name, walk in [('clone per child', walk_with_clones), ('apply/undo', walk_in_place)]:
+        state = MancalaEnv()
+        start = time.perf_counter()
+        positions = walk(state, args.depth)
+        elapsed = time.perf_counter() - start
+        print('%-16s %8d positions in %6.2fs: %10.0f positions/sec' % (name, positions, elapsed, positions / elapsed))
+
+
+if __name__ == '__main__':
+    main()
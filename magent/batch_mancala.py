@@ -0,0 +1,179 @@
+from functools import lru_cache
+
+import numpy as np
+
+from magent.mancala import MancalaEnv
+from magent.side import Side, NORTH_INDEX, SOUTH_INDEX
+from magent.sowing import sowing_table
+
+
+class BatchMancalaEnv(object):
+    """
+    N Kalah games stepped together with NumPy.
+
+    boards has shape (N, 2, holes + 1) and uses the layout of Board.board: row NORTH_INDEX is NORTH, row SOUTH_INDEX
+    is SOUTH and column 0 holds the stores. side_to_move and our_side hold side indexes. Actions are hole numbers,
+    with 0 for the pie move, exactly like Move.index. Finished games are left alone by step until they are reset.
+    """
+
+    def __init__(self, games: int, holes: int = 7, seeds: int = 7):
+        self.games = games
+        self.holes = holes
+        self.seeds = seeds
+        self._sowing = _dense_sowing_table(holes)
+
+        self.boards = np.zeros((games, 2, holes + 1), dtype=np.int16)
+        self.side_to_move = np.zeros(games, dtype=np.int8)
+        self.our_side = np.zeros(games, dtype=np.int8)
+        self.north_moved = np.zeros(games, dtype=bool)
+        self.done = np.zeros(games, dtype=bool)
+        self.reset()
+
+    def reset(self, games: np.ndarray = None):
+        """Resets all games, or only the games selected by an index or boolean array."""
+        games = slice(None) if games is None else games
+        self.boards[games, :, 0] = 0
+        self.boards[games, :, 1:] = self.seeds
+        self.side_to_move[games] = SOUTH_INDEX
+        self.our_side[games] = SOUTH_INDEX
+        self.north_moved[games] = False
+        self.done[games] = False
+
+    def load(self, state: MancalaEnv, games: np.ndarray = None):
+        """Sets all games, or only the games selected by an index or boolean array, to the position of state."""
+        games = slice(None) if games is None else games
+        self.boards[games] = np.frombuffer(state.board.pits, dtype=np.uint8).reshape(2, self.holes + 1)
+        self.side_to_move[games] = Side.get_index(state.side_to_move)
+        self.our_side[games] = Side.get_index(state.our_side)
+        self.north_moved[games] = state.north_moved
+        self.done[games] = state.is_game_over()
+
+    def get_legal_moves_mask(self) -> np.ndarray:
+        """Returns an (N, holes + 1) boolean array where entry [i, a] is True if action a is legal in game i."""
+        rows = self.boards[np.arange(self.games), self.side_to_move]
+        mask = rows > 0
+        # If this is the first move of NORTH, then NORTH can use the pie rule action
+        mask[:, 0] = (self.side_to_move == NORTH_INDEX) & ~self.north_moved
+        mask[self.done] = False
+        return mask
+
+    def get_actions_mask(self) -> np.ndarray:
+        """Batched MancalaEnv.get_actions_mask: an (N, holes + 1) array of 1s and 0s."""
+        return self.get_legal_moves_mask().astype(np.int64)
+
+    def get_action_mask_with_no_pie(self) -> np.ndarray:
+        """Batched MancalaEnv.get_action_mask_with_no_pie: an (N, holes) array of 1s and 0s."""
+        return self.get_legal_moves_mask()[:, 1:].astype(np.int64)
+
+    def get_board_image(self, flipped=False) -> np.ndarray:
+        """
+        Batched Board.get_board_image: an (N, 2, holes + 1, 1) array. flipped is either a bool for all the games or
+        a boolean array with one entry per game, e.g. side_to_move == NORTH_INDEX to feed each game from the point
+        of view of the side to move.
+        """
+        flipped = np.broadcast_to(np.asarray(flipped, dtype=bool), (self.games,))
+        images = self.boards.astype(np.int64)
+        images[flipped] = images[flipped, ::-1]
+        return images[..., np.newaxis]
+
+    def step(self, actions: np.ndarray) -> (np.ndarray, np.ndarray):
+        """
+        Performs one action in every unfinished game. Returns the rewards of MancalaEnv.perform_move for the moving
+        sides (0 for finished games) and the done flags.
+        """
+        actions = np.asarray(actions)
+        active = np.nonzero(~self.done)[0]
+        illegal = ~self.get_legal_moves_mask()[active, actions[active]]
+        if illegal.any():
+            raise ValueError('Illegal actions {} in games {}'.format(actions[active[illegal]], active[illegal]))
+
+        stride = self.holes + 1
+        pits = self.boards.reshape(self.games, 2 * stride)
+        rewards = np.zeros(self.games, dtype=np.float64)
+
+        side = self.side_to_move[active].astype(np.int64)
+        store = side * stride
+        store_before = pits[active, store]
+        next_side = 1 - side
+
+        # Pie moves swap the rows
+        pie = actions[active] == 0
+        swapped = active[pie]
+        self.boards[swapped] = self.boards[swapped, ::-1]
+        self.our_side[swapped] = 1 - self.our_side[swapped]
+
+        # Sow all the other moves
+        sow = ~pie
+        games = active[sow]
+        source = store[sow] + actions[games]
+        seeds = pits[games, source]
+        pits[games, source] = 0
+        pits[games] += self._sowing.increments[source, seeds]
+
+        # Capture the opponent's seeds from the opposite hole if the last seed
+        # is placed in an empty hole and there are seeds in the opposite hole
+        landing = self._sowing.landing[source, seeds]
+        opposite = self._sowing.opposite[source, seeds]
+        capture = (opposite >= 0) & (pits[games, landing] == 1)
+        capture[capture] &= pits[games[capture], opposite[capture]] > 0
+        capturing = games[capture]
+        pits[capturing, store[sow][capture]] += 1 + pits[capturing, opposite[capture]]
+        pits[capturing, landing[capture]] = 0
+        pits[capturing, opposite[capture]] = 0
+
+        # If the game is over, collect the seeds not in the store and put them there
+        seeds_on_side = self.boards[games, :, 1:].sum(axis=2)
+        over = (seeds_on_side == 0).any(axis=1)
+        finished = games[over]
+        self.boards[finished, :, 0] += seeds_on_side[over].astype(self.boards.dtype)
+        self.boards[finished, :, 1:] = 0
+        self.done[finished] = True
+
+        # Last seed placed in the store: the side moves again
+        again = self._sowing.extra_turn[source, seeds] & ((side[sow] == NORTH_INDEX) | self.north_moved[games])
+        next_side[np.nonzero(sow)[0][again]] = side[sow][again]
+
+        self.side_to_move[active] = next_side
+        self.north_moved[active] |= side == NORTH_INDEX
+        rewards[active] = (pits[active, store] - store_before) / 100.0
+        return rewards, self.done.copy()
+
+    def compute_final_reward(self, side: int) -> np.ndarray:
+        """Batched MancalaEnv.compute_final_reward for the side with the given index."""
+        return self.boards[:, side, 0].astype(np.int64) - self.boards[:, 1 - side, 0]
+
+    def get_winner(self) -> np.ndarray:
+        """The index of the winning side of every game, or -1 for ties and unfinished games."""
+        difference = self.compute_final_reward(NORTH_INDEX)
+        winner = np.where(difference > 0, NORTH_INDEX, SOUTH_INDEX)
+        winner[(difference == 0) | ~self.done] = -1
+        return winner
+
+
+class _DenseSowingTable(object):
+    """magent.sowing tables as arrays indexed by [pit, seeds], so a batch of moves is sown with one addition."""
+
+    def __init__(self, holes: int):
+        table = sowing_table(holes)
+        pits = 2 * (holes + 1)
+        max_seeds = len(table.sowings[1])
+        self.increments = np.zeros((pits, max_seeds, pits), dtype=np.int16)
+        self.landing = np.zeros((pits, max_seeds), dtype=np.int64)
+        self.opposite = np.full((pits, max_seeds), -1, dtype=np.int64)
+        self.extra_turn = np.zeros((pits, max_seeds), dtype=bool)
+        for pit, sowings in enumerate(table.sowings):
+            if sowings is None:
+                continue
+            for seeds, sowing in enumerate(sowings):
+                if sowing is None:
+                    continue
+                for target, count in sowing.increments:
+                    self.increments[pit, seeds, target] = count
+                self.landing[pit, seeds] = sowing.landing
+                self.opposite[pit, seeds] = sowing.opposite
+                self.extra_turn[pit, seeds] = sowing.extra_turn
+
+
+@lru_cache(maxsize=None)
+def _dense_sowing_table(holes: int) -> _DenseSowingTable:
+    return _DenseSowingTable(holes)
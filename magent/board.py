@@ -1,97 +1,159 @@
+from magent import zobrist
 from magent.side import Side
-from copy import deepcopy
+from magent.sowing import sowing_table
 import numpy as np
 
 
 class Board(object):
+    """
+    Kalah board backed by a single flat byte buffer.
+
+    Both rows are stored back to back in `pits`, NORTH first, and hole 0 of each row is the store of that side:
+    the seeds in `hole` of `side` live at `pits[offset(side, hole)]`. The engine and the search code index `pits`
+    directly and skip the range checks done by the public accessors.
+
+    `key` is the Zobrist key of the seeds on the board (see magent.zobrist). Code that writes to `pits` directly must
+    update it with `pit_keys[pit][old_seeds] ^ pit_keys[pit][new_seeds]` or call rehash(). `sowing` is the sowing
+    table shared by all boards with the same number of holes (see magent.sowing).
+
+    `side_seeds` and `filled` summarise the holes of each side, indexed by side index: the number of seeds in the
+    holes (stores excluded) and a bitmask with bit i set if hole i is not empty. They are kept up to date by the
+    setters and by MancalaEnv.make_move, so the legal moves and the end of the game are known without scanning the
+    holes. Code that writes to `pits` directly must update them as well or call rehash().
+    """
+    __slots__ = ('_holes', 'pits', 'key', 'pit_keys', 'sowing', 'side_seeds', 'filled')
+
     def __init__(self, holes: int, seeds: int):
         if holes < 1:
             raise ValueError('There has to be at least one hole')
         if seeds < 0:
             raise ValueError('There has to be a non-negative number of seeds')
+        if 2 * holes * seeds > 255:
+            raise ValueError('A board can hold at most 255 seeds')
 
         self._holes = holes
 
         # Place the seeds in the holes
-        self.board = [[0 for _ in range(holes + 1)] for _ in range(2)]
-        for hole in range(1, holes + 1):
-            self.board[Side.get_index(Side.NORTH)][hole] = seeds
-            self.board[Side.get_index(Side.SOUTH)][hole] = seeds
+        row = bytes([0]) + bytes([seeds]) * holes
+        self.pits = bytearray(row * 2)
+        self.pit_keys = zobrist.pit_keys(len(self.pits))
+        self.sowing = sowing_table(holes)
+        self.rehash()
 
     @classmethod
     def clone(cls, original_board):
-        holes = original_board.holes
-        board = cls(holes, 0)
-        for hole in range(1, holes + 1):
-            board.board[Side.get_index(Side.NORTH)][hole] \
-                = deepcopy(original_board.board[Side.get_index(Side.NORTH)][hole])
-            board.board[Side.get_index(Side.SOUTH)][hole] \
-                = deepcopy(original_board.board[Side.get_index(Side.SOUTH)][hole])
+        board = cls.__new__(cls)
+        board._holes = original_board._holes
+        board.pits = original_board.pits[:]
+        board.pit_keys = original_board.pit_keys
+        board.key = original_board.key
+        board.sowing = original_board.sowing
+        board.side_seeds = original_board.side_seeds[:]
+        board.filled = original_board.filled[:]
         return board
 
+    def __copy__(self):
+        return Board.clone(self)
+
+    def __deepcopy__(self, memo):
+        # The key and sowing tables are shared and never change, so they must not be copied
+        return Board.clone(self)
+
+    def rehash(self):
+        """Recomputes key, side_seeds and filled from scratch after pits was rewritten as a whole."""
+        self.key = zobrist.board_key(self.pits)
+        stride = self._holes + 1
+        self.side_seeds = [sum(self.pits[store + 1:store + stride]) for store in (0, stride)]
+        self.filled = [sum(1 << hole for hole in range(1, stride) if self.pits[store + hole] > 0)
+                       for store in (0, stride)]
+
+    def _set_pit(self, pit: int, seeds: int):
+        old_seeds = self.pits[pit]
+        self.pits[pit] = seeds
+        keys = self.pit_keys[pit]
+        self.key ^= keys[old_seeds] ^ keys[seeds]
+
+        side, hole = divmod(pit, self._holes + 1)
+        if hole > 0:
+            self.side_seeds[side] += seeds - old_seeds
+            if seeds > 0:
+                self.filled[side] |= 1 << hole
+            else:
+                self.filled[side] &= ~(1 << hole)
+
     @property
     def holes(self):
         return self._holes
 
+    @property
+    def board(self):
+        """A [NORTH, SOUTH] list of rows (store first). This is a copy; changing it does not affect the board."""
+        stride = self._holes + 1
+        return [list(self.pits[:stride]), list(self.pits[stride:])]
+
+    def offset(self, side: Side, hole: int = 0) -> int:
+        """Returns the position of the hole (or of the store if hole is 0) of side in pits."""
+        if side is Side.NORTH:
+            return hole
+        return self._holes + 1 + hole
+
     def get_seeds(self, side: Side, hole: int) -> int:
-        if hole < 1 or hole > self.holes:
+        if hole < 1 or hole > self._holes:
             raise ValueError('Hole number must be between 1 and number of holes')
-        return self.board[Side.get_index(side)][hole]
+        return self.pits[self.offset(side, hole)]
 
     def set_seeds(self, side: Side, hole: int, seeds: int):
-        if hole < 1 or hole > self.holes:
+        if hole < 1 or hole > self._holes:
             raise ValueError('Hole number must be between 1 and number of holes')
         if seeds < 0:
             raise ValueError('There has to be a non-negative number of seeds')
 
-        self.board[Side.get_index(side)][hole] = seeds
+        self._set_pit(self.offset(side, hole), seeds)
 
     def get_seeds_op(self, side: Side, hole: int):
-        if hole < 1 or hole > self.holes:
+        if hole < 1 or hole > self._holes:
             raise ValueError('Hole number must be between 1 and number of holes')
-        return self.board[Side.get_index(Side.opposite(side))][self.holes+1-hole]
+        return self.pits[self.offset(Side.opposite(side), self._holes + 1 - hole)]
 
     def set_seeds_op(self, side: Side, hole: int, seeds: int):
-        if hole < 1 or hole > self.holes:
+        if hole < 1 or hole > self._holes:
             raise ValueError('Hole number must be between 1 and number of holes')
         if seeds < 0:
             raise ValueError('There has to be a non-negative number of seeds')
 
-        self.board[Side.get_index(Side.opposite(side))][self.holes+1-hole] = seeds
+        self._set_pit(self.offset(Side.opposite(side), self._holes + 1 - hole), seeds)
 
     def add_seeds(self, side: Side, hole: int, seeds: int):
-        if hole < 1 or hole > self.holes:
+        if hole < 1 or hole > self._holes:
             raise ValueError('Hole number must be between 1 and number of holes')
         if seeds < 0:
             raise ValueError('There has to be a non-negative number of seeds')
 
-        self.board[Side.get_index(side)][hole] += seeds
+        pit = self.offset(side, hole)
+        self._set_pit(pit, self.pits[pit] + seeds)
 
     def add_seeds_to_store(self, side: Side, seeds: int):
         if seeds < 0:
             raise ValueError('There has to be a non-negative number of seeds')
-        self.board[Side.get_index(side)][0] += seeds
+        pit = self.offset(side)
+        self._set_pit(pit, self.pits[pit] + seeds)
 
     def set_seeds_in_store(self, side: Side, seeds: int):
         if seeds < 0:
             raise ValueError('There has to be a non-negative number of seeds')
-        self.board[Side.get_index(side)][0] = seeds
+        self._set_pit(self.offset(side), seeds)
 
     def get_seeds_in_store(self, side: Side):
-        return self.board[Side.get_index(side)][0]
+        return self.pits[self.offset(side)]
 
     def get_flipped_board(self):
-        copy = Board.clone(self)
-        flipped_board = copy.board
-        for hole in range(1, copy.holes + 1):
-            flipped_board[0][hole], flipped_board[1][hole] = flipped_board[1][hole], flipped_board[0][hole]
-        flipped_board[0][0], flipped_board[1][0] = flipped_board[1][0], flipped_board[0][0]
-        return flipped_board
+        stride = self._holes + 1
+        return [list(self.pits[stride:]), list(self.pits[:stride])]
 
     def get_board_image(self, flipped=False):
-        if flipped:
-            return np.reshape(np.array(self.get_flipped_board()), (2, 8, 1))
-        return np.reshape(np.array(self.board), (2, 8, 1))
+        stride = self._holes + 1
+        pits = self.pits[stride:] + self.pits[:stride] if flipped else self.pits
+        return np.frombuffer(pits, dtype=np.uint8).astype(np.int64).reshape((2, stride, 1))
 
     def is_seedable(self, side: Side, hole: int) -> bool:
         for other_hole in range(hole - 1, 0):
@@ -100,13 +162,13 @@ class Board(object):
         return False
 
     def __str__(self):
-        board_str = str(self.board[Side.get_index(Side.NORTH)][0]) + " --"
+        board_str = str(self.get_seeds_in_store(Side.NORTH)) + " --"
         for i in range(self.holes, 0, -1):
-            board_str += " " + str(self.board[Side.get_index(Side.NORTH)][i])
+            board_str += " " + str(self.get_seeds(Side.NORTH, i))
         board_str += "\n"
 
         for i in range(1, self.holes + 1, 1):
-            board_str += " " + str(self.board[Side.get_index(Side.SOUTH)][i])
-        board_str += " --  " + str(self.board[Side.get_index(Side.SOUTH)][0]) + "\n"
+            board_str += " " + str(self.get_seeds(Side.SOUTH, i))
+        board_str += " --  " + str(self.get_seeds_in_store(Side.SOUTH)) + "\n"
 
         return board_str
@@ -1,16 +1,17 @@
 import datetime
 import logging
 
-import tensorflow as tf
-
 import magent.protocol.protocol as protocol
+from magent import opening_book, tablebase
 from magent.mancala import MancalaEnv
 from magent.move import Move
 from magent.protocol.invalid_message_exception import InvalidMessageException
 from magent.protocol.msg_type import MsgType
 from magent.side import Side
 from magent.treesearch.factory import TreesFactory
-from models.client import A3Client
+from models import evaluation_cache
+from models.evaluation_cache import EvaluationCache
+from models.network_client import NetworkClient, NumpyClient
 
 # set up logging to file - see previous section for more details
 logfile_name = datetime.datetime.now().strftime('kalah_%H_%M_%d_%m_%Y.log')
@@ -21,10 +22,48 @@ logging.basicConfig(level=logging.DEBUG,
                     filemode='w')
 
 
+def prewarm(network_client: NetworkClient = None):
+    """
+    Does the work that would otherwise slow down the first move, before the first message of the game engine: maps
+    the tablebase and the opening book, builds the sowing and hashing tables of the board (the first MancalaEnv
+    does), and runs the network once, as the first run of a TensorFlow session is much slower than the next ones.
+    """
+    tablebase.load()
+    opening_book.load()
+    state = MancalaEnv()
+    if network_client is not None:
+        network_client.evaluate_state(state)
+
+
+def open_cache(network_client: NetworkClient):
+    """
+    Gives network_client the evaluations saved by the last game with the same weights. They are kept only in memory
+    if the weights are unknown, as a saved cache could not be told apart from the cache of other weights.
+    """
+    if network_client.fingerprint is None:
+        network_client.cache = EvaluationCache()
+    else:
+        network_client.cache = EvaluationCache.open(evaluation_cache.DEFAULT_PATH,
+                                                    fingerprint=network_client.fingerprint)
+
+
+def save_cache(network_client: NetworkClient):
+    logging.info(network_client.cache.statistics())
+    if network_client.fingerprint is not None:
+        network_client.cache.save(evaluation_cache.DEFAULT_PATH)
+
+
 def main(_):
+    # TensorFlow takes seconds to import, so only the agent that runs the network on it imports it
+    import tensorflow as tf
+    from models.client import A3Client
+
     with tf.Session() as sess:
         with tf.variable_scope("global"):
             a3client = A3Client(sess)
+            # The evaluations of the network are kept between games
+            open_cache(a3client)
+            prewarm(a3client)
             mcts = TreesFactory.alpha_mcts(a3client)
             state = MancalaEnv()
             try:
@@ -33,6 +72,23 @@ def main(_):
                 logging.error("Uncaught exception in main: " + str(e))
                 # TODO uncomment before release: Default to reasonable move behaviour on failure
                 # protocol.send_msg(protocol.create_move_msg(choice(state.get_legal_moves())))
+            mcts.close()
+            save_cache(a3client)
+
+
+def numpy_main():
+    """main without a TensorFlow session: the network runs on the weights exported by models.a3c.export."""
+    network_client = NumpyClient()
+    open_cache(network_client)
+    prewarm(network_client)
+    mcts = TreesFactory.alpha_mcts(network_client)
+    state = MancalaEnv()
+    try:
+        _run_game(mcts, state)
+    except Exception as e:
+        logging.error("Uncaught exception in main: " + str(e))
+    mcts.close()
+    save_cache(network_client)
 
 
 def _run_game(mcts, state):
@@ -43,16 +99,18 @@ def _run_game(mcts, state):
             if msg_type == MsgType.START:
                 first = protocol.interpret_start_msg(msg)
                 if first:
-                    move = mcts.search(state)
+                    move = _choose_move(mcts, state)
                     protocol.send_msg(protocol.create_move_msg(move.index))
                 else:
                     state.our_side = Side.NORTH
             elif msg_type == MsgType.STATE:
                 move_turn = protocol.interpret_state_msg(msg)
-                state.perform_move(Move(state.side_to_move, move_turn.move))
+                move = Move.of(state.side_to_move, move_turn.move)
+                state.perform_move(move)
+                mcts.play(move)
                 if not move_turn.end:
                     if move_turn.again:
-                        move = mcts.search(state)
+                        move = _choose_move(mcts, state)
                         # pie rule; optimal move is to swap
                         if move.index == 0:
                             protocol.send_msg(protocol.create_swap_msg())
@@ -69,7 +127,17 @@ def _run_game(mcts, state):
             logging.error(str(e))
 
 
+def _choose_move(mcts, state):
+    # The positions of the opening are the same in every game, so they are answered from the book
+    move = opening_book.lookup(state)
+    if move is not None:
+        logging.info("Book move: %s" % move)
+        return move
+    return mcts.search(state)
+
+
 def mcts_main():
+    prewarm()
     mcts = TreesFactory.standard_mcts()
     state = MancalaEnv()
     try:
@@ -78,6 +146,7 @@ def mcts_main():
         logging.error("Uncaught exception in main: " + str(e))
         # TODO uncomment before release: Default to reasonable move behaviour on failure
         # protocol.send_msg(protocol.create_move_msg(choice(state.get_legal_moves())))
+    mcts.close()
 
 
 if __name__ == '__main__':
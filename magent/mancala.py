@@ -1,11 +1,19 @@
-from copy import deepcopy
+from collections import namedtuple
 from typing import List
 
 import numpy as np
 
+from magent import tablebase, zobrist
 from magent.board import Board
-from magent.move import Move
-from magent.side import Side
+from magent.move import Move, MOVES_OF_SIDE, HOLES_IN_MASK, encode_action
+from magent.side import Side, NORTH_INDEX, SOUTH_INDEX
+
+
+# Everything undo_move needs to take back a move made with apply_move. The pits are a snapshot of the 16-byte board
+# buffer taken before the move, so the sown seeds, a capture, the end-game sweep and a pie swap are all restored by
+# copying it back; key, side_seeds and filled are the matching board summaries.
+UndoRecord = namedtuple("UndoRecord", ["move", "pits", "key", "side_seeds", "filled", "side_to_move", "north_moved",
+                                       "our_side"])
 
 
 class MancalaEnv(object):
@@ -52,19 +60,25 @@ class MancalaEnv(object):
 
     @staticmethod
     def clone(other_state):
-        board = Board.clone(other_state.board)
-        side_to_move = deepcopy(other_state.side_to_move)
-        north_moved = deepcopy(other_state.north_moved)
-
-        clone_game = MancalaEnv()
-        clone_game.board = board
-        clone_game.side_to_move = side_to_move
-        clone_game.north_moved = north_moved
+        clone_game = MancalaEnv.__new__(MancalaEnv)
+        clone_game._board = Board.clone(other_state._board)
+        clone_game._side_to_move = other_state._side_to_move
+        clone_game._north_moved = other_state._north_moved
+        clone_game._my_side = other_state._my_side
         return clone_game
 
     def get_legal_moves(self) -> List[Move]:
         return MancalaEnv.get_state_legal_actions(self.board, self.side_to_move, self.north_moved)
 
+    def get_legal_moves_bitmask(self) -> int:
+        """Returns the legal moves of the side to move as a bitmask: bit i is set if the move with index i is legal."""
+        return MancalaEnv.get_state_legal_moves_bitmask(self.board, self.side_to_move, self.north_moved)
+
+    def get_legal_actions(self) -> List[int]:
+        """Returns the legal moves of the side to move encoded as int actions (see Move.action)."""
+        side = encode_action(self.side_to_move, 0)
+        return [side | index for index in HOLES_IN_MASK[self.get_legal_moves_bitmask()]]
+
     def is_legal(self, move: Move) -> bool:
         return MancalaEnv.is_legal_action(self.board, move, self.north_moved)
 
@@ -81,11 +95,64 @@ class MancalaEnv(object):
         # Return a partial reward proportional to the number of captured seeds.
         return (seeds_in_store_after - seeds_in_store_before) / 100.0
 
+    def apply_move(self, move: Move) -> UndoRecord:
+        """
+        Performs a move in place and returns the record needed to take it back with undo_move. This lets the search
+        walk the game tree without cloning the environment for each child.
+        """
+        board = self._board
+        record = UndoRecord(move, bytes(board.pits), board.key, tuple(board.side_seeds), tuple(board.filled),
+                            self._side_to_move, self._north_moved, self._my_side)
+        if move.index == 0:  # pie move
+            self._my_side = Side.opposite(self._my_side)
+        self._side_to_move = MancalaEnv.make_move(self._board, move, self._north_moved)
+        if move.side == Side.NORTH:
+            self._north_moved = True
+        return record
+
+    def undo_move(self, record: UndoRecord):
+        """Takes back the move of the given record. Moves must be undone in the reverse order they were applied."""
+        board = self._board
+        board.pits[:] = record.pits
+        board.key = record.key
+        board.side_seeds[:] = record.side_seeds
+        board.filled[:] = record.filled
+        self._side_to_move = record.side_to_move
+        self._north_moved = record.north_moved
+        self._my_side = record.our_side
+
     def compute_final_reward(self, side: Side):
         """Returns a reward for the specified side for moving to the current state."""
         reward = self.board.get_seeds_in_store(side) - self.board.get_seeds_in_store(Side.opposite(side))
         return reward
 
+    def probe_tablebase(self) -> int or None:
+        """
+        Returns the final reward (see compute_final_reward) of the side to move if both sides play perfectly from
+        here, read from the loaded endgame tablebase (see magent.tablebase), or None if the position is not in it.
+        """
+        if not self._north_moved:
+            return None
+        value = tablebase.probe(self._board, self._side_to_move)
+        if value is None:
+            return None
+        return self.compute_final_reward(self._side_to_move) + value
+
+    def finish_game(self, final_reward: int):
+        """
+        Ends the game by moving the seeds left in the holes to the stores, so that the side to move gets the given
+        final reward. Used to jump to the end of the game with the result of probe_tablebase.
+        """
+        board = self._board
+        side = self._side_to_move
+        total = sum(board.pits)
+        if (total + final_reward) % 2 != 0 or abs(final_reward) > total:
+            raise ValueError('A final reward of {} is not possible with {} seeds'.format(final_reward, total))
+        board.pits[:] = bytes(len(board.pits))
+        board.pits[board.offset(side)] = (total + final_reward) // 2
+        board.pits[board.offset(Side.opposite(side))] = (total - final_reward) // 2
+        board.rehash()
+
     def compute_end_game_reward(self, side: Side):
         """Returns a reward for the specified side for moving to the end game state."""
         if not self.is_game_over():
@@ -103,24 +170,16 @@ class MancalaEnv(object):
 
     def get_actions_mask(self) -> [float]:
         """Returns an np array of 1s and 0s where 1 at index i means that the action with that action is valid. """
-        mask = [0 for _ in range(self.board.holes + 1)]
-        moves = self.get_legal_moves()
-        for action in moves:
-            mask[action.index] = 1
-        return np.array(mask)
+        legal_moves = self.get_legal_moves_bitmask()
+        return np.array([legal_moves >> index & 1 for index in range(self.board.holes + 1)])
 
     def get_action_mask_with_no_pie(self) -> [float]:
         """
         Returns an np array of 1s and 0s where 1 at index i means that the action with that action is valid.
         The pie move is not considered.
         """
-        mask = [0 for _ in range(self.board.holes)]
-        moves = [move.index for move in self.get_legal_moves()]
-        if 0 in moves:
-            moves.remove(0)
-        for action in moves:
-            mask[action - 1] = 1
-        return np.array(mask)
+        legal_moves = self.get_legal_moves_bitmask()
+        return np.array([legal_moves >> index & 1 for index in range(1, self.board.holes + 1)])
 
     def get_winner(self) -> Side or None:
         """
@@ -131,9 +190,8 @@ class MancalaEnv(object):
         finished_side = Side.NORTH if MancalaEnv.holes_empty(self.board, Side.NORTH) else Side.SOUTH
 
         not_finished_side = Side.opposite(finished_side)
-        not_finished_side_seeds = self.board.get_seeds_in_store(not_finished_side)
-        for hole in range(1, self.board.holes + 1):
-            not_finished_side_seeds += self.board.get_seeds(not_finished_side, hole)
+        not_finished_side_seeds = self.board.get_seeds_in_store(not_finished_side) \
+            + self.board.side_seeds[Side.get_index(not_finished_side)]
         finished_side_seeds = self.board.get_seeds_in_store(finished_side)
 
         if finished_side_seeds > not_finished_side_seeds:
@@ -145,23 +203,26 @@ class MancalaEnv(object):
     # Generate a list of all legal moves given a board state and a side
     @staticmethod
     def get_state_legal_actions(board: Board, side: Side, north_moved: bool) -> List[Move]:
+        moves = MOVES_OF_SIDE[Side.get_index(side)]
+        return [moves[index] for index in HOLES_IN_MASK[MancalaEnv.get_state_legal_moves_bitmask(board, side,
+                                                                                                 north_moved)]]
+
+    @staticmethod
+    def get_state_legal_moves_bitmask(board: Board, side: Side, north_moved: bool) -> int:
         # If this is the first move of NORTH, then NORTH can use the pie rule action
-        legal_moves = [] if north_moved or side == side.SOUTH else [Move(side, 0)]
-        for i in range(1, board.holes + 1):
-            if board.board[side.get_index(side)][i] > 0:
-                legal_moves.append(Move(side, i))
-        return legal_moves
+        if north_moved or side is Side.SOUTH:
+            return board.filled[Side.get_index(side)]
+        return board.filled[NORTH_INDEX] | 1
 
     @staticmethod
     def is_legal_action(board: Board, move: Move, north_moved: bool) -> bool:
-        return move.index in [act.index for act in MancalaEnv.get_state_legal_actions(board, move.side, north_moved)]
+        if move.index == 0:
+            return not north_moved and move.side == Side.NORTH
+        return move.index <= board.holes and board.pits[board.offset(move.side, move.index)] > 0
 
     @staticmethod
     def holes_empty(board: Board, side: Side):
-        for hole in range(1, board.holes + 1):
-            if board.get_seeds(side, hole) > 0:
-                return False
-        return True
+        return board.side_seeds[Side.get_index(side)] == 0
 
     @staticmethod
     def game_over(board: Board):
@@ -169,16 +230,17 @@ class MancalaEnv(object):
         :param board: The board to be analysed
         :return: True if the game is over and the side which finished
         """
-        if MancalaEnv.holes_empty(board, Side.SOUTH):
-            return True
-        if MancalaEnv.holes_empty(board, Side.NORTH):
-            return True
-        return False
+        side_seeds = board.side_seeds
+        return side_seeds[NORTH_INDEX] == 0 or side_seeds[SOUTH_INDEX] == 0
 
     @staticmethod
     def switch_sides(board: Board):
-        for hole in range(board.holes + 1):
-            board.board[0][hole], board.board[1][hole] = board.board[1][hole], board.board[0][hole]
+        stride = board.holes + 1
+        pits = board.pits
+        pits[:] = pits[stride:] + pits[:stride]
+        board.key = zobrist.board_key(pits)
+        board.side_seeds.reverse()
+        board.filled.reverse()
 
     @staticmethod
     def make_move(board: Board, move: Move, north_moved):
@@ -191,10 +253,96 @@ class MancalaEnv(object):
             MancalaEnv.switch_sides(board)
             return Side.opposite(move.side)
 
-        seeds_to_sow = board.get_seeds(move.side, move.index)
-        board.set_seeds(move.side, move.index, 0)
+        pits = board.pits
+        keys = board.pit_keys
+        source = board.offset(move.side, move.index)
+        seeds_to_sow = pits[source]
+        increments, store, extra_turn, landing, opposite, sown_seeds, sown_filled = \
+            board.sowing.sowings[source][seeds_to_sow]
+        side_seeds = board.side_seeds
+        filled = board.filled
+        own = Side.get_index(move.side)
+
+        # Empty the hole and sow its seeds
+        pits[source] = 0
+        key = board.key ^ keys[source][seeds_to_sow] ^ keys[source][0]
+        for pit, count in increments:
+            seeds = pits[pit]
+            pits[pit] = seeds + count
+            key ^= keys[pit][seeds] ^ keys[pit][seeds + count]
+        side_seeds[own] -= seeds_to_sow
+        filled[own] &= ~(1 << move.index)
+        for side in (NORTH_INDEX, SOUTH_INDEX):
+            side_seeds[side] += sown_seeds[side]
+            filled[side] |= sown_filled[side]
+
+        # Capture the opponent's seeds from the opposite hole if the last seed
+        # is placed in an empty hole and there are seeds in the opposite hole
+        if opposite >= 0 and pits[landing] == 1:
+            captured = pits[opposite]
+            if captured > 0:
+                seeds = pits[store]
+                pits[store] = seeds + 1 + captured
+                pits[landing] = 0
+                pits[opposite] = 0
+                key ^= keys[store][seeds] ^ keys[store][seeds + 1 + captured] \
+                    ^ keys[landing][1] ^ keys[landing][0] \
+                    ^ keys[opposite][captured] ^ keys[opposite][0]
+                opp = 1 - own
+                side_seeds[own] -= 1
+                side_seeds[opp] -= captured
+                filled[own] &= ~(1 << (landing - store))
+                filled[opp] &= ~(1 << (store + board.holes + 1 - landing))
+
+        # If the game is over, collect the seeds not in the store and put them there
+        if side_seeds[NORTH_INDEX] == 0 or side_seeds[SOUTH_INDEX] == 0:
+            stride = board.holes + 1
+            collecting = SOUTH_INDEX if side_seeds[NORTH_INDEX] == 0 else NORTH_INDEX
+            collecting_store = collecting * stride
+            total = side_seeds[collecting]
+            for pit in range(collecting_store + 1, collecting_store + stride):
+                seeds = pits[pit]
+                if seeds > 0:
+                    pits[pit] = 0
+                    key ^= keys[pit][seeds] ^ keys[pit][0]
+            side_seeds[collecting] = 0
+            filled[collecting] = 0
+            seeds = pits[collecting_store]
+            pits[collecting_store] = seeds + total
+            key ^= keys[collecting_store][seeds] ^ keys[collecting_store][seeds + total]
+
+        board.key = key
 
+        # Return the side which is next to move
+        if extra_turn and (move.side == Side.NORTH or north_moved):
+            return move.side  # Last seed was placed in the store, so side moves again
+        return Side.opposite(move.side)
+
+    @staticmethod
+    def make_move_reference(board: Board, move: Move, north_moved):
+        """
+        Sows seed by seed instead of using the precomputed sowing table. It is kept as the reference implementation
+        to test make_move against.
+        """
+        if not MancalaEnv.is_legal_action(board, move, north_moved):
+            raise ValueError('Move is illegal: Board: \n {} \n Move:\n {}/{} \n {}'.format(board, move.index, move.side,
+                                                                                           north_moved))
+
+        # This is a pie move
+        if move.index == 0:
+            MancalaEnv.switch_sides(board)
+            return Side.opposite(move.side)
+
+        pits = board.pits
         holes = board.holes
+        stride = holes + 1
+        # Offsets of the stores of the moving side and of its opponent
+        own_store = board.offset(move.side)
+        opp_store = stride - own_store
+
+        seeds_to_sow = pits[own_store + move.index]
+        pits[own_store + move.index] = 0
+
         # Place seeds in all holes excepting the opponent's store
         receiving_holes = 2 * holes + 1
         # Rounds needed to sow all the seeds
@@ -204,47 +352,46 @@ class MancalaEnv(object):
 
         # Sow the seeds for the full rounds
         if rounds != 0:
-            for hole in range(1, holes + 1):
-                board.add_seeds(Side.NORTH, hole, rounds)
-                board.add_seeds(Side.SOUTH, hole, rounds)
-            board.add_seeds_to_store(move.side, rounds)
+            for pit in range(2 * stride):
+                if pit != opp_store:
+                    pits[pit] += rounds
 
         # Sow the remaining seeds
-        sow_side = move.side
+        sow_store = own_store
         sow_hole = move.index
         for _ in range(remaining_seeds):
             sow_hole += 1
             if sow_hole == 1:
-                sow_side = Side.opposite(sow_side)
+                sow_store = stride - sow_store
             if sow_hole > holes:
-                if sow_side == move.side:
+                if sow_store == own_store:
                     sow_hole = 0
-                    board.add_seeds_to_store(sow_side, 1)
+                    pits[own_store] += 1
                     continue
                 else:
-                    sow_side = Side.opposite(sow_side)
+                    sow_store = own_store
                     sow_hole = 1
-            board.add_seeds(sow_side, sow_hole, 1)
+            pits[sow_store + sow_hole] += 1
 
         # Capture the opponent's seeds from the opposite hole if the last seed
         # is placed in an empty hole and there are seeds in the opposite hole
-        if sow_side == move.side and sow_hole > 0 \
-                and board.get_seeds(sow_side, sow_hole) == 1 \
-                and board.get_seeds_op(sow_side, sow_hole) > 0:
-            board.add_seeds_to_store(move.side, 1 + board.get_seeds_op(sow_side, sow_hole))
-            board.set_seeds(move.side, sow_hole, 0)
-            board.set_seeds_op(move.side, sow_hole, 0)
-
-        # If the game is over, collect the seeds not in the store and put them there
-        game_over = MancalaEnv.game_over(board)
-        if game_over:
-            finished_side = Side.NORTH if MancalaEnv.holes_empty(board, Side.NORTH) else Side.SOUTH
-            seeds = 0
-            collecting_side = Side.opposite(finished_side)
-            for hole in range(1, board.holes + 1):
-                seeds += board.get_seeds(collecting_side, hole)
-                board.set_seeds(collecting_side, hole, 0)
-            board.add_seeds_to_store(collecting_side, seeds)
+        if sow_store == own_store and sow_hole > 0 and pits[own_store + sow_hole] == 1:
+            opposite_hole = opp_store + stride - sow_hole
+            if pits[opposite_hole] > 0:
+                pits[own_store] += 1 + pits[opposite_hole]
+                pits[own_store + sow_hole] = 0
+                pits[opposite_hole] = 0
+
+        # If the game is over, collect the seeds not in the store and put them there. The board summaries are only
+        # recomputed by rehash below, so the holes are scanned here.
+        north_empty = not any(pits[1:stride])
+        if north_empty or not any(pits[stride + 1:]):
+            collecting_store = stride if north_empty else 0
+            seeds = sum(pits[collecting_store + 1:collecting_store + stride])
+            pits[collecting_store + 1:collecting_store + stride] = bytes(holes)
+            pits[collecting_store] += seeds
+
+        board.rehash()
 
         # Return the side which is next to move
         if sow_hole == 0 and (move.side == Side.NORTH or north_moved):
@@ -280,17 +427,25 @@ class MancalaEnv(object):
             next_states.append((action, clone))
         return next_states
 
-    def __hash__(self) -> int:
-        primes = [2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41, 43, 47, 53, 59, 61, 67, 71, 73, 79, 83, 89, 97,
-                  101, 103, 107, 109, 113, 127, 131, 137, 139, 149, 151, 157, 163]
+    @property
+    def key(self) -> int:
+        """The 64-bit Zobrist key of the position: the seeds on the board, the side to move and north_moved."""
+        key = self._board.key
+        if self._side_to_move is Side.SOUTH:
+            key ^= zobrist.SOUTH_TO_MOVE
+        if self._north_moved:
+            key ^= zobrist.NORTH_MOVED
+        return key
+
+    def __eq__(self, other):
+        """Two states are equal if they are the same position. The side we play (our_side) is not compared."""
+        return isinstance(other, MancalaEnv) \
+            and self._board.pits == other._board.pits \
+            and self._side_to_move == other._side_to_move \
+            and self._north_moved == other._north_moved
 
-        hashkey = 0
-        hashkey += primes[0] * Side.get_index(self.side_to_move)
-        hashkey += primes[1] * int(self.north_moved)
-        for hole in range(self.board.holes + 1):
-            hashkey += primes[2 + hole] * self.board.board[0][hole]
-            hashkey += primes[10 + hole] * self.board.board[1][hole]
-        return hashkey
+    def __hash__(self) -> int:
+        return self.key
 
     def __str__(self):
         return "%s" % self.board
@@ -346,16 +501,14 @@ def compute_score_capture_by(game, side: Side):
 
 def compute_double_moves_score(game, side: Side):
     board = game.board
+    pits = board.pits
+    base = board.offset(side)
     score = 0
     for hole in range(1, board.holes + 1):
-        if board.holes + 1 - hole == board.get_seeds(side, hole):
+        if board.holes + 1 - hole == pits[base + hole]:
             score += 1
     return score
 
 
 def compute_seeds_on_side(game, side: Side):
-    board = game.board
-    seeds = 0
-    for hole in range(1, board.holes + 1):
-        seeds += board.get_seeds(side, hole)
-    return seeds
\ No newline at end of file
+    return game.board.side_seeds[Side.get_index(side)]
\ No newline at end of file
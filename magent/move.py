@@ -1,19 +1,42 @@
-from copy import deepcopy
-
 from magent.side import Side
 
+# A move can also be encoded as a small int action: the index of the side in bit 3 and the hole in bits 0-2.
+_SIDE_SHIFT = 3
+_MAX_INDEX = 7
+
 
 class Move(object):
     # Move represents a whole (if greater than 1) or the pie action if 0.
+    __slots__ = ('_side', '_index', '_action')
+
     def __init__(self, side: Side, index: int):
-        if index < 0 or index > 7:
+        if index < 0 or index > _MAX_INDEX:
             raise ValueError('Move number must be strictly greater than 0 and less than 8')
 
         self._side = side
         self._index = index
+        self._action = encode_action(side, index)
+
+    @staticmethod
+    def of(side: Side, index: int):
+        """Returns the shared instance of the move. Moves are immutable, so this never needs to allocate."""
+        if index < 0 or index > _MAX_INDEX:
+            raise ValueError('Move number must be strictly greater than 0 and less than 8')
+        return _MOVES[encode_action(side, index)]
+
+    @staticmethod
+    def from_action(action: int):
+        """Returns the shared instance of the move encoded by action."""
+        return _MOVES[action]
 
     def clone(self):
-        return deepcopy(self)
+        return self
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
 
     @property
     def side(self) -> Side:
@@ -23,16 +46,38 @@ class Move(object):
     def index(self) -> int:
         return self._index
 
+    @property
+    def action(self) -> int:
+        return self._action
+
     def __str__(self) -> str:
         return "Side: %s; Hole: %d" % (Side.side_to_str(self.side), self.index)
 
     def __eq__(self, other):
-        return isinstance(other, self.__class__) \
-               and self.side == other.side \
-               and Side.get_index(self.side) == Side.get_index(other.side)
+        return isinstance(other, self.__class__) and self._action == other._action
 
     def __hash__(self) -> int:
-        return self.index + (Side.get_index(self.side) * 10)
+        return self._action
 
     def __repr__(self) -> str:
         return "Side: %s; Hole: %d" % (Side.side_to_str(self.side), self.index)
+
+
+def encode_action(side: Side, index: int) -> int:
+    return (Side.get_index(side) << _SIDE_SHIFT) | index
+
+
+def decode_action(action: int) -> (Side, int):
+    side = Side.NORTH if action >> _SIDE_SHIFT == Side.get_index(Side.NORTH) else Side.SOUTH
+    return side, action & _MAX_INDEX
+
+
+_MOVES = tuple(Move(*decode_action(action)) for action in range(2 << _SIDE_SHIFT))
+
+# MOVES_OF_SIDE[side index][hole] is the shared move of that side
+MOVES_OF_SIDE = (_MOVES[:1 << _SIDE_SHIFT], _MOVES[1 << _SIDE_SHIFT:])
+
+# HOLES_IN_MASK[mask] lists the holes whose bit is set in a legal moves bitmask (bit 0 is the pie move), so callers
+# can loop over the legal moves without building a list
+HOLES_IN_MASK = tuple(tuple(hole for hole in range(_MAX_INDEX + 1) if mask >> hole & 1)
+                      for mask in range(1 << (_MAX_INDEX + 1)))
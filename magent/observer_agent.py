@@ -70,7 +70,7 @@ def _run_game(player: Player, state: MancalaEnv):
                 if move_turn.move == 0:
                     our_side = Side.opposite(our_side)
 
-                move_to_perform = Move(state.side_to_move, move_turn.move)
+                move_to_perform = Move.of(state.side_to_move, move_turn.move)
 
                 observed_state = ObservedState(state=state, action_taken=move_to_perform)
                 both_agent_states.append(observed_state)
@@ -0,0 +1,110 @@
+"""
+Opening book lookup.
+
+The book holds the best move of the positions of the first plies of the game, including the pie rule decision of
+NORTH, found offline by deep searches (see magent.opening_book_builder). Entries are sorted by MancalaEnv.key, and the
+file is memory-mapped and binary searched, so a lookup costs a few page reads.
+
+File layout: a header (magic, number of entries n), then n keys (uint64), n scores (float32, the value of the move
+for the side to move), n move indexes (int8, 0 for the pie move) and n search depths (uint8).
+"""
+import logging
+import os
+import struct
+
+import numpy as np
+
+from magent.move import Move
+
+DEFAULT_PATH = './saved_ckpt/opening.book'
+
+_HEADER = struct.Struct('<8sQ')
+_MAGIC = b'KALAHOB1'
+
+
+class OpeningBook(object):
+    def __init__(self, keys: np.ndarray, scores: np.ndarray, moves: np.ndarray, depths: np.ndarray):
+        self.keys = keys
+        self.scores = scores
+        self.moves = moves
+        self.depths = depths
+
+    def __len__(self):
+        return len(self.keys)
+
+    @staticmethod
+    def empty():
+        return OpeningBook(np.zeros(0, dtype='<u8'), np.zeros(0, dtype='<f4'), np.zeros(0, dtype='i1'),
+                           np.zeros(0, dtype='u1'))
+
+    @staticmethod
+    def open(path: str):
+        """Memory-maps the book at path."""
+        with open(path, 'rb') as file:
+            magic, entries = _HEADER.unpack(file.read(_HEADER.size))
+        if magic != _MAGIC:
+            raise ValueError('{} is not an opening book'.format(path))
+        if entries == 0:
+            return OpeningBook.empty()
+        offset = _HEADER.size
+        sections = []
+        for dtype in ['<u8', '<f4', 'i1', 'u1']:
+            sections.append(np.memmap(path, dtype=dtype, mode='r', offset=offset, shape=(entries,)))
+            offset += entries * np.dtype(dtype).itemsize
+        return OpeningBook(*sections)
+
+    def save(self, path: str):
+        """Writes the book to path. The file is replaced atomically, so readers never see a partial book."""
+        order = np.argsort(self.keys, kind='stable')
+        temp_path = path + '.tmp'
+        with open(temp_path, 'wb') as file:
+            file.write(_HEADER.pack(_MAGIC, len(self)))
+            for section, dtype in [(self.keys, '<u8'), (self.scores, '<f4'), (self.moves, 'i1'), (self.depths, 'u1')]:
+                file.write(np.asarray(section, dtype=dtype)[order].tobytes())
+        os.replace(temp_path, path)
+
+    def find(self, key: int) -> int or None:
+        """Returns the position of the entry with the given key, or None if there is no such entry."""
+        position = int(np.searchsorted(self.keys, np.uint64(key)))
+        if position < len(self.keys) and self.keys[position] == key:
+            return position
+        return None
+
+    def lookup(self, state) -> Move or None:
+        """Returns the book move for state, or None if state is not in the book."""
+        position = self.find(state.key)
+        if position is None:
+            return None
+        move = Move.of(state.side_to_move, int(self.moves[position]))
+        # Guard against key collisions with positions that are not in the book
+        if not state.is_legal(move):
+            return None
+        return move
+
+
+# The book used by lookup, if one was loaded
+_book = None
+
+
+def load(path: str = DEFAULT_PATH) -> bool:
+    """Memory-maps the book at path for lookup to use. Returns False if the file does not exist."""
+    global _book
+    try:
+        _book = OpeningBook.open(path)
+    except FileNotFoundError:
+        logging.warning('No opening book at %s' % path)
+        return False
+    logging.info('Loaded opening book %s: %d positions' % (path, len(_book)))
+    return True
+
+
+def unload():
+    global _book
+    _book = None
+
+
+def lookup(state) -> Move or None:
+    """Looks state up in the loaded book; None if no book is loaded or state is not in it."""
+    if _book is None:
+        return None
+    return _book.lookup(state)
@@ -0,0 +1,106 @@
+"""
+Builds or extends the opening book read by magent.opening_book.
+
+Run from the repository root: python -m magent.opening_book_builder --plies 3 --depth 6
+
+Every position reachable in fewer than --plies moves from the start of the game (so with the default of 2, the start
+position and the pie rule decision after each first move of SOUTH) is searched with AlphaBeta to --depth, one
+position per worker process. Positions already in the book from a search at least as deep are kept, so the book can
+be extended incrementally with more plies or deeper searches.
+"""
+import argparse
+import logging
+import os
+import time
+from multiprocessing import Pool
+
+import numpy as np
+
+from magent.mancala import MancalaEnv
+from magent.move import Move
+from magent.opening_book import DEFAULT_PATH, OpeningBook
+from magent.side import Side
+from magent.treesearch.alphabeta.alphabeta import AlphaBeta
+
+parser = argparse.ArgumentParser(description="Build or extend the opening book")
+parser.add_argument('--plies', default=2, type=int, help="Add the positions reachable in fewer than this many moves")
+parser.add_argument('-d', '--depth', default=6, type=int, help="Depth of the AlphaBeta search of each position")
+parser.add_argument('-o', '--output', default=DEFAULT_PATH, type=str, help="Path of the book; extended if it exists")
+parser.add_argument('-p', '--processes', default=os.cpu_count(), type=int, help="Number of worker processes")
+
+
+def opening_lines(plies: int) -> [[int]]:
+    """
+    Returns one line of play (a list of move actions from the start) for every distinct position reachable in fewer
+    than plies moves that is not over.
+    """
+    lines = []
+    seen = set()
+    frontier = [[]]
+    for _ in range(plies):
+        next_frontier = []
+        for line in frontier:
+            state = _replay(line)
+            if state.key in seen or state.is_game_over():
+                continue
+            seen.add(state.key)
+            lines.append(line)
+            next_frontier.extend(line + [action] for action in state.get_legal_actions())
+        frontier = next_frontier
+    return lines
+
+
+def _replay(line: [int]) -> MancalaEnv:
+    state = MancalaEnv()
+    for action in line:
+        state.perform_move(Move.from_action(action))
+    return state
+
+
+def _search(task) -> (int, int, float):
+    line, depth = task
+    state = _replay(line)
+    move, value = AlphaBeta(depth=depth).evaluate(state)
+    # Book scores are from the point of view of the side to move
+    score = value if state.side_to_move == Side.SOUTH else -value
+    return state.key, move.index, score
+
+
+def extend(book: OpeningBook, plies: int, depth: int, processes: int) -> OpeningBook:
+    """Returns book with the positions of the first plies searched to depth, unless already searched as deep."""
+    tasks = []
+    for line in opening_lines(plies):
+        position = book.find(_replay(line).key)
+        if position is None or book.depths[position] < depth:
+            tasks.append((line, depth))
+    logging.info('Searching %d positions to depth %d' % (len(tasks), depth))
+
+    if processes > 1:
+        with Pool(processes) as pool:
+            results = pool.map(_search, tasks, chunksize=1)
+    else:
+        results = [_search(task) for task in tasks]
+
+    entries = {int(key): (float(score), int(move), int(entry_depth))
+               for key, score, move, entry_depth in zip(book.keys, book.scores, book.moves, book.depths)}
+    for key, move, score in results:
+        entries[key] = (score, move, depth)
+    keys = sorted(entries)
+    return OpeningBook(np.array(keys, dtype='<u8'),
+                       np.array([entries[key][0] for key in keys], dtype='<f4'),
+                       np.array([entries[key][1] for key in keys], dtype='i1'),
+                       np.array([entries[key][2] for key in keys], dtype='u1'))
+
+
+def main():
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(message)s')
+    book = OpeningBook.open(args.output) if os.path.exists(args.output) else OpeningBook.empty()
+    start = time.time()
+    book = extend(book, args.plies, args.depth, args.processes)
+    book.save(args.output)
+    logging.info('Wrote %d positions to %s in %.1fs' % (len(book), args.output, time.time() - start))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+"""
+Precomputed sowing tables.
+
+Where the seeds of a hole end up only depends on the board geometry, the hole and the number of seeds in it, so
+every possible sowing is worked out once per number of holes. make_move then adds a short list of increments to the
+board and checks for a capture, instead of walking the board seed by seed.
+"""
+from collections import namedtuple
+from functools import lru_cache
+
+# The outcome of sowing all the seeds of one hole on an otherwise empty board.
+#   increments: (pit, seeds) pairs to add to the board, after the sown hole has been emptied
+#   store: the store of the moving side
+#   extra_turn: True if the last seed lands in that store
+#   landing: the pit the last seed lands in
+#   opposite: the pit opposite to landing if landing is a hole of the moving side (a possible capture), else -1
+#   side_seeds: (NORTH, SOUTH) seeds sown in the holes of each side, stores excluded
+#   filled: (NORTH, SOUTH) bitmasks of the holes of each side that receive seeds, bit i for hole i
+Sowing = namedtuple("Sowing", ["increments", "store", "extra_turn", "landing", "opposite", "side_seeds", "filled"])
+
+# Pits hold bytes, so no hole can ever hold more seeds than this
+_MAX_SEEDS = 255
+
+
+class SowingTable(object):
+    """All the sowings of a board with the given number of holes, indexed as sowings[pit][seeds]."""
+
+    def __init__(self, holes: int):
+        self.holes = holes
+        stride = holes + 1
+        self.sowings = [None] * (2 * stride)
+        for own_store in (0, stride):
+            for hole in range(1, stride):
+                self.sowings[own_store + hole] = [None] + [_sow(holes, own_store, hole, seeds)
+                                                           for seeds in range(1, _MAX_SEEDS + 1)]
+
+
+def _sow(holes: int, own_store: int, hole: int, seeds: int) -> Sowing:
+    stride = holes + 1
+    opp_store = stride - own_store
+    # Place seeds in all holes excepting the opponent's store
+    rounds, remaining_seeds = divmod(seeds, 2 * holes + 1)
+    counts = [rounds] * (2 * stride)
+    counts[opp_store] = 0
+
+    # Walk the remaining seeds around the board like make_move_reference does
+    sow_store = own_store
+    sow_hole = hole
+    for _ in range(remaining_seeds):
+        sow_hole += 1
+        if sow_hole == 1:
+            sow_store = stride - sow_store
+        if sow_hole > holes:
+            if sow_store == own_store:
+                sow_hole = 0
+                counts[own_store] += 1
+                continue
+            else:
+                sow_store = own_store
+                sow_hole = 1
+        counts[sow_store + sow_hole] += 1
+    # After whole rounds only, the last seed lands back in the sown hole
+    landing = sow_store + sow_hole
+
+    increments = tuple((pit, count) for pit, count in enumerate(counts) if count > 0)
+    on_own_side = own_store < landing < own_store + stride
+    opposite = opp_store + stride - (landing - own_store) if on_own_side else -1
+    side_seeds = tuple(sum(counts[store + 1:store + stride]) for store in (0, stride))
+    filled = tuple(sum(1 << hole for hole in range(1, stride) if counts[store + hole] > 0) for store in (0, stride))
+    return Sowing(increments, own_store, landing == own_store, landing, opposite, side_seeds, filled)
+
+
+@lru_cache(maxsize=None)
+def sowing_table(holes: int) -> SowingTable:
+    """Returns the (shared) sowing table of boards with the given number of holes."""
+    return SowingTable(holes)
@@ -0,0 +1,133 @@
+"""
+Endgame tablebase lookup.
+
+A tablebase holds the exact outcome of every position with at most max_seeds seeds left in the holes, solved offline
+by magent.tablebase_builder. Seeds in the stores never move again, so a position is identified by the holes alone and
+its value is the number of the seeds in play that the side to move ends up with, minus the number its opponent ends
+up with, under perfect play from both sides. The pie move is never available in an endgame, so north_moved is assumed.
+
+Positions are stored from the point of view of the side to move: its holes first, then the holes of its opponent.
+The positions with n seeds in play follow the ones with fewer seeds and are ranked among themselves with the
+combinatorial number system (the seeds and the boundaries between holes are a combination of positions), so the
+value of a position is a single signed byte in a file that is memory-mapped instead of loaded.
+"""
+import logging
+import mmap
+import struct
+
+from magent.side import Side
+
+DEFAULT_PATH = './saved_ckpt/endgame.tb'
+
+# File header: magic, number of holes per side, maximum number of seeds in play
+_HEADER = struct.Struct('<8sBB6x')
+_MAGIC = b'KALAHTB1'
+
+
+def binomials(size: int) -> [[int]]:
+    """Returns the table of binomial coefficients C[n][k] for n and k less than size."""
+    table = [[0] * size for _ in range(size)]
+    for n in range(size):
+        table[n][0] = 1
+        for k in range(1, n + 1):
+            table[n][k] = table[n - 1][k - 1] + table[n - 1][k]
+    return table
+
+
+class Tablebase(object):
+    """The values of all positions with up to max_seeds seeds in the holes of a board with the given holes."""
+
+    def __init__(self, holes: int, max_seeds: int, values):
+        if max_seeds > 127:
+            raise ValueError('Values are stored in a signed byte, so there can be at most 127 seeds in play')
+        self.holes = holes
+        self.max_seeds = max_seeds
+        # values[index(parts)]; a memoryview of signed bytes
+        self.values = values
+        self.binomial = binomials(max_seeds + 2 * holes + 1)
+
+    @staticmethod
+    def size(holes: int, max_seeds: int) -> int:
+        """The number of positions in a tablebase, i.e. the number of bytes of its values."""
+        return binomials(max_seeds + 2 * holes + 1)[max_seeds + 2 * holes][2 * holes]
+
+    @staticmethod
+    def header(holes: int, max_seeds: int) -> bytes:
+        return _HEADER.pack(_MAGIC, holes, max_seeds)
+
+    @staticmethod
+    def open(path: str, writable: bool = False):
+        """Memory-maps the tablebase file at path."""
+        with open(path, 'r+b' if writable else 'rb') as file:
+            data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_WRITE if writable else mmap.ACCESS_READ)
+        magic, holes, max_seeds = _HEADER.unpack_from(data)
+        if magic != _MAGIC:
+            raise ValueError('{} is not a tablebase file'.format(path))
+        values = memoryview(data)[_HEADER.size:].cast('b')
+        if len(values) != Tablebase.size(holes, max_seeds):
+            raise ValueError('{} is truncated'.format(path))
+        return Tablebase(holes, max_seeds, values)
+
+    def offset(self, seeds: int) -> int:
+        """Returns the index of the first position with the given seeds in play; those with fewer seeds come first."""
+        last = 2 * self.holes - 1
+        return self.binomial[seeds + last][last + 1]
+
+    def index(self, parts, seeds: int) -> int:
+        """
+        Returns the position of the value of parts in values. parts are the seeds in the 2 * holes holes, those of
+        the side to move first, and seeds is their sum.
+        """
+        binomial = self.binomial
+        index = self.offset(seeds)
+        prefix = 0
+        for i in range(2 * self.holes - 1):
+            prefix += parts[i]
+            index += binomial[prefix + i][i + 1]
+        return index
+
+    def probe(self, board, side: Side) -> int or None:
+        """
+        Returns the value of the holes of board with side to move, or None if there are too many seeds in play or
+        the board does not have the same number of holes.
+        """
+        holes = self.holes
+        if board.holes != holes:
+            return None
+        side_seeds = board.side_seeds
+        seeds = side_seeds[0] + side_seeds[1]
+        if seeds > self.max_seeds:
+            return None
+        pits = board.pits
+        own = board.offset(side) + 1
+        opp = board.offset(Side.opposite(side)) + 1
+        return self.values[self.index(pits[own:own + holes] + pits[opp:opp + holes], seeds)]
+
+
+# The tablebase used by MancalaEnv.probe_tablebase, if one was loaded
+_tablebase = None
+
+
+def load(path: str = DEFAULT_PATH) -> bool:
+    """Memory-maps the tablebase at path for probe to use. Returns False if the file does not exist."""
+    global _tablebase
+    try:
+        _tablebase = Tablebase.open(path)
+    except FileNotFoundError:
+        logging.warning('No endgame tablebase at %s' % path)
+        return False
+    logging.info('Loaded endgame tablebase %s: %d holes, up to %d seeds' % (path, _tablebase.holes,
+                                                                            _tablebase.max_seeds))
+    return True
+
+
+def unload():
+    global _tablebase
+    _tablebase = None
+
+
+def probe(board, side: Side) -> int or None:
+    """Probes the loaded tablebase; None if no tablebase is loaded or the position is not in it."""
+    if _tablebase is None:
+        return None
+    return _tablebase.probe(board, side)
@@ -0,0 +1,165 @@
+"""
+Builds the endgame tablebase read by magent.tablebase.
+
+Run from the repository root: python -m magent.tablebase_builder --max-seeds 8
+
+Positions are solved by retrograde analysis, from the end of the game backwards. Seeds in play never increase, and a
+move that keeps all of them in play only moves seeds of the side to move towards its store. So if W is the sum of
+seeds * hole number over both sides (hole numbers counted from each side's own first hole), every move either takes
+seeds out of play or strictly increases W. Solving the positions by increasing number of seeds, and by decreasing W
+among positions with the same number of seeds, means the values of all the children of a position are known when it
+is solved. Positions with the same seeds and W do not depend on each other, so each such group is split between the
+processes of a pool, which write their values straight into the memory-mapped output file.
+"""
+import argparse
+import itertools
+import logging
+import os
+import time
+from array import array
+from multiprocessing import Pool
+
+from magent.board import Board
+from magent.mancala import MancalaEnv
+from magent.move import Move
+from magent.side import Side, NORTH_INDEX, SOUTH_INDEX
+from magent.tablebase import DEFAULT_PATH, Tablebase
+
+parser = argparse.ArgumentParser(description="Build the endgame tablebase")
+parser.add_argument('-k', '--max-seeds', default=8, type=int, help="Solve all positions with up to this many seeds "
+                                                                  "in the holes (the file has C(k + 14, 14) bytes)")
+parser.add_argument('--holes', default=7, type=int, help="Number of holes per side")
+parser.add_argument('-o', '--output', default=DEFAULT_PATH, type=str, help="Path of the tablebase file")
+parser.add_argument('-p', '--processes', default=os.cpu_count(), type=int, help="Number of worker processes")
+
+# Groups smaller than this are solved by the main process, where handing them to the pool costs more than it saves
+_MIN_PARALLEL_GROUP = 2048
+
+# The tablebase being built, opened for writing in each worker
+_tablebase = None
+
+
+def _open_tablebase(path: str):
+    global _tablebase
+    _tablebase = Tablebase.open(path, writable=True)
+
+
+def unrank(tablebase: Tablebase, seeds: int, rank: int) -> [int]:
+    """The inverse of Tablebase.index: returns the parts of the position with the given rank among those with seeds."""
+    binomial = tablebase.binomial
+    last = 2 * tablebase.holes - 1
+    prefixes = [0] * last
+    p = seeds + last - 1
+    for i in range(last - 1, -1, -1):
+        while binomial[p][i + 1] > rank:
+            p -= 1
+        rank -= binomial[p][i + 1]
+        prefixes[i] = p - i
+        p -= 1
+    parts = [prefixes[0]] + [prefixes[i] - prefixes[i - 1] for i in range(1, last)]
+    parts.append(seeds - prefixes[-1])
+    return parts
+
+
+def solve(tablebase: Tablebase, parts: [int]) -> int:
+    """
+    Returns the value of the position given by parts (the side to move first). The values of its children must
+    already be in the tablebase.
+    """
+    holes = tablebase.holes
+    own, opp = parts[:holes], parts[holes:]
+    own_seeds, opp_seeds = sum(own), sum(opp)
+    if own_seeds == 0 or opp_seeds == 0:
+        # The game is over: each side collects the seeds left on its side
+        return own_seeds - opp_seeds
+
+    # The side to move plays SOUTH, so the opponent's holes are the NORTH row
+    start = bytes([0]) + bytes(opp) + bytes([0]) + bytes(own)
+    board = Board(holes, 0)
+    best = None
+    for hole in range(1, holes + 1):
+        if own[hole - 1] == 0:
+            continue
+        board.pits[:] = start
+        board.rehash()
+        next_side = MancalaEnv.make_move(board, Move.of(Side.SOUTH, hole), True)
+        pits = board.pits
+        value = pits[holes + 1] - pits[0]
+        side_seeds = board.side_seeds
+        seeds = side_seeds[NORTH_INDEX] + side_seeds[SOUTH_INDEX]
+        if seeds > 0:
+            south = pits[holes + 2:]
+            north = pits[1:holes + 1]
+            if next_side == Side.SOUTH:
+                value += tablebase.values[tablebase.index(south + north, seeds)]
+            else:
+                value -= tablebase.values[tablebase.index(north + south, seeds)]
+        if best is None or value > best:
+            best = value
+    return best
+
+
+def _solve_ranks(task) -> int:
+    seeds, ranks = task
+    tablebase = _tablebase
+    offset = tablebase.offset(seeds)
+    for rank in ranks:
+        tablebase.values[offset + rank] = solve(tablebase, unrank(tablebase, seeds, rank))
+    return len(ranks)
+
+
+def _groups(tablebase: Tablebase, seeds: int) -> [(int, array)]:
+    """Returns the ranks of the positions with the given seeds grouped by W, by decreasing W."""
+    holes = tablebase.holes
+    binomial = tablebase.binomial
+    weights = list(range(1, holes + 1)) * 2
+    last = 2 * holes - 1
+    groups = {}
+    # Each position is a choice of the positions of the last boundaries among seeds + last slots
+    for bars in itertools.combinations(range(seeds + last), last):
+        rank = 0
+        weight = 0
+        previous = -1
+        for i, bar in enumerate(bars):
+            rank += binomial[bar][i + 1]
+            weight += weights[i] * (bar - previous - 1)
+            previous = bar
+        weight += weights[last] * (seeds + last - previous - 1)
+        groups.setdefault(weight, array('q')).append(rank)
+    return sorted(groups.items(), reverse=True)
+
+
+def build(path: str, holes: int, max_seeds: int, processes: int):
+    with open(path, 'wb') as file:
+        file.write(Tablebase.header(holes, max_seeds))
+        file.truncate(len(Tablebase.header(holes, max_seeds)) + Tablebase.size(holes, max_seeds))
+
+    _open_tablebase(path)
+    pool = Pool(processes, initializer=_open_tablebase, initargs=(path,)) if processes > 1 else None
+    try:
+        for seeds in range(max_seeds + 1):
+            start = time.time()
+            solved = 0
+            for _, ranks in _groups(_tablebase, seeds):
+                if pool is None or len(ranks) < _MIN_PARALLEL_GROUP:
+                    solved += _solve_ranks((seeds, ranks))
+                else:
+                    chunk = -(-len(ranks) // (4 * processes))
+                    tasks = [(seeds, ranks[i:i + chunk]) for i in range(0, len(ranks), chunk)]
+                    solved += sum(pool.map(_solve_ranks, tasks))
+            logging.info('Solved %d positions with %d seeds in %.1fs' % (solved, seeds, time.time() - start))
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+    _tablebase.values.obj.flush()
+
+
+def main():
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(message)s')
+    build(args.output, args.holes, args.max_seeds, args.processes)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,44 +1,329 @@
+import logging
+import time
+
 import numpy as np
 
 from magent.mancala import MancalaEnv
-from magent.move import Move
+from magent.move import Move, MOVES_OF_SIDE, HOLES_IN_MASK
 from magent.side import Side
+from magent.treesearch.alphabeta.transposition import TranspositionTable, EXACT, LOWER, UPPER
 from magent.treesearch.treesearch import TreeSearch
 
+# Move ordering classes, tried from the highest
+_ORDER_BEST = 4
+_ORDER_EXTRA_TURN = 3
+_ORDER_CAPTURE = 2
+_ORDER_KILLER = 1
+_ORDER_QUIET = 0
+
+# The clock is checked once every this many nodes
+_TIME_CHECK_NODES = 1024
+
+# Most moves the quiescence search makes past the horizon, extra turns included
+_QUIESCENCE_PLIES = 8
+
+
+class _SearchTimeout(Exception):
+    pass
+
 
 class AlphaBeta(TreeSearch):
-    def __init__(self, depth):
+    """
+    Minimax with alpha-beta pruning over the utility of SOUTH (see MancalaEnv.get_player_utility): SOUTH maximises
+    and NORTH minimises. An extra turn does not use up depth, since the same side is still to move.
+
+    The search deepens iteratively from depth 1 to depth. If time_sec is given, it stops when the time is up and
+    returns the best move of the last depth it completed; depth 1 is always completed, however short the time.
+    Moves are tried in order: the best move of the previous depth at the root or the best move stored in the
+    transposition table, moves that end in the store (an extra turn), captures, the killer moves of the ply and then
+    the moves with the best history of cutoffs.
+
+    Results are kept in a transposition table of tt_memory_mb megabytes (none if it is 0), which lives as long as the
+    search object, so later searches reuse it.
+
+    With quiescence, a position at the horizon in the middle of a capture or an extra turn chain is not scored as it
+    is: the search goes on over the noisy moves only (see _noisy_moves), and the side to move can always stand pat
+    on the utility of the position instead.
+    """
+
+    def __init__(self, depth, time_sec: float = None, tt_memory_mb: float = 16, quiescence: bool = False):
         self.depth = depth
+        self.time_sec = time_sec
+        self.quiescence = quiescence
+        self.table = TranspositionTable(tt_memory_mb) if tt_memory_mb > 0 else None
+        # Statistics of the last search
+        self.nodes = 0
+        self.completed_depth = 0
+        # Beta cutoffs, how many of them came from the first move tried and the nodes answered by the table
+        self.cutoffs = 0
+        self.first_move_cutoffs = 0
+        self.tt_cutoffs = 0
+        self._deadline = None
+        # _killers[ply] holds the last two moves that caused a cutoff at that distance from the root
+        self._killers = []
+        # _history[side index][hole] grows with the depth of the cutoffs caused by the move
+        self._history = None
 
     def search(self, game: MancalaEnv) -> Move:
-        values = [(a, self._alpha_beta_search(game=state, depth=self.depth)) for a, state in game.next_states()]
-        np.random.shuffle(values)
-
-        if game.side_to_move == Side.SOUTH:
-            action, _ = max(values, key=lambda x: x[1])
-        else:
-            action, _ = min(values, key=lambda x: x[1])
+        action, _ = self.evaluate(game)
         return action
 
-    @staticmethod
-    def _alpha_beta_search(game: MancalaEnv, alpha=-np.inf, beta=np.inf, depth=5):
+    def evaluate(self, game: MancalaEnv) -> (Move, float):
+        """Returns the best move and its value, the utility for SOUTH (see MancalaEnv.get_player_utility)."""
+        self._start_search(game)
+        best_move, best_value = game.get_legal_moves()[0], None
+        deadline = self._deadline
+        for depth in range(1, self.depth + 1):
+            # Depth 1 is searched without the clock, so that there is always a move with a value to return
+            self._deadline = None if depth == 1 else deadline
+            try:
+                # A search that runs out of time leaves its moves applied, so every depth gets its own copy
+                best_move, best_value = self._search_root(MancalaEnv.clone(game), depth, best_move)
+            except _SearchTimeout:
+                break
+            self.completed_depth = depth
+        self._deadline = deadline
+        logging.debug(self.statistics())
+        return best_move, best_value
+
+    def _start_search(self, game: MancalaEnv):
+        """Resets the statistics, the clock, the killer moves and the history for a search of game."""
+        self.nodes = 0
+        self.completed_depth = 0
+        self.cutoffs = 0
+        self.first_move_cutoffs = 0
+        self.tt_cutoffs = 0
+        if self.table is not None:
+            self.table.reset_statistics()
+        self._deadline = None if self.time_sec is None else time.perf_counter() + self.time_sec
+        self._killers = []
+        self._history = [[0] * (game.board.holes + 1) for _ in range(2)]
+
+    def statistics(self) -> str:
+        """Describes the last search: nodes, depth, how well the moves were ordered and how often the table hit."""
+        first_move_rate = self.first_move_cutoffs / self.cutoffs if self.cutoffs > 0 else 0.0
+        hit_rate = self.table.hit_rate() if self.table is not None else 0.0
+        return 'AlphaBeta: depth %d, %d nodes, %d cutoffs (%.0f%% by the first move), TT hit rate %.0f%%, ' \
+               '%d TT cutoffs' % (self.completed_depth, self.nodes, self.cutoffs, 100 * first_move_rate,
+                                  100 * hit_rate, self.tt_cutoffs)
+
+    def _search_root(self, state: MancalaEnv, depth: int, first: Move) -> (Move, float):
+        maximizing = state.side_to_move == Side.SOUTH
+        alpha, beta = -np.inf, np.inf
+        best_move, best_value = None, None
+        for move in self._ordered_moves(state, 0, first):
+            record = state.apply_move(move)
+            value = self._alpha_beta_search(state, alpha, beta, self._child_depth(state, record, depth), 1)
+            state.undo_move(record)
+            if best_move is None or (value > best_value if maximizing else value < best_value):
+                best_move, best_value = move, value
+                if maximizing:
+                    alpha = max(alpha, value)
+                else:
+                    beta = min(beta, value)
+        if self.table is not None:
+            self.table.store(state.key, depth, best_value, EXACT, best_move.index)
+        return best_move, best_value
+
+    def _alpha_beta_search(self, game: MancalaEnv, alpha, beta, depth: int, ply: int):
         """Search game to determine best action; use alpha-beta pruning.
-        This version cuts off search and uses an evaluation function."""
-        if depth == 0 or game.is_game_over():
-            return game.get_player_utility()
+        This version cuts off search and uses an evaluation function.
+        The moves are made and taken back on game itself, which is left unchanged on return."""
+        self._count_node()
+        utility = self._static_utility(game, depth, alpha, beta)
+        if utility is not None:
+            return utility
 
+        table = self.table
+        first = None
+        if table is not None:
+            key = game.key
+            entry = table.probe(key)
+            if entry >= 0:
+                if table.moves[entry] >= 0:
+                    first = Move.of(game.side_to_move, table.moves[entry])
+                if table.depths[entry] >= depth:
+                    score = table.scores[entry]
+                    bound = table.bounds[entry]
+                    if bound == EXACT or (bound == LOWER and score >= beta) or (bound == UPPER and score <= alpha):
+                        self.tt_cutoffs += 1
+                        return score
+        alpha_before, beta_before = alpha, beta
+
+        best_move = None
+        tried = 0
         if game.side_to_move == Side.SOUTH:
             v = -np.inf
-            for (_, new_s) in game.next_states():
-                v = max(v, AlphaBeta._alpha_beta_search(new_s, alpha, beta, depth - 1))
+            for move in self._ordered_moves(game, ply, first):
+                record = game.apply_move(move)
+                value = self._alpha_beta_search(game, alpha, beta, self._child_depth(game, record, depth), ply + 1)
+                game.undo_move(record)
+                tried += 1
+                if value > v:
+                    v, best_move = value, move
                 alpha = max(alpha, v)
-                # if beta <= alpha:
-                #     break
+                if beta <= alpha:
+                    self._record_cutoff(game, move, depth, ply, tried)
+                    break
         else:
             v = np.inf
-            for (_, new_s) in game.next_states():
-                v = min(v, AlphaBeta._alpha_beta_search(new_s, alpha, beta, depth - 1))
+            for move in self._ordered_moves(game, ply, first):
+                record = game.apply_move(move)
+                value = self._alpha_beta_search(game, alpha, beta, self._child_depth(game, record, depth), ply + 1)
+                game.undo_move(record)
+                tried += 1
+                if value < v:
+                    v, best_move = value, move
+                beta = min(beta, v)
+                if beta <= alpha:
+                    self._record_cutoff(game, move, depth, ply, tried)
+                    break
+
+        if table is not None:
+            if v <= alpha_before:
+                bound = UPPER
+            elif v >= beta_before:
+                bound = LOWER
+            else:
+                bound = EXACT
+            table.store(key, depth, v, bound, best_move.index)
+        return v
+
+    def _count_node(self):
+        self.nodes += 1
+        if self._deadline is not None and self.nodes % _TIME_CHECK_NODES == 0 \
+                and time.perf_counter() > self._deadline:
+            raise _SearchTimeout()
+
+    def _static_utility(self, game: MancalaEnv, depth: int, alpha, beta) -> float or None:
+        """Returns the utility of game if the search stops there, or None if it has to go on. alpha and beta are the
+        window of the search for SOUTH, which bounds the quiescence search at the horizon."""
+        utility = self._terminal_utility(game)
+        if utility is not None or depth > 0:
+            return utility
+        if self.quiescence:
+            return self._quiescence(game, alpha, beta, _QUIESCENCE_PLIES)
+        return game.get_player_utility()
+
+    @staticmethod
+    def _terminal_utility(game: MancalaEnv) -> float or None:
+        """Returns the utility of game if the result of the game is known, or None."""
+        if game.is_game_over():
+            return game.get_player_utility()
+        # The tablebase gives the end of the game with perfect play, which is better than any cut off estimate
+        final_reward = game.probe_tablebase()
+        if final_reward is not None:
+            final_state = MancalaEnv.clone(game)
+            final_state.finish_game(final_reward)
+            return final_state.get_player_utility()
+        return None
+
+    def _quiescence(self, game: MancalaEnv, alpha, beta, plies: int) -> float:
+        """Alpha-beta over the noisy moves of game only, for at most plies moves. The side to move may also stand
+        pat, so the value is never worse for it than the utility of game."""
+        stand_pat = game.get_player_utility()
+        if plies == 0:
+            return stand_pat
+        maximizing = game.side_to_move == Side.SOUTH
+        if maximizing:
+            if stand_pat >= beta:
+                return stand_pat
+            alpha = max(alpha, stand_pat)
+        else:
+            if stand_pat <= alpha:
+                return stand_pat
+            beta = min(beta, stand_pat)
+
+        v = stand_pat
+        for move in self._noisy_moves(game):
+            record = game.apply_move(move)
+            self._count_node()
+            value = self._terminal_utility(game)
+            if value is None:
+                value = self._quiescence(game, alpha, beta, plies - 1)
+            game.undo_move(record)
+            if maximizing:
+                v = max(v, value)
+                alpha = max(alpha, v)
+            else:
+                v = min(v, value)
                 beta = min(beta, v)
-                # if beta <= alpha:
-                #     break
+            if beta <= alpha:
+                break
         return v
+
+    @staticmethod
+    def _noisy_moves(game: MancalaEnv) -> [Move]:
+        """The moves of game that end in the store (an extra turn) and then the captures, the largest first.
+
+        These are the moves that compute_double_moves_score and compute_score_capture_by count in the utility, found
+        here from the sowing table, which also knows the sowings that go round the board."""
+        board = game.board
+        pits = board.pits
+        sowings = board.sowing.sowings
+        side_index = Side.get_index(game.side_to_move)
+        base = board.offset(game.side_to_move)
+        moves = MOVES_OF_SIDE[side_index]
+
+        noisy = []
+        for index in HOLES_IN_MASK[game.get_legal_moves_bitmask() & ~1]:
+            source = base + index
+            sowing = sowings[source][pits[source]]
+            if sowing.extra_turn:
+                noisy.append((_ORDER_EXTRA_TURN, 0, index))
+            elif sowing.opposite >= 0 and pits[sowing.landing] == 0 and pits[sowing.opposite] > 0:
+                noisy.append((_ORDER_CAPTURE, pits[sowing.opposite], index))
+        noisy.sort(reverse=True)
+        return [moves[index] for _, _, index in noisy]
+
+    @staticmethod
+    def _child_depth(game: MancalaEnv, record, depth: int) -> int:
+        # After an extra turn the same side moves again, which does not count as a ply
+        if game.side_to_move == record.side_to_move:
+            return depth
+        return depth - 1
+
+    def _record_cutoff(self, game: MancalaEnv, move: Move, depth: int, ply: int, tried: int):
+        self.cutoffs += 1
+        if tried == 1:
+            self.first_move_cutoffs += 1
+        killers = self._killers[ply]
+        if killers[0] != move:
+            killers[1] = killers[0]
+            killers[0] = move
+        self._history[Side.get_index(game.side_to_move)][move.index] += depth * depth
+
+    def _ordered_moves(self, game: MancalaEnv, ply: int, first: Move = None) -> [Move]:
+        while len(self._killers) <= ply:
+            self._killers.append([None, None])
+        killers = self._killers[ply]
+
+        board = game.board
+        pits = board.pits
+        sowings = board.sowing.sowings
+        side_index = Side.get_index(game.side_to_move)
+        base = board.offset(game.side_to_move)
+        history = self._history[side_index]
+        moves = MOVES_OF_SIDE[side_index]
+
+        ordered = []
+        for index in HOLES_IN_MASK[game.get_legal_moves_bitmask()]:
+            move = moves[index]
+            order = _ORDER_QUIET
+            gain = history[index]
+            if move is first:
+                order = _ORDER_BEST
+            elif index > 0:
+                source = base + index
+                sowing = sowings[source][pits[source]]
+                if sowing.extra_turn:
+                    order = _ORDER_EXTRA_TURN
+                elif sowing.opposite >= 0 and pits[sowing.landing] == 0 and pits[sowing.opposite] > 0:
+                    # The landing hole is empty, so (unless the sowing goes all the way round) this is a capture
+                    order = _ORDER_CAPTURE
+                    gain = pits[sowing.opposite]
+                elif move is killers[0] or move is killers[1]:
+                    order = _ORDER_KILLER
+            ordered.append((order, gain, index))
+        ordered.sort(reverse=True)
+        return [moves[index] for _, _, index in ordered]
@@ -0,0 +1,119 @@
+import os
+import time
+from multiprocessing import Pool
+
+import numpy as np
+
+from magent.board import Board
+from magent.mancala import MancalaEnv
+from magent.move import Move
+from magent.side import Side
+from magent.treesearch.alphabeta.alphabeta import AlphaBeta, _SearchTimeout
+from magent.treesearch.alphabeta.transposition import EXACT
+
+# Shallower depths are searched in the calling process: they take less time than handing out the moves
+_MIN_PARALLEL_DEPTH = 3
+
+# The AlphaBeta of each worker process, with its own transposition table
+_engine = None
+
+
+def _start_worker(tt_memory_mb: float, quiescence: bool):
+    global _engine
+    _engine = AlphaBeta(depth=0, tt_memory_mb=tt_memory_mb, quiescence=quiescence)
+
+
+def _position(pits: bytes, side_to_move: Side, north_moved: bool) -> MancalaEnv:
+    state = MancalaEnv()
+    board = Board(len(pits) // 2 - 1, 0)
+    board.pits[:] = pits
+    board.rehash()
+    state.board = board
+    state.side_to_move = side_to_move
+    state.north_moved = north_moved
+    return state
+
+
+def _search_move(task) -> (float or None, int):
+    """Searches one root move in a worker. Returns the value, or None if the time ran out, and the nodes searched."""
+    pits, side_to_move, north_moved, action, depth, alpha, beta, deadline = task
+    state = _position(pits, side_to_move, north_moved)
+    _engine._start_search(state)
+    if deadline is not None:
+        # The deadline is on the wall clock, which unlike perf_counter is the same in every process
+        _engine._deadline = time.perf_counter() + deadline - time.time()
+    record = state.apply_move(Move.from_action(action))
+    try:
+        value = _engine._alpha_beta_search(state, alpha, beta, _engine._child_depth(state, record, depth), 1)
+    except _SearchTimeout:
+        value = None
+    return value, _engine.nodes
+
+
+class ParallelAlphaBeta(AlphaBeta):
+    """
+    AlphaBeta that splits the root between worker processes, young brothers wait style: at each depth the first
+    move in order (the eldest brother, usually the best move of the previous depth) is searched here with the full
+    window, and then the other moves are searched at the same time by the workers, with the window the eldest
+    brother's value leaves open.
+
+    All the younger brothers get the same window, so the result does not depend on the order the workers finish in:
+    they are merged in move order and a move has to be strictly better than the earlier ones to be chosen, as in
+    AlphaBeta. Without transposition tables (tt_memory_mb=0) the move and value are those of AlphaBeta; otherwise
+    each worker has its own table of tt_memory_mb megabytes.
+
+    There are workers processes (one per core by default), started by the first search and kept until close().
+    """
+
+    def __init__(self, depth, time_sec: float = None, tt_memory_mb: float = 16, quiescence: bool = False,
+                 workers: int = None):
+        super(ParallelAlphaBeta, self).__init__(depth, time_sec, tt_memory_mb, quiescence)
+        if workers is None:
+            workers = os.cpu_count() or 1
+        if workers < 1:
+            raise ValueError('There has to be at least one worker')
+        self.workers = workers
+        self._tt_memory_mb = tt_memory_mb
+        self._pool = None
+
+    def close(self):
+        """Stops the worker processes."""
+        if self._pool is not None:
+            self._pool.terminate()
+            self._pool.join()
+            self._pool = None
+
+    def _search_root(self, state: MancalaEnv, depth: int, first: Move) -> (Move, float):
+        moves = self._ordered_moves(state, 0, first)
+        if self.workers == 1 or depth < _MIN_PARALLEL_DEPTH or len(moves) == 1:
+            return super(ParallelAlphaBeta, self)._search_root(state, depth, first)
+        maximizing = state.side_to_move == Side.SOUTH
+
+        best_move = moves[0]
+        record = state.apply_move(best_move)
+        best_value = self._alpha_beta_search(state, -np.inf, np.inf, self._child_depth(state, record, depth), 1)
+        state.undo_move(record)
+
+        alpha, beta = (best_value, np.inf) if maximizing else (-np.inf, best_value)
+        deadline = None if self._deadline is None else time.time() + self._deadline - time.perf_counter()
+        position = (bytes(state.board.pits), state.side_to_move, state.north_moved)
+        tasks = [position + (move.action, depth, alpha, beta, deadline) for move in moves[1:]]
+        results = self._get_pool().map(_search_move, tasks, chunksize=1)
+
+        timed_out = False
+        for move, (value, nodes) in zip(moves[1:], results):
+            self.nodes += nodes
+            if value is None:
+                timed_out = True
+            elif value > best_value if maximizing else value < best_value:
+                best_move, best_value = move, value
+        if timed_out:
+            raise _SearchTimeout()
+        if self.table is not None:
+            self.table.store(state.key, depth, best_value, EXACT, best_move.index)
+        return best_move, best_value
+
+    def _get_pool(self) -> Pool:
+        if self._pool is None:
+            self._pool = Pool(self.workers, initializer=_start_worker, initargs=(self._tt_memory_mb, self.quiescence))
+        return self._pool
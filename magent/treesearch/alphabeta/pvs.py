@@ -0,0 +1,236 @@
+import numpy as np
+
+from magent.mancala import MancalaEnv
+from magent.move import Move
+from magent.side import Side
+from magent.treesearch.alphabeta.alphabeta import AlphaBeta
+from magent.treesearch.alphabeta.transposition import BoundCache, EXACT, LOWER, UPPER
+
+# MancalaEnv.get_player_utility is always a multiple of this, so it is the width of a null window
+_GRAIN = 0.5
+
+# Half width of the first aspiration window around the value of the previous depth
+_ASPIRATION_WINDOW = 4.0
+
+
+def _side_sign(game: MancalaEnv) -> int:
+    """Negamax values are for the side to move; the utility is for SOUTH."""
+    return 1 if game.side_to_move == Side.SOUTH else -1
+
+
+def _south_window(game: MancalaEnv, alpha, beta) -> tuple:
+    """The negamax window (alpha, beta) of the side to move, as a window on the utility of SOUTH."""
+    return (alpha, beta) if game.side_to_move == Side.SOUTH else (-beta, -alpha)
+
+
+class PrincipalVariationSearch(AlphaBeta):
+    """
+    Negamax version of AlphaBeta with principal variation search: the first move of a node is searched with the full
+    window and the others with a null window, which only proves that they are no better; a move that turns out
+    better is searched again. Each depth of the iterative deepening starts with an aspiration window around the
+    value of the previous one and widens it if the value falls outside.
+
+    Move ordering, the transposition table (which holds values for the side to move), quiescence, the time budget and
+    the statistics are those of AlphaBeta.
+    """
+
+    def __init__(self, depth, time_sec: float = None, tt_memory_mb: float = 16, quiescence: bool = False):
+        super(PrincipalVariationSearch, self).__init__(depth, time_sec, tt_memory_mb, quiescence)
+        self._previous_value = None
+
+    def evaluate(self, game: MancalaEnv) -> (Move, float):
+        self._previous_value = None
+        return super(PrincipalVariationSearch, self).evaluate(game)
+
+    def _search_root(self, state: MancalaEnv, depth: int, first: Move) -> (Move, float):
+        if self._previous_value is None:
+            alpha, beta = -np.inf, np.inf
+        else:
+            alpha, beta = self._previous_value - _ASPIRATION_WINDOW, self._previous_value + _ASPIRATION_WINDOW
+        while True:
+            move, value = self._search_root_window(state, depth, first, alpha, beta)
+            if value <= alpha:
+                alpha = -np.inf
+            elif value >= beta:
+                beta = np.inf
+            else:
+                break
+        self._previous_value = value
+        return move, _side_sign(state) * value
+
+    def _search_root_window(self, state: MancalaEnv, depth: int, first: Move, alpha, beta) -> (Move, float):
+        best_move, best_value = None, -np.inf
+        for move in self._ordered_moves(state, 0, first):
+            record = state.apply_move(move)
+            child_depth = self._child_depth(state, record, depth)
+            if best_move is None:
+                value = self._child_value(state, record, alpha, beta, child_depth, 1)
+            else:
+                value = self._child_value(state, record, alpha, alpha + _GRAIN, child_depth, 1)
+                if alpha < value < beta:
+                    value = self._child_value(state, record, alpha, beta, child_depth, 1)
+            state.undo_move(record)
+            if best_move is None or value > best_value:
+                best_move, best_value = move, value
+            alpha = max(alpha, value)
+            if alpha >= beta:
+                break
+        return best_move, best_value
+
+    def _child_value(self, game: MancalaEnv, record, alpha, beta, depth: int, ply: int) -> float:
+        """The value of the move of record for the side that made it. After an extra turn that side moves again."""
+        if game.side_to_move == record.side_to_move:
+            return self._pvs(game, alpha, beta, depth, ply)
+        return -self._pvs(game, -beta, -alpha, depth, ply)
+
+    def _pvs(self, game: MancalaEnv, alpha, beta, depth: int, ply: int) -> float:
+        self._count_node()
+        utility = self._static_utility(game, depth, *_south_window(game, alpha, beta))
+        if utility is not None:
+            return _side_sign(game) * utility
+
+        table = self.table
+        first = None
+        if table is not None:
+            key = game.key
+            entry = table.probe(key)
+            if entry >= 0:
+                if table.moves[entry] >= 0:
+                    first = Move.of(game.side_to_move, table.moves[entry])
+                if table.depths[entry] >= depth:
+                    score = table.scores[entry]
+                    bound = table.bounds[entry]
+                    if bound == EXACT or (bound == LOWER and score >= beta) or (bound == UPPER and score <= alpha):
+                        self.tt_cutoffs += 1
+                        return score
+        alpha_before = alpha
+
+        best_move, best_value = None, -np.inf
+        tried = 0
+        for move in self._ordered_moves(game, ply, first):
+            record = game.apply_move(move)
+            child_depth = self._child_depth(game, record, depth)
+            if tried == 0:
+                value = self._child_value(game, record, alpha, beta, child_depth, ply + 1)
+            else:
+                value = self._child_value(game, record, alpha, alpha + _GRAIN, child_depth, ply + 1)
+                if alpha < value < beta:
+                    value = self._child_value(game, record, alpha, beta, child_depth, ply + 1)
+            game.undo_move(record)
+            tried += 1
+            if value > best_value:
+                best_move, best_value = move, value
+            alpha = max(alpha, value)
+            if alpha >= beta:
+                self._record_cutoff(game, move, depth, ply, tried)
+                break
+
+        if table is not None:
+            if best_value <= alpha_before:
+                bound = UPPER
+            elif best_value >= beta:
+                bound = LOWER
+            else:
+                bound = EXACT
+            table.store(key, depth, best_value, bound, best_move.index)
+        return best_value
+
+
+class MTDF(AlphaBeta):
+    """
+    MTD(f): finds the value of each depth with a series of null window alpha-beta searches, starting from the value
+    of the previous depth and moving a bound each time, until the lower and upper bounds meet. The searches revisit
+    the same positions many times, so the bounds found for each position are kept in a BoundCache.
+
+    Move ordering, quiescence, the time budget and the statistics are those of AlphaBeta; it does not use AlphaBeta's
+    transposition table.
+    """
+
+    def __init__(self, depth, time_sec: float = None, cache_entries: int = 2 ** 20, quiescence: bool = False):
+        super(MTDF, self).__init__(depth, time_sec, tt_memory_mb=0, quiescence=quiescence)
+        self.bounds = BoundCache(cache_entries)
+        self._previous_value = None
+        self._root_move = None
+
+    def evaluate(self, game: MancalaEnv) -> (Move, float):
+        self._previous_value = None
+        return super(MTDF, self).evaluate(game)
+
+    def _search_root(self, state: MancalaEnv, depth: int, first: Move) -> (Move, float):
+        if self._previous_value is None:
+            guess = _side_sign(state) * state.get_player_utility()
+        else:
+            guess = self._previous_value
+        lower, upper = -np.inf, np.inf
+        best_move = first
+        while lower < upper:
+            beta = guess + _GRAIN if guess == lower else guess
+            self._root_move = best_move
+            guess = self._memory_search(state, beta - _GRAIN, beta, depth, 0)
+            if guess < beta:
+                upper = guess
+            else:
+                lower = guess
+                # Only a pass that fails high proves that its best move reaches the value
+                best_move = self._root_move
+        self._previous_value = guess
+        return best_move, _side_sign(state) * guess
+
+    def _child_value(self, game: MancalaEnv, record, alpha, beta, depth: int, ply: int) -> float:
+        if game.side_to_move == record.side_to_move:
+            return self._memory_search(game, alpha, beta, depth, ply)
+        return -self._memory_search(game, -beta, -alpha, depth, ply)
+
+    def _memory_search(self, game: MancalaEnv, alpha, beta, depth: int, ply: int) -> float:
+        """Fail-soft negamax alpha-beta that stores the bounds it proves in the bound cache."""
+        self._count_node()
+        utility = self._static_utility(game, depth, *_south_window(game, alpha, beta))
+        if utility is not None:
+            return _side_sign(game) * utility
+
+        key = game.key
+        entry = self.bounds.get(key)
+        first = self._root_move if ply == 0 else None
+        if entry is not None:
+            if entry[3] >= 0 and ply > 0:
+                first = Move.of(game.side_to_move, entry[3])
+            # Bounds are only valid for the depth they were found at; the root always searches to find its move
+            if entry[0] == depth and ply > 0:
+                if entry[1] >= beta:
+                    self.tt_cutoffs += 1
+                    return entry[1]
+                if entry[2] <= alpha:
+                    self.tt_cutoffs += 1
+                    return entry[2]
+                alpha = max(alpha, entry[1])
+                beta = min(beta, entry[2])
+
+        best_move, best_value = None, -np.inf
+        a = alpha
+        tried = 0
+        for move in self._ordered_moves(game, ply, first):
+            record = game.apply_move(move)
+            value = self._child_value(game, record, a, beta, self._child_depth(game, record, depth), ply + 1)
+            game.undo_move(record)
+            tried += 1
+            if value > best_value:
+                best_move, best_value = move, value
+            a = max(a, value)
+            if a >= beta:
+                self._record_cutoff(game, move, depth, ply, tried)
+                break
+        if ply == 0:
+            self._root_move = best_move
+
+        if entry is None or entry[0] != depth:
+            lower, upper = -np.inf, np.inf
+        else:
+            lower, upper = entry[1], entry[2]
+        if best_value <= alpha:
+            upper = best_value
+        elif best_value >= beta:
+            lower = best_value
+        else:
+            lower = upper = best_value
+        self.bounds.put(key, depth, lower, upper, best_move.index)
+        return best_value
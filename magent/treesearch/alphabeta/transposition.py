@@ -0,0 +1,104 @@
+from array import array
+
+# Bound types of the stored scores
+EXACT = 0
+LOWER = 1  # the score is a lower bound: the search failed high
+UPPER = 2  # the score is an upper bound: the search failed low
+
+# Bytes per entry: key, score, depth, bound and move
+ENTRY_BYTES = 8 + 8 + 1 + 1 + 1
+
+
+class TranspositionTable(object):
+    """
+    Fixed-size table of search results keyed by MancalaEnv.key, stored in flat typed arrays so that the whole table
+    fits in memory_mb megabytes.
+
+    Each bucket has two entries: the first keeps the deepest search of the positions mapped to the bucket and the
+    second is always replaced. A new result goes to the first entry if it is at least as deep (the entry it displaces
+    moves to the second one), and to the second entry otherwise.
+    """
+
+    def __init__(self, memory_mb: float = 16):
+        entries = int(memory_mb * 2 ** 20) // ENTRY_BYTES
+        buckets = 1
+        while buckets * 4 <= entries:
+            buckets *= 2
+        self._mask = buckets - 1
+        self.size = 2 * buckets
+        self.keys = array('Q', [0]) * self.size
+        self.scores = array('d', [0.0]) * self.size
+        # A depth of -1 marks an empty entry
+        self.depths = array('b', [-1]) * self.size
+        self.bounds = array('B', [EXACT]) * self.size
+        self.moves = array('b', [-1]) * self.size
+        self.probes = 0
+        self.hits = 0
+
+    def clear(self):
+        for entry in range(self.size):
+            self.depths[entry] = -1
+
+    def probe(self, key: int) -> int:
+        """Returns the entry of the position with the given key, or -1 if it is not in the table."""
+        self.probes += 1
+        entry = (key & self._mask) << 1
+        if self.keys[entry] != key or self.depths[entry] < 0:
+            entry += 1
+            if self.keys[entry] != key or self.depths[entry] < 0:
+                return -1
+        self.hits += 1
+        return entry
+
+    def store(self, key: int, depth: int, score: float, bound: int, move: int):
+        """Stores a search result; move is the index of the best move, or -1 if there is none."""
+        entry = (key & self._mask) << 1
+        depths = self.depths
+        if depth >= depths[entry] or self.keys[entry] == key:
+            if self.keys[entry] != key and depths[entry] >= 0:
+                self._copy(entry, entry + 1)
+        else:
+            entry += 1
+        self.keys[entry] = key
+        self.scores[entry] = score
+        depths[entry] = min(depth, 127)
+        self.bounds[entry] = bound
+        self.moves[entry] = move
+
+    def _copy(self, source: int, target: int):
+        self.keys[target] = self.keys[source]
+        self.scores[target] = self.scores[source]
+        self.depths[target] = self.depths[source]
+        self.bounds[target] = self.bounds[source]
+        self.moves[target] = self.moves[source]
+
+    def hit_rate(self) -> float:
+        return self.hits / self.probes if self.probes > 0 else 0.0
+
+    def reset_statistics(self):
+        self.probes = 0
+        self.hits = 0
+
+
+class BoundCache(object):
+    """
+    Lower and upper bounds on the value of positions at a given depth, keyed by MancalaEnv.key, for searches that
+    narrow in on a value with many null window passes (MTD(f)). Holds at most max_entries positions and is emptied
+    when it is full.
+    """
+
+    def __init__(self, max_entries: int = 2 ** 20):
+        self.max_entries = max_entries
+        # key -> [depth, lower bound, upper bound, best move index or -1]
+        self.entries = {}
+
+    def get(self, key: int) -> list or None:
+        return self.entries.get(key)
+
+    def put(self, key: int, depth: int, lower: float, upper: float, move: int):
+        if len(self.entries) >= self.max_entries and key not in self.entries:
+            self.entries.clear()
+        self.entries[key] = [depth, lower, upper, move]
+
+    def clear(self):
+        self.entries.clear()
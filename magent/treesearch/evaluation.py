@@ -39,11 +39,9 @@ def _defend_seeds(state: MancalaEnv, parent_side: Side) -> int:
 
 
 def _stones_in_holes_diff(state: MancalaEnv, parent_side: Side) -> int:
-    our_seeds = 0
-    their_seeds = 0
-    for i in range(1, state.board.holes + 1, 1):
-        our_seeds += state.board.get_seeds(parent_side, i)
-        their_seeds += state.board.get_seeds_op(parent_side, i)
+    side_seeds = state.board.side_seeds
+    our_seeds = side_seeds[Side.get_index(parent_side)]
+    their_seeds = side_seeds[Side.get_index(Side.opposite(parent_side))]
     reward = our_seeds - their_seeds
 
     return reward
@@ -76,23 +74,33 @@ _weight_capture_weight = 0.5
 
 
 def _can_put_last_seed_here(state: MancalaEnv, parent_side: Side, index_of_last_hole: int) -> bool:
+    pits = state.board.pits
+    base = state.board.offset(parent_side)
     for i in range(1, index_of_last_hole, 1):
-        if state.board.get_seeds(parent_side, i) == index_of_last_hole - i:
+        if pits[base + i] == index_of_last_hole - i:
             return True
     return False
 
 
 def _compute_holes_captures(state: MancalaEnv, parent_side: Side) -> int:
+    board = state.board
+    pits = board.pits
+    base = board.offset(parent_side)
+    # The hole opposite to hole i of parent_side is at op_base - i
+    op_base = board.offset(Side.opposite(parent_side), board.holes + 1)
     results = 0
-    for i in range(1, state.board.holes + 1, 1):
-        if state.board.get_seeds(parent_side, i) == 0 and _can_put_last_seed_here(state, parent_side, i):
-            results += state.board.get_seeds_op(parent_side, i) + 1
+    for i in range(1, board.holes + 1, 1):
+        if pits[base + i] == 0 and _can_put_last_seed_here(state, parent_side, i):
+            results += pits[op_base - i] + 1
     return results
 
 
 def _can_get_extra_turn(state: MancalaEnv, parent_side: Side) -> bool:
-    for i in range(1, state.board.holes + 1, 1):
-        if state.board.get_seeds(parent_side, i) == state.board.holes + 1 - i:
+    pits = state.board.pits
+    holes = state.board.holes
+    base = state.board.offset(parent_side)
+    for i in range(1, holes + 1, 1):
+        if pits[base + i] == holes + 1 - i:
             return True
     return False
 
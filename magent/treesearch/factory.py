@@ -1,19 +1,40 @@
 from magent.treesearch.alphabeta.alphabeta import AlphaBeta
+from magent.treesearch.alphabeta.parallel import ParallelAlphaBeta
+from magent.treesearch.alphabeta.pvs import PrincipalVariationSearch, MTDF
+from magent.treesearch.mcts.arena_mcts import ArenaMCTS, PUCT
 from magent.treesearch.mcts.mcts import MCTS
-from magent.treesearch.mcts.policies.default_policy import MonteCarloDefaultPolicy, AlphaGoDefaultPolicy
+from magent.treesearch.mcts.policies.default_policy import MonteCarloDefaultPolicy, BatchMonteCarloDefaultPolicy, \
+    AlphaGoDefaultPolicy, DefaultPolicy
 from magent.treesearch.mcts.policies.rollout_policy import MonteCarloRollOutPolicy, AlphaGoRollOutPolicy
 from magent.treesearch.mcts.policies.tree_policy import MonteCarloTreePolicy, AlphaGoTreePolicy
+from magent.treesearch.mcts.root_parallel import RootParallelMCTS
+from magent.treesearch.mcts.tree_parallel import TreeParallelMCTS
 from magent.treesearch.treesearch import TreeSearch
-from models.client import A3Client
+from models.network_client import NetworkClient
 
 
 class TreesFactory(object):
-    """Factory class to load various MCTS configurations."""
+    """
+    Factory class to load various MCTS configurations.
+
+    playouts is the number of games the Monte Carlo searches play from each leaf: one by default, or that many at once
+    with BatchMonteCarloDefaultPolicy. workers is the number of processes of a root-parallel search
+    (RootParallelMCTS) or of ParallelAlphaBeta. The searches with workers keep their processes between moves: the
+    caller has to call close() on the search when it is done with it.
+    """
+
+    @staticmethod
+    def monte_carlo_default_policy(playouts: int = 1) -> DefaultPolicy:
+        if playouts > 1:
+            return BatchMonteCarloDefaultPolicy(playouts)
+        return MonteCarloDefaultPolicy()
 
     @staticmethod
-    def standard_mcts() -> TreeSearch:
+    def standard_mcts(playouts: int = 1, workers: int = 1) -> TreeSearch:
+        if workers > 1:
+            return RootParallelMCTS(time_sec=20, workers=workers, playouts=playouts)
         return MCTS(tree_policy=MonteCarloTreePolicy(),
-                    default_policy=MonteCarloDefaultPolicy(),
+                    default_policy=TreesFactory.monte_carlo_default_policy(playouts),
                     rollout_policy=MonteCarloRollOutPolicy(),
                     time_sec=20)
 
@@ -32,12 +53,35 @@ class TreesFactory(object):
                     time_sec=sec)
 
     @staticmethod
-    def alpha_mcts(network_client: A3Client) -> TreeSearch:
+    def alpha_mcts(network_client: NetworkClient) -> TreeSearch:
         return MCTS(tree_policy=AlphaGoTreePolicy(network_client),
                     default_policy=AlphaGoDefaultPolicy(network_client),
                     rollout_policy=AlphaGoRollOutPolicy(network_client),
                     time_sec=30)
 
     @staticmethod
-    def alpha_beta() -> TreeSearch:
-        return AlphaBeta(depth=5)
+    def tree_parallel_mcts(network_client: NetworkClient, batch_size: int = 16) -> TreeSearch:
+        return TreeParallelMCTS(network_client, time_sec=30, batch_size=batch_size)
+
+    @staticmethod
+    def arena_mcts(playouts: int = 1) -> TreeSearch:
+        return ArenaMCTS(default_policy=TreesFactory.monte_carlo_default_policy(playouts), time_sec=20)
+
+    @staticmethod
+    def arena_alpha_mcts(network_client: NetworkClient) -> TreeSearch:
+        return ArenaMCTS(default_policy=AlphaGoDefaultPolicy(network_client), time_sec=30, selection=PUCT,
+                         network=network_client)
+
+    @staticmethod
+    def alpha_beta(workers: int = 1) -> TreeSearch:
+        if workers > 1:
+            return ParallelAlphaBeta(depth=5, quiescence=True, workers=workers)
+        return AlphaBeta(depth=5, quiescence=True)
+
+    @staticmethod
+    def pvs() -> TreeSearch:
+        return PrincipalVariationSearch(depth=5, quiescence=True)
+
+    @staticmethod
+    def mtdf() -> TreeSearch:
+        return MTDF(depth=5, quiescence=True)
@@ -0,0 +1,128 @@
+import datetime
+import logging
+from random import choice
+
+import numpy as np
+
+from magent.mancala import MancalaEnv
+from magent.move import Move, MOVES_OF_SIDE, HOLES_IN_MASK
+from magent.side import Side, NORTH_INDEX, SOUTH_INDEX
+from magent.treesearch.mcts.graph import node_utils
+from magent.treesearch.mcts.graph.arena import NodeArena
+from magent.treesearch.mcts.graph.node import Node
+from magent.treesearch.mcts.policies.default_policy import DefaultPolicy
+from magent.treesearch.mcts.policies.tree_policy import rave_value
+from magent.treesearch.treesearch import TreeSearch
+from models.network_client import NetworkClient
+
+# Selection rules
+UCT = 'uct'
+RAVE = 'rave'
+PUCT = 'puct'
+
+
+class ArenaMCTS(TreeSearch):
+    """
+    MCTS with the tree in a NodeArena, so that the statistics of the children of a node are array slices and
+    selection scores them all at once (see the vectorized rules in node_utils).
+
+    With RAVE (the default) it searches like MCTS with MonteCarloTreePolicy: the unvisited children of a node are
+    tried first, in random order, and then the child with the best rave_scores is followed. UCT follows uct_scores
+    instead. PUCT searches like AlphaGoTreePolicy and needs the network: the children of a node are created with the
+    move probabilities of the network as priors, and the child with the best puct_scores is followed. Simulations are
+    played by default_policy and their rewards are backpropagated as MonteCarloRollOutPolicy does.
+    """
+
+    def __init__(self, default_policy: DefaultPolicy, time_sec: int, selection: str = RAVE,
+                 network: NetworkClient = None, capacity: int = 2 ** 14):
+        if selection not in (UCT, RAVE, PUCT):
+            raise ValueError('Unknown selection rule: %s' % selection)
+        if selection == PUCT and network is None:
+            raise ValueError('PUCT selection needs a network')
+        self.default_policy = default_policy
+        self.calculation_time = datetime.timedelta(seconds=time_sec)
+        self.selection = selection
+        self.network = network
+        self.arena = NodeArena(capacity)
+        # Statistics of the last search
+        self.simulations = 0
+
+    def search(self, state: MancalaEnv) -> Move:
+        # short circuit last move
+        if len(state.get_legal_moves()) == 1:
+            return state.get_legal_moves()[0]
+
+        arena = self.arena
+        root = arena.add_root(MancalaEnv.clone(state))
+        start_time = datetime.datetime.utcnow()
+        self.simulations = 0
+        while datetime.datetime.utcnow() - start_time < self.calculation_time:
+            node, leaf_state = self._select(root)
+            final_state = self.default_policy.simulate(Node(state=leaf_state))
+            self._backpropagate(node, final_state)
+            self.simulations += 1
+        logging.debug("ArenaMCTS: %d simulations, %d nodes of %d bytes" % (self.simulations, arena.size,
+                                                                          arena.node_bytes))
+
+        children = arena.children(root)
+        chosen_child = children.start + int(np.argmax(arena.visits[children]))
+        move = MOVES_OF_SIDE[Side.get_index(state.side_to_move)][arena.moves[chosen_child]]
+        logging.info("Choosing: %s; visits: %d" % (move, arena.visits[chosen_child]))
+        return move
+
+    def _select(self, node: int) -> (int, MancalaEnv):
+        """Goes down from node to the node to simulate from; returns it and its state."""
+        arena = self.arena
+        while True:
+            if arena.first_child[node] < 0:
+                state = arena.state(node)
+                legal_moves = state.get_legal_moves_bitmask()
+                if legal_moves == 0:
+                    return node, state
+                self._expand(node, state, legal_moves)
+
+            children = arena.children(node)
+            visits = arena.visits[children]
+            if self.selection == PUCT:
+                scores = node_utils.puct_scores(arena.rewards[children], visits, arena.priors[children],
+                                                arena.visits[node])
+                child = children.start + int(np.argmax(scores))
+                if arena.visits[child] == 0:
+                    return child, arena.state(child)
+            else:
+                unvisited = np.flatnonzero(visits == 0)
+                if len(unvisited) > 0:
+                    child = children.start + int(choice(unvisited))
+                    state = arena.state(child)
+                    if self.selection == RAVE:
+                        arena.values[child] = rave_value(state)
+                    return child, state
+                if self.selection == RAVE:
+                    scores = node_utils.rave_scores(arena.rewards[children], visits, arena.values[children],
+                                                    arena.visits[node])
+                else:
+                    scores = node_utils.uct_scores(arena.rewards[children], visits, arena.visits[node])
+                child = children.start + int(np.argmax(scores))
+            node = child
+
+    def _expand(self, node: int, state: MancalaEnv, legal_moves: int):
+        if self.selection == PUCT:
+            # As in AlphaGoTreePolicy the network does not play the pie rule
+            indexes = HOLES_IN_MASK[legal_moves & ~1]
+            dist, _ = self.network.evaluate_state(state)
+            self.arena.add_children(node, state, indexes, [dist[index - 1] for index in indexes])
+        else:
+            self.arena.add_children(node, state, HOLES_IN_MASK[legal_moves])
+
+    def _backpropagate(self, node: int, final_state: MancalaEnv):
+        arena = self.arena
+        rewards = {NORTH_INDEX: final_state.compute_end_game_reward(Side.NORTH),
+                   SOUTH_INDEX: final_state.compute_end_game_reward(Side.SOUTH)}
+        child = -1
+        while node >= 0:
+            arena.visits[node] += 1
+            arena.rewards[node] += rewards[arena.movers[node]]
+            # A node is worth at least the value of its best child (see Node.update)
+            if child >= 0 and arena.values[child] > arena.values[node]:
+                arena.values[node] = arena.values[child]
+            child, node = node, arena.parents[node]
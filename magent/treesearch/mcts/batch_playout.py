@@ -0,0 +1,113 @@
+import numpy as np
+
+from magent.batch_mancala import BatchMancalaEnv
+from magent.mancala import MancalaEnv
+from magent.side import Side
+from magent.treesearch import evaluation
+
+# Playout policies
+RANDOM = 'random'
+SOFTMAX = 'softmax'
+
+
+class PlayoutResults(object):
+    """
+    The outcome of a batch of playouts from one position. It stands for the final state of a single playout in
+    backpropagation: compute_end_game_reward is the average of MancalaEnv.compute_end_game_reward over the games.
+    """
+
+    def __init__(self, boards: np.ndarray):
+        # Store of NORTH minus store of SOUTH in every game
+        difference = boards[:, 0, 0].astype(np.int64) - boards[:, 1, 0]
+        north_reward = float(np.mean((difference > 0) + 0.5 * (difference == 0)))
+        self.playouts = len(boards)
+        self._rewards = {Side.NORTH: north_reward, Side.SOUTH: 1.0 - north_reward}
+
+    def compute_end_game_reward(self, side: Side) -> float:
+        return self._rewards[side]
+
+
+class BatchPlayoutEngine(object):
+    """
+    Plays playouts games to the end from the same position at once, stepping them together on a BatchMancalaEnv.
+
+    With RANDOM every game plays a uniformly random legal move. With SOFTMAX the moves are sampled from the softmax of
+    their evaluation.get_score, as in PlayoutEngine: the moves are scored by making every action of every game on a
+    second BatchMancalaEnv, holes + 1 times as large, and scoring all its boards with batch_scores. The playouts do
+    not probe the tablebase on the way, only at the starting position.
+    """
+
+    def __init__(self, playouts: int, policy: str = SOFTMAX, holes: int = 7, rng: np.random.RandomState = None):
+        if playouts < 1:
+            raise ValueError('At least one playout is needed, not %d' % playouts)
+        if policy not in (RANDOM, SOFTMAX):
+            raise ValueError('Unknown playout policy: %s' % policy)
+        self.playouts = playouts
+        self.policy = policy
+        self.holes = holes
+        self._rng = rng or np.random.RandomState()
+        self._games = BatchMancalaEnv(playouts, holes)
+        actions = holes + 1
+        self._successors = BatchMancalaEnv(playouts * actions, holes) if policy == SOFTMAX else None
+        self._actions = np.tile(np.arange(actions), playouts)
+
+    def play(self, state: MancalaEnv) -> PlayoutResults:
+        games = self._games
+        final_reward = state.probe_tablebase()
+        if final_reward is not None:
+            state = MancalaEnv.clone(state)
+            state.finish_game(final_reward)
+        games.load(state)
+        while not games.done.all():
+            mask = games.get_legal_moves_mask()
+            if self.policy == RANDOM:
+                actions = np.argmax(self._rng.random_sample(mask.shape) * mask, axis=1)
+            else:
+                actions = self._sample_softmax(mask)
+            games.step(actions)
+        return PlayoutResults(games.boards)
+
+    def _sample_softmax(self, mask: np.ndarray) -> np.ndarray:
+        games, successors = self._games, self._successors
+        actions = self.holes + 1
+        successors.boards[:] = np.repeat(games.boards, actions, axis=0)
+        successors.side_to_move[:] = np.repeat(games.side_to_move, actions)
+        successors.our_side[:] = np.repeat(games.our_side, actions)
+        successors.north_moved[:] = np.repeat(games.north_moved, actions)
+        # Illegal actions (and all the actions of finished games) are left alone as finished games
+        successors.done[:] = ~mask.ravel()
+        movers = successors.side_to_move.copy()
+        successors.step(self._actions)
+
+        scores = batch_scores(successors.boards, movers, successors.our_side).reshape(mask.shape)
+        scores[~mask] = -np.inf
+        active = mask.any(axis=1)
+        scores[~active] = 0
+        weights = np.exp(scores - scores.max(axis=1, keepdims=True))
+        cumulative = np.cumsum(weights, axis=1)
+        thresholds = self._rng.random_sample(len(mask)) * cumulative[:, -1]
+        return np.argmax(cumulative > thresholds[:, np.newaxis], axis=1)
+
+
+def batch_scores(boards: np.ndarray, sides: np.ndarray, our_sides: np.ndarray) -> np.ndarray:
+    """
+    evaluation.get_score of many states at once: boards are laid out as in BatchMancalaEnv, sides are the indexes of
+    the parent sides and our_sides those of the our_side of the states.
+    """
+    games = np.arange(len(boards))
+    own = boards[games, sides].astype(np.int64)
+    opponent = boards[games, 1 - sides].astype(np.int64)
+    holes = own.shape[1] - 1
+    hole_numbers = np.arange(1, holes + 1)
+
+    # The last seed sown from hole j lands in a later hole i if j holds i - j seeds
+    seeds_to_land = hole_numbers[np.newaxis, :] - hole_numbers[:, np.newaxis]
+    reachable = (own[:, 1:, np.newaxis] == np.where(seeds_to_land > 0, seeds_to_land, -1)).any(axis=1)
+    capturing = reachable & (own[:, 1:] == 0)
+    # Hole i of a side is opposite to hole holes + 1 - i of the other side
+    captures = (capturing * (opponent[:, :0:-1] + 1)).sum(axis=1)
+    reward = captures * evaluation._weight_capture_weight
+    extra_turn = (own[:, 1:] == holes + 1 - hole_numbers).any(axis=1)
+    reward = np.where(extra_turn, reward * evaluation._weight_extra_turn, reward)
+    reward = np.where(sides != our_sides, -reward, reward)
+    return reward + own[:, 0] - opponent[:, 0]
@@ -0,0 +1,128 @@
+import numpy as np
+
+from magent.mancala import MancalaEnv
+from magent.move import MOVES_OF_SIDE
+from magent.side import Side, NORTH_INDEX, SOUTH_INDEX
+
+_SIDES = {NORTH_INDEX: Side.NORTH, SOUTH_INDEX: Side.SOUTH}
+
+# The arrays of a NodeArena, each indexed by node id
+_FIELDS = ('visits', 'rewards', 'priors', 'values', 'parents', 'first_child', 'child_count', 'moves', 'movers', 'pits',
+           'sides_to_move', 'north_moved', 'our_sides')
+
+
+class NodeArena(object):
+    """
+    MCTS tree stored as a struct of arrays: node i is entry i of every array, so a node costs a few dozen bytes
+    instead of a Node object and its MancalaEnv.
+
+    The children of a node are created together, one per legal move, and take consecutive ids from
+    first_child[node] to first_child[node] + child_count[node], so the statistics of all the children of a node are
+    a slice of each array. States are stored packed: the pits of the board (see Board) in a row of pits, and the
+    side to move, north_moved and our_side as side indexes and flags. parent is -1 for the root and first_child is -1
+    for a node that has no children yet.
+
+    The arrays are allocated for capacity nodes and double in size when they are full.
+    """
+
+    def __init__(self, capacity: int = 2 ** 14):
+        self.size = 0
+        self._template = MancalaEnv()
+        self._allocate(capacity)
+
+    def _allocate(self, capacity: int):
+        self.capacity = capacity
+        self.visits = np.zeros(capacity, dtype=np.int32)
+        # Sum of the rewards, for the side that made the move into the node
+        self.rewards = np.zeros(capacity, dtype=np.float64)
+        self.priors = np.zeros(capacity, dtype=np.float32)
+        self.values = np.zeros(capacity, dtype=np.float32)
+        self.parents = np.zeros(capacity, dtype=np.int32)
+        self.first_child = np.zeros(capacity, dtype=np.int32)
+        self.child_count = np.zeros(capacity, dtype=np.int8)
+        # Index of the move into the node and index of the side that made it
+        self.moves = np.zeros(capacity, dtype=np.int8)
+        self.movers = np.zeros(capacity, dtype=np.int8)
+        self.pits = np.zeros((capacity, len(self._template.board.pits)), dtype=np.uint8)
+        self.sides_to_move = np.zeros(capacity, dtype=np.int8)
+        self.north_moved = np.zeros(capacity, dtype=np.bool_)
+        self.our_sides = np.zeros(capacity, dtype=np.int8)
+
+    def _grow(self, needed: int):
+        capacity = self.capacity
+        while capacity < needed:
+            capacity *= 2
+        old = [getattr(self, name) for name in _FIELDS]
+        self._allocate(capacity)
+        for name, array in zip(_FIELDS, old):
+            getattr(self, name)[:self.size] = array[:self.size]
+
+    @property
+    def node_bytes(self) -> int:
+        """Bytes taken by each node."""
+        return sum(getattr(self, name).nbytes for name in _FIELDS) // self.capacity
+
+    def clear(self):
+        self.size = 0
+
+    def add_root(self, state: MancalaEnv) -> int:
+        """Empties the arena and adds state as the root, node 0."""
+        self.size = 0
+        root = self._new_nodes(1)
+        self.parents[root] = -1
+        self.movers[root] = Side.get_index(state.side_to_move)
+        self._write_state(root, state)
+        return root
+
+    def add_children(self, node: int, state: MancalaEnv, indexes: [int], priors=None) -> int:
+        """Adds a child of node for each of the move indexes; state is the state of node. Returns the first child."""
+        first = self._new_nodes(len(indexes))
+        self.first_child[node] = first
+        self.child_count[node] = len(indexes)
+        side_index = Side.get_index(state.side_to_move)
+        moves = MOVES_OF_SIDE[side_index]
+        for child, index in enumerate(indexes, first):
+            record = state.apply_move(moves[index])
+            self._write_state(child, state)
+            state.undo_move(record)
+            self.parents[child] = node
+            self.moves[child] = index
+            self.movers[child] = side_index
+        if priors is not None:
+            self.priors[first:first + len(indexes)] = priors
+        return first
+
+    def children(self, node: int) -> slice:
+        first = self.first_child[node]
+        return slice(first, first + self.child_count[node])
+
+    def state(self, node: int) -> MancalaEnv:
+        """Unpacks the state of node into a new MancalaEnv."""
+        state = MancalaEnv.clone(self._template)
+        board = state.board
+        board.pits[:] = self.pits[node].tobytes()
+        board.rehash()
+        state.side_to_move = _SIDES[self.sides_to_move[node]]
+        state.north_moved = bool(self.north_moved[node])
+        state.our_side = _SIDES[self.our_sides[node]]
+        return state
+
+    def _new_nodes(self, count: int) -> int:
+        first = self.size
+        if first + count > self.capacity:
+            self._grow(first + count)
+        self.size += count
+        nodes = slice(first, self.size)
+        self.visits[nodes] = 0
+        self.rewards[nodes] = 0
+        self.priors[nodes] = 0
+        self.values[nodes] = -1
+        self.first_child[nodes] = -1
+        self.child_count[nodes] = 0
+        return first
+
+    def _write_state(self, node: int, state: MancalaEnv):
+        self.pits[node] = np.frombuffer(state.board.pits, dtype=np.uint8)
+        self.sides_to_move[node] = Side.get_index(state.side_to_move)
+        self.north_moved[node] = state.north_moved
+        self.our_sides[node] = Side.get_index(state.our_side)
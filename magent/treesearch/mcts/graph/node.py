@@ -1,29 +1,55 @@
 from copy import deepcopy
-
-from numpy.ma import sqrt
+from math import sqrt
 
 from magent.mancala import MancalaEnv
-from magent.move import Move
+from magent.move import Move, MOVES_OF_SIDE, HOLES_IN_MASK
+from magent.side import Side
 
 
 class Node(object):
+    """
+    A node of the MCTS graph. A position reached by different orders of moves has a single node (see NodeStore), so
+    a node can be the child of several nodes: move is the move it was first reached with, and parent is the node it
+    was last reached from, which the selection sets on the way down so that backpropagation follows that path.
+
+    proven is the outcome of the node for the side that made the move into it (for the root, the side to move), as
+    compute_end_game_reward gives it: 1 for a win, 0.5 for a draw and 0 for a loss. It is None until the outcome is
+    known: at the end of the game, from the tablebase or, as backpropagation goes up, from the outcomes of the
+    children (see prove).
+    """
+
     def __init__(self, state: MancalaEnv, move: Move = None, parent=None):
         self.visits = 0
         self.reward = 0
         self.state = state
         self.children = []
+        # child_moves[i] is the move from this node to children[i]
+        self.child_moves = []
         self.parent = parent
         self.move = move
         self.value = -1
-        self.unexplored_moves = set(state.get_legal_moves())
+        # Bitmask of the indexes of the legal moves that do not have a child yet
+        self.unexplored_moves = state.get_legal_moves_bitmask()
+        # The NodeStore of the graph, shared by all its nodes; None for a plain tree
+        self.store = parent.store if parent is not None else None
+        self.proven = exact_outcome(state, parent.state.side_to_move if parent is not None else state.side_to_move)
 
     @staticmethod
     def clone(other_node):
         return deepcopy(other_node)
 
-    def put_child(self, child):
+    def put_child(self, child, move: Move = None):
+        """Adds child as the node reached by move (by default the move child was created with)."""
+        if move is None:
+            move = child.move
         self.children.append(child)
-        self.unexplored_moves.remove(child.move)
+        self.child_moves.append(move)
+        self.unexplored_moves &= ~(1 << move.index)
+        child.parent = self
+
+    def move_to(self, child) -> Move:
+        """The move from this node to child."""
+        return self.child_moves[self.children.index(child)]
 
     def update(self, reward):
         self.reward += reward
@@ -31,25 +57,86 @@ class Node(object):
         for child in self.children:
             self.value = max(self.value, child.value)
 
+    def proven_child(self):
+        """
+        Returns the child with the best outcome for the side to move if the outcomes of the children decide the
+        outcome of the node (a winning child, or all the children proven), or None.
+        """
+        best = None
+        decided = self.is_fully_expanded()
+        for child in self.children:
+            if child.proven is None:
+                decided = False
+            elif best is None or child.proven > best.proven:
+                best = child
+        if best is None or (best.proven < 1 and not decided):
+            return None
+        return best
+
+    def prove(self, side: Side):
+        """Sets proven if the outcomes of the children decide it; side is the side that made the move into the node."""
+        if self.proven is not None:
+            return
+        child = self.proven_child()
+        if child is not None:
+            # The children are moves of the side to move, so their outcomes are for it
+            self.proven = child.proven if side == self.state.side_to_move else 1 - child.proven
+
     def is_fully_expanded(self) -> bool:
         """ is_fully_expanded returns true if there are no more moves to explore. """
-        return len(self.unexplored_moves) == 0
+        return self.unexplored_moves == 0
+
+    def get_unexplored_moves(self) -> [Move]:
+        moves = MOVES_OF_SIDE[Side.get_index(self.state.side_to_move)]
+        return [moves[index] for index in HOLES_IN_MASK[self.unexplored_moves]]
 
     def is_terminal(self) -> bool:
         """is_terminal returns true if the node is leaf node"""
-        return len(self.state.get_legal_moves()) == 0
+        return self.state.get_legal_moves_bitmask() == 0
 
     def __str__(self):
         return "Node; Move %s, number of children: %d; visits: %d; reward: %f; value: %f" % (
             self.move, len(self.children), self.visits, self.reward, self.value)
 
 
+def exact_outcome(state: MancalaEnv, side: Side) -> float or None:
+    """The outcome of state for side if the game is over or the tablebase has it, else None."""
+    if state.is_game_over():
+        return state.compute_end_game_reward(side)
+    final_reward = state.probe_tablebase()
+    if final_reward is None:
+        return None
+    if side != state.side_to_move:
+        final_reward = -final_reward
+    if final_reward > 0:
+        return 1
+    elif final_reward < 0:
+        return 0
+    return 0.5
+
+
+class ProvenOutcome(object):
+    """
+    The outcome of a proven node, which stands for the final state of a playout from it in backpropagation:
+    compute_end_game_reward gives the proven outcome for each side.
+    """
+
+    def __init__(self, node: Node):
+        side = node.parent.state.side_to_move if node.parent is not None else node.state.side_to_move
+        self._rewards = {side: node.proven, Side.opposite(side): 1 - node.proven}
+
+    def compute_end_game_reward(self, side: Side) -> float:
+        return self._rewards[side]
+
+
 class AlphaNode(Node):
     def __init__(self, state: MancalaEnv, prior, move: Move = None, parent=None):
         super(AlphaNode, self).__init__(state, move, parent)
         # u(s,a) - probational to prior probability but decays with repeated visits to encourage exploration.
         self.exploration_bonus = prior / (1 + self.visits)  # u(s,a) exploration bonus
         self.prior = prior  # P(s,a) prior probability
+        # Simulations through the node that are not backpropagated yet (see TreeParallelMCTS)
+        self.virtual_losses = 0
 
     def update(self, reward: float, c_puct: int = 5):
         """
@@ -62,7 +149,11 @@ class AlphaNode(Node):
             self.exploration_bonus = c_puct * self.prior * sqrt(self.parent.visits) / (1 + self.visits)
 
     def calculate_action_value(self) -> float:
-        return self.reward + self.exploration_bonus
+        if self.virtual_losses == 0:
+            return self.reward + self.exploration_bonus
+        # Count the pending simulations as visits that were lost, so that other selectors try other paths
+        visits = self.visits + self.virtual_losses
+        return self.reward * self.visits / visits + self.exploration_bonus * (1 + self.visits) / (1 + visits)
 
     def __str__(self):
         return "Node; Move %s, number of children: %d; visits: %d; reward: %f; exploration bonus: %f; prior: %f" % (
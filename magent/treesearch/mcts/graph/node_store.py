@@ -0,0 +1,75 @@
+import sys
+
+from magent.mancala import MancalaEnv
+from magent.treesearch.mcts.graph.node import Node
+
+
+class NodeStore(object):
+    """
+    The nodes of an MCTS graph by position, so that a position reached by different orders of moves is one node with
+    several parents rather than a node per order.
+
+    A node is keyed by MancalaEnv.key, the side of the move into it (the rewards of a node are for that side, see
+    MonteCarloRollOutPolicy.backpropagate) and our_side. The root has no parent and is not stored: the seeds in the
+    stores never go down, so no position can be reached again from below itself.
+    """
+
+    def __init__(self):
+        self.nodes = {}
+        # Statistics: positions looked up by the expansions and how many of them were already in the graph
+        self.lookups = 0
+        self.hits = 0
+        self._node_bytes = None
+
+    @staticmethod
+    def key(state: MancalaEnv, parent: Node) -> tuple:
+        return state.key, parent.state.side_to_move, state.our_side
+
+    def get(self, state: MancalaEnv, parent: Node) -> Node or None:
+        """Returns the node of state as a child of parent, or None if it is not in the graph yet."""
+        self.lookups += 1
+        node = self.nodes.get(NodeStore.key(state, parent))
+        if node is not None:
+            self.hits += 1
+        return node
+
+    def put(self, node: Node):
+        self.nodes[NodeStore.key(node.state, node.parent)] = node
+        if self._node_bytes is None:
+            self._node_bytes = _node_bytes(node)
+
+    def rebuild(self, root: Node):
+        """Keeps only the nodes below root, the new root of the graph."""
+        self.nodes = {}
+        seen = {id(root)}
+        frontier = [root]
+        while frontier:
+            node = frontier.pop()
+            for child in node.children:
+                if id(child) not in seen:
+                    seen.add(id(child))
+                    self.nodes[NodeStore.key(child.state, node)] = child
+                    frontier.append(child)
+
+    def reuse_rate(self) -> float:
+        return self.hits / self.lookups if self.lookups > 0 else 0.0
+
+    def reset_statistics(self):
+        self.lookups = 0
+        self.hits = 0
+
+    def statistics(self) -> str:
+        """Describes the expansions since the statistics were reset: how many found their node in the graph and the
+        memory the nodes they did not create would have taken."""
+        saved_bytes = self.hits * (self._node_bytes or 0)
+        return 'NodeStore: %d nodes, %d of %d expansions reused a node (%.0f%%), about %.1f KB saved' % (
+            len(self.nodes), self.hits, self.lookups, 100 * self.reuse_rate(), saved_bytes / 1024)
+
+
+def _node_bytes(node: Node) -> int:
+    """Approximate size of a leaf node: the node, its attributes and its state."""
+    state = node.state
+    board = state.board
+    parts = [node, node.__dict__, node.children, node.child_moves, state, state.__dict__, board, board.pits,
+             board.side_seeds, board.filled]
+    return sum(sys.getsizeof(part) for part in parts)
@@ -1,5 +1,7 @@
 from math import log, sqrt
 
+import numpy as np
+
 from magent.treesearch.mcts.graph.node import Node, AlphaNode
 
 
@@ -30,7 +32,7 @@ def select_robust_child(node: Node) -> Node:
         raise ValueError('Terminal node; there are no children to select from.')
     elif len(node.children) == 1:
         return node.children[0]
-    return max(node.children, key=lambda child: child.visits)
+    return max(_not_lost(node), key=lambda child: child.visits)
 
 
 def select_secure_child(node: Node) -> Node:
@@ -62,7 +64,12 @@ def rave_selection(node: Node) -> Node:
     elif len(node.children) == 1:
         return node.children[0]
 
-    return max(node.children, key=lambda child: _uct_rave_reward(node, child))
+    return max(_not_lost(node), key=lambda child: _uct_rave_reward(node, child))
+
+
+def _not_lost(node: Node) -> [Node]:
+    """The children of node not proven to lose for the side to move, or all of them if every one is."""
+    return [child for child in node.children if child.proven != 0] or node.children
 
 
 def _uct_rave_reward(root: Node, child: Node, exploration_constant: float = 0.5) -> float:
@@ -71,3 +78,25 @@ def _uct_rave_reward(root: Node, child: Node, exploration_constant: float = 0.5)
 
 def _rave_reward(node: Node, alpha: float = 0.5) -> float:
     return (1 - alpha) * (node.reward / node.visits) + alpha * node.value
+
+
+# Vectorized versions of the selection rules above, for the children of a node in a NodeArena: each takes the arrays
+# of statistics of the children (rewards are sums, as in Node) and returns the score of every child.
+
+def uct_scores(rewards: np.ndarray, visits: np.ndarray, parent_visits: int,
+               exploration_constant: float = 1 / sqrt(2)) -> np.ndarray:
+    """_uct_reward of each child; every child must have been visited."""
+    return rewards / visits + exploration_constant * np.sqrt(2 * log(parent_visits) / visits)
+
+
+def rave_scores(rewards: np.ndarray, visits: np.ndarray, values: np.ndarray, parent_visits: int,
+                exploration_constant: float = 0.5, alpha: float = 0.5) -> np.ndarray:
+    """_uct_rave_reward of each child; every child must have been visited."""
+    exploration = exploration_constant * np.sqrt(log(parent_visits) / visits)
+    return (1 - alpha) * (rewards / visits) + alpha * values + exploration
+
+
+def puct_scores(rewards: np.ndarray, visits: np.ndarray, priors: np.ndarray, parent_visits: int,
+                c_puct: int = 5) -> np.ndarray:
+    """AlphaNode.calculate_action_value of each child: the mean reward and the exploration bonus of the prior."""
+    return rewards / np.maximum(visits, 1) + c_puct * priors * sqrt(parent_visits) / (1 + visits)
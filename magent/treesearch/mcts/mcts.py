@@ -3,38 +3,121 @@ import logging
 
 from magent.mancala import MancalaEnv
 from magent.move import Move
+from magent.side import Side
 from magent.treesearch.mcts.graph import node_utils
-from magent.treesearch.mcts.graph.node import Node
+from magent.treesearch.mcts.graph.node import Node, ProvenOutcome
+from magent.treesearch.mcts.graph.node_store import NodeStore
 from magent.treesearch.mcts.policies.default_policy import DefaultPolicy
 from magent.treesearch.mcts.policies.rollout_policy import RollOutPolicy
 from magent.treesearch.mcts.policies.tree_policy import TreePolicy
 from magent.treesearch.treesearch import TreeSearch
 
+# Most moves (ours, the opponent's and the extra turns) looked through to find the new position in the kept tree
+_MAX_REUSE_PLIES = 10
+
 
 class MCTS(TreeSearch):
+    """
+    Monte Carlo tree search. The tree is kept after a search: when the game has moved on since, the next search
+    starts from the node of the new position, with the statistics it already has, and the rest of the tree is
+    dropped. The node is found by following the moves the game reported with play from the old root, or, if they do
+    not lead to it, by looking through the first plies of the tree.
+
+    The tree is a graph: a position reached by different orders of moves has a single node, found in the NodeStore
+    of the graph, and its statistics are shared by all the paths to it.
+
+    Proven outcomes (see Node.proven) are backed up the tree: the selection does not go below a proven node or into
+    a child proven to lose, a proven node it stops at backs up its outcome without a playout, and the search stops
+    as soon as the children of the root prove its outcome.
+    """
+
     def __init__(self, tree_policy: TreePolicy, default_policy: DefaultPolicy, rollout_policy: RollOutPolicy,
                  time_sec: int):
         self.tree_policy: TreePolicy = tree_policy
         self.default_policy: DefaultPolicy = default_policy
         self.rollout_policy = rollout_policy
         self.calculation_time: datetime.timedelta = datetime.timedelta(seconds=time_sec)
+        self.root: Node = None
+        # The moves made in the game since the last search, from the position of the root
+        self._played_moves = []
+
+    def play(self, move: Move):
+        self._played_moves.append(move)
 
     def search(self, state: MancalaEnv) -> Move:
         # short circuit last move
         if len(state.get_legal_moves()) == 1:
             return state.get_legal_moves()[0]
 
-        game_state_root = Node(state=MancalaEnv.clone(state))
+        game_state_root = self._find_root(state)
+        self._played_moves = []
+        if game_state_root is None:
+            game_state_root = Node(state=MancalaEnv.clone(state))
+            game_state_root.store = NodeStore()
+            logging.info("Starting a new tree")
+        else:
+            # Drop the path to the new root, and with it the moves the game did not take
+            game_state_root.parent = None
+            game_state_root.store.rebuild(game_state_root)
+            game_state_root.store.reset_statistics()
+            logging.info("Reusing a subtree with %d visits" % game_state_root.visits)
+        self.root = game_state_root
         start_time = datetime.datetime.utcnow()
         games_played = 0
-        while datetime.datetime.utcnow() - start_time < self.calculation_time:
+        # Stop as soon as the outcome of the root is proven: there is nothing left to find out
+        while datetime.datetime.utcnow() - start_time < self.calculation_time and \
+                game_state_root.proven_child() is None:
             node = self.tree_policy.select(game_state_root)
-            final_state = self.default_policy.simulate(node)
+            if node.proven is not None:
+                # The outcome of the node is known, so it is backed up instead of the result of a playout
+                final_state = ProvenOutcome(node)
+            else:
+                final_state = self.default_policy.simulate(node)
             self.rollout_policy.backpropagate(node, final_state)
             # Debugging information
             games_played += 1
             logging.debug("%s; Game played %i" % (node, games_played))
         logging.debug("%s" % game_state_root)
-        chosen_child = node_utils.select_robust_child(game_state_root)
+        logging.info(game_state_root.store.statistics())
+        chosen_child = game_state_root.proven_child()
+        if chosen_child is not None:
+            logging.info("Proven outcome %.1f after %d games" % (chosen_child.proven, games_played))
+        else:
+            chosen_child = node_utils.select_robust_child(game_state_root)
         logging.info("Choosing: %s" % chosen_child)
-        return chosen_child.move
+        return game_state_root.move_to(chosen_child)
+
+    def _find_root(self, state: MancalaEnv) -> Node or None:
+        """Returns the node of the kept tree with the position of state, or None if the tree does not have it."""
+        if self.root is None:
+            return None
+        node = self._follow_played_moves()
+        if node is not None and node.state == state and node.state.our_side == state.our_side:
+            return node
+        # The stores never lose seeds (the pie rule swaps them), so a node with more seeds in the stores than state
+        # cannot lead to it
+        stored = _seeds_in_stores(state)
+        frontier = [self.root]
+        for _ in range(_MAX_REUSE_PLIES + 1):
+            next_frontier = []
+            for node in frontier:
+                if _seeds_in_stores(node.state) > stored:
+                    continue
+                if node.state == state and node.state.our_side == state.our_side:
+                    return node
+                next_frontier.extend(node.children)
+            frontier = next_frontier
+        return None
+
+    def _follow_played_moves(self) -> Node or None:
+        """The node the played moves lead to from the root, or None if the tree does not have one of them."""
+        node = self.root
+        for move in self._played_moves:
+            if move not in node.child_moves:
+                return None
+            node = node.children[node.child_moves.index(move)]
+        return node
+
+
+def _seeds_in_stores(state: MancalaEnv) -> int:
+    return state.board.get_seeds_in_store(Side.NORTH) + state.board.get_seeds_in_store(Side.SOUTH)
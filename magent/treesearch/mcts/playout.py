@@ -0,0 +1,121 @@
+import math
+import random
+
+from magent.mancala import MancalaEnv
+from magent.move import MOVES_OF_SIDE, HOLES_IN_MASK
+from magent.side import Side
+from magent.treesearch import evaluation
+
+
+class PlayoutEngine(object):
+    """
+    Plays games to the end for MonteCarloDefaultPolicy: at every turn each legal move is scored as evaluation.get_score
+    scores the state it leads to, and the move to play is sampled from the softmax of the scores.
+
+    The state is played on in place, so a simulation copies its starting state once and nothing else. The moves to
+    score are not made on the state: their sowings are looked up in the sowing table and applied to a scratch copy
+    of the pits, which are scored directly (see _score, which gives the same values as evaluation.get_score). The
+    scratch pits and the buffer of scores are reused for every turn.
+    """
+
+    def __init__(self, holes: int = 7, rng: random.Random = None):
+        self.holes = holes
+        self._random = (rng or random.Random()).random
+        # Scores of the moves by index, then their softmax weights; only the entries of legal moves are used
+        self._scores = [0.0] * (holes + 1)
+        # The pits after the move being scored
+        self._scratch = bytearray(2 * (holes + 1))
+
+    def play(self, state: MancalaEnv) -> MancalaEnv:
+        """Plays state until the game is over (or the tablebase knows how it ends) and returns it."""
+        scores = self._scores
+        while True:
+            legal_moves = state.get_legal_moves_bitmask()
+            if legal_moves == 0:
+                return state
+            final_reward = state.probe_tablebase()
+            if final_reward is not None:
+                state.finish_game(final_reward)
+                return state
+
+            side_to_move = state.side_to_move
+            moves = MOVES_OF_SIDE[Side.get_index(side_to_move)]
+            indexes = HOLES_IN_MASK[legal_moves]
+            best = -math.inf
+            for index in indexes:
+                if index == 0:
+                    # The pie rule swaps the sides, which the sowing table does not know about
+                    record = state.apply_move(moves[0])
+                    score = self._score(state.board.pits, state.board.offset(side_to_move),
+                                        side_to_move != state.our_side)
+                    state.undo_move(record)
+                else:
+                    score = self._score_sowing(state, side_to_move, index)
+                scores[index] = score
+                if score > best:
+                    best = score
+
+            total = 0.0
+            for index in indexes:
+                weight = math.exp(scores[index] - best)
+                scores[index] = weight
+                total += weight
+            threshold = self._random() * total
+            move_to_make = indexes[-1]
+            for index in indexes:
+                threshold -= scores[index]
+                if threshold < 0:
+                    move_to_make = index
+                    break
+            state.perform_move(moves[move_to_make])
+
+    def _score_sowing(self, state: MancalaEnv, side: Side, index: int) -> float:
+        """The score of sowing hole index of side: the move is made with the sowing table on a scratch copy of the
+        pits, which only has to be right in the pits that _score reads."""
+        board = state.board
+        pits = self._scratch
+        pits[:] = board.pits
+        source = board.offset(side, index)
+        increments, store, _, landing, opposite, _, _ = board.sowing.sowings[source][pits[source]]
+        pits[source] = 0
+        for pit, count in increments:
+            pits[pit] += count
+        if opposite >= 0 and pits[landing] == 1 and pits[opposite] > 0:
+            pits[store] += 1 + pits[opposite]
+            pits[landing] = 0
+            pits[opposite] = 0
+
+        # If the game is over, the seeds left on a side go to its store
+        stride = board.holes + 1
+        north_seeds = sum(pits[1:stride])
+        south_seeds = sum(pits[stride + 1:])
+        if north_seeds == 0 or south_seeds == 0:
+            pits[0] += north_seeds
+            pits[stride] += south_seeds
+            pits[1:stride] = bytes(stride - 1)
+            pits[stride + 1:] = bytes(stride - 1)
+        return self._score(pits, store, side != state.our_side)
+
+    @staticmethod
+    def _score(pits, base: int, opponent: bool) -> float:
+        """evaluation.get_score for the side whose store is at base, read straight from the pits; opponent is True
+        if that side is not our_side."""
+        stride = len(pits) // 2
+        op_base = stride - base
+
+        captures = 0
+        for i in range(1, stride):
+            if pits[base + i] == 0:
+                for j in range(1, i):
+                    if pits[base + j] == i - j:
+                        # The hole opposite to hole i of the side
+                        captures += pits[op_base + stride - i] + 1
+                        break
+        reward = captures * evaluation._weight_capture_weight
+        for i in range(1, stride):
+            if pits[base + i] == stride - i:
+                reward *= evaluation._weight_extra_turn
+                break
+        if opponent:
+            reward = -reward
+        return reward + pits[base] - pits[op_base]
@@ -1,10 +1,13 @@
+import random
+
 import numpy as np
 
 from magent.mancala import MancalaEnv
 from magent.move import Move
-from magent.treesearch import evaluation
+from magent.treesearch.mcts.batch_playout import BatchPlayoutEngine, PlayoutResults, SOFTMAX
 from magent.treesearch.mcts.graph.node import AlphaNode, Node
-from models.client import A3Client
+from magent.treesearch.mcts.playout import PlayoutEngine
+from models.network_client import NetworkClient
 
 
 class DefaultPolicy(object):
@@ -18,35 +21,33 @@ class DefaultPolicy(object):
 class MonteCarloDefaultPolicy(DefaultPolicy):
     """MonteCarloDefaultPolicy plays the domain randomly from a given non-terminal state."""
 
-    @staticmethod
-    def _make_temp_child(parent: Node, move: Move) -> MancalaEnv:
-        child_state = MancalaEnv.clone(parent.state)
-        child_state.perform_move(move)
-        return child_state
+    def __init__(self, rng: random.Random = None):
+        super(MonteCarloDefaultPolicy, self).__init__()
+        self.playout = PlayoutEngine(rng=rng)
 
     def simulate(self, root: Node) -> MancalaEnv:
-        node = Node.clone(root)
-        while not node.is_terminal():
-            legal_moves = node.state.get_legal_moves()
-            moves = [-1e80 for _ in range(node.state.board.holes + 1)]
-            for move in legal_moves:
-                moves[move.index] = evaluation.get_score(state=self._make_temp_child(node, move),
-                                                         parent_side=node.state.side_to_move)
+        # Only the state is copied (cloning the node would copy the tree above it too) and played on in place
+        return self.playout.play(MancalaEnv.clone(root.state))
+
 
-            moves_dist = np.asarray(moves, dtype=np.float64).flatten()
-            exp = np.exp(moves_dist - np.max(moves_dist))
-            dist = exp / np.sum(exp)
+class BatchMonteCarloDefaultPolicy(DefaultPolicy):
+    """
+    BatchMonteCarloDefaultPolicy plays playouts games at once from the given state (see BatchPlayoutEngine), with
+    random moves or moves sampled like MonteCarloDefaultPolicy, and returns their average outcome.
+    """
 
-            move_to_make = int(np.random.choice(range(len(moves)), p=dist))
-            node.state.perform_move(Move(side=node.state.side_to_move, index=move_to_make))
+    def __init__(self, playouts: int, policy: str = SOFTMAX, rng: np.random.RandomState = None):
+        super(BatchMonteCarloDefaultPolicy, self).__init__()
+        self.playout = BatchPlayoutEngine(playouts, policy, rng=rng)
 
-        return node.state
+    def simulate(self, root: Node) -> PlayoutResults:
+        return self.playout.play(root.state)
 
 
 class AlphaGoDefaultPolicy(DefaultPolicy):
     """plays the domain based on prior probability provided by a neuron network. Starting at non-terminal state."""
 
-    def __init__(self, network: A3Client):
+    def __init__(self, network: NetworkClient):
         super(AlphaGoDefaultPolicy, self).__init__()
         self.network = network
 
@@ -56,10 +57,15 @@ class AlphaGoDefaultPolicy(DefaultPolicy):
             :param root: the starting node for the simulation
             :return: the rollout policy; reward for taking this path combining value network with game's winner
         """
-        node: AlphaNode = AlphaNode.clone(root)
-        while not node.is_terminal():
-            move_index, _ = self.network.sample_state(node.state)
-            move = Move(node.state.side_to_move, move_index + 1)
-            node.state.perform_move(move)
-
-        return node.state
+        state = MancalaEnv.clone(root.state)
+        while state.get_legal_moves_bitmask() != 0:
+            final_reward = state.probe_tablebase()
+            if final_reward is not None:
+                state.finish_game(final_reward)
+                break
+
+            move_index, _ = self.network.sample_state(state)
+            move = Move.of(state.side_to_move, move_index + 1)
+            state.perform_move(move)
+
+        return state
@@ -1,6 +1,6 @@
 from magent.mancala import MancalaEnv
 from magent.treesearch.mcts.graph.node import Node
-from models.client import A3Client
+from models.network_client import NetworkClient
 
 
 class RollOutPolicy(object):
@@ -14,7 +14,8 @@ class RollOutPolicy(object):
 class MonteCarloRollOutPolicy(RollOutPolicy):
     def backpropagate(self, root: Node, final_state: MancalaEnv):
         """
-        backpropgate pushes the reward (pay/visits) to the parents node up to the root
+        backpropgate pushes the reward (pay/visits) to the parents node up to the root, and with it the outcomes
+        proven below them (see Node.prove)
         :param root: starting node to backpropgate from
         :param final_state: the state of final node (holds final reward from the simulation)
         """
@@ -23,11 +24,12 @@ class MonteCarloRollOutPolicy(RollOutPolicy):
         while node is not None:
             side = node.parent.state.side_to_move if node.parent is not None else node.state.side_to_move  # root node
             node.update(final_state.compute_end_game_reward(side))
+            node.prove(side)
             node = node.parent
 
 
 class AlphaGoRollOutPolicy(RollOutPolicy):
-    def __init__(self, network: A3Client):
+    def __init__(self, network: NetworkClient):
         """
         :param network: value network
         """
@@ -7,7 +7,7 @@ from magent.move import Move
 from magent.treesearch import evaluation
 from magent.treesearch.mcts.graph import node_utils
 from magent.treesearch.mcts.graph.node import Node, AlphaNode
-from models.client import A3Client
+from models.network_client import NetworkClient
 
 
 class TreePolicy(object):
@@ -26,42 +26,39 @@ class MonteCarloTreePolicy(TreePolicy):
     @staticmethod
     def select(node: Node) -> Node:
         while not node.is_terminal():
-            # expand while we have nodes to expand
             if not node.is_fully_expanded():
                 return MonteCarloTreePolicy.expand(node)
-            # select child and explore it
             else:
-                node = node_utils.rave_selection(node)
+                child = node_utils.rave_selection(node)
+                # A child can have several parents; backpropagation follows the one it was reached from
+                child.parent = node
+                node = child
+                # The outcome of a proven node is known, so there is nothing to search below it
+                if node.proven is not None:
+                    return node
         return node
 
     @staticmethod
     def expand(parent: Node) -> Node:
-        child_expansion_move = choice(tuple(parent.unexplored_moves))
+        child_expansion_move = choice(parent.get_unexplored_moves())
         child_state = MancalaEnv.clone(parent.state)
         child_state.perform_move(child_expansion_move)
-        child_node = Node(state=child_state, move=child_expansion_move, parent=parent)
-        parent.put_child(child_node)
-        MonteCarloTreePolicy._rave_expand(child_node)
-        # go down the tree
+        child_node = parent.store.get(child_state, parent) if parent.store is not None else None
+        if child_node is None:
+            child_node = Node(state=child_state, move=child_expansion_move, parent=parent)
+            if parent.store is not None:
+                parent.store.put(child_node)
+            MonteCarloTreePolicy._rave_expand(child_node)
+        parent.put_child(child_node, child_expansion_move)
         return child_node
 
     @staticmethod
     def _rave_expand(parent: Node):
-        moves = [-1e80 for _ in range(parent.state.board.holes + 1)]
-        for unexplored_move in parent.unexplored_moves.copy():
-            child_state = MancalaEnv.clone(parent.state)
-            child_state.perform_move(unexplored_move)
-            moves[unexplored_move.index] = evaluation.get_score(state=child_state,
-                                                                parent_side=parent.state.side_to_move)
-
-        moves_dist = np.asarray(moves, dtype=np.float64).flatten()
-        exp = np.exp(moves_dist - np.max(moves_dist))
-        dist = exp / np.sum(exp)
-        parent.value = max(dist)
+        parent.value = rave_value(parent.state)
 
 
 class AlphaGoTreePolicy(TreePolicy):
-    def __init__(self, network: A3Client):
+    def __init__(self, network: NetworkClient):
         super(AlphaGoTreePolicy, self).__init__()
         self.network = network
 
@@ -73,21 +70,44 @@ class AlphaGoTreePolicy(TreePolicy):
             # select child and explore it
             else:
                 # Select action among children that gives maximum action value, Q plus bonus u(P).
-                node = node_utils.select_child_with_maximum_action_value(node)
+                child = node_utils.select_child_with_maximum_action_value(node)
+                child.parent = node
+                node = child
         return node
 
     def expand(self, node: AlphaNode):
         # Tactical workaround the pie move
-        if Move(node.state.side_to_move, 0) in node.unexplored_moves:
-            node.unexplored_moves.remove(Move(node.state.side_to_move, 0))
+        node.unexplored_moves &= ~1
 
         dist, value = self.network.evaluate_state(node.state)
+        legal_moves = node.state.get_legal_moves_bitmask()
         for index, prior in enumerate(dist):
-            expansion_move = Move(node.state.side_to_move, index + 1)
-            if node.state.is_legal(expansion_move):
+            # The network does not output the pie move, so its action i is the hole i + 1
+            if legal_moves >> (index + 1) & 1:
+                expansion_move = Move.of(node.state.side_to_move, index + 1)
                 child_state = MancalaEnv.clone(node.state)
                 child_state.perform_move(expansion_move)
-                child_node = AlphaNode(state=child_state, prior=prior, move=expansion_move, parent=node)
-                node.put_child(child_node)
+                # A position already in the graph is linked, and keeps the prior it was first given
+                child_node = node.store.get(child_state, node) if node.store is not None else None
+                if child_node is None:
+                    child_node = AlphaNode(state=child_state, prior=prior, move=expansion_move, parent=node)
+                    if node.store is not None:
+                        node.store.put(child_node)
+                node.put_child(child_node, expansion_move)
         # go down the tree
         return node_utils.select_child_with_maximum_action_value(node)
+
+
+def rave_value(state: MancalaEnv) -> float:
+    """The heuristic value of a new node: the highest probability of a softmax over the scores of its moves."""
+    moves = [-1e80 for _ in range(state.board.holes + 1)]
+    side_to_move = state.side_to_move
+    for move in state.get_legal_moves():
+        record = state.apply_move(move)
+        moves[move.index] = evaluation.get_score(state=state, parent_side=side_to_move)
+        state.undo_move(record)
+
+    moves_dist = np.asarray(moves, dtype=np.float64).flatten()
+    exp = np.exp(moves_dist - np.max(moves_dist))
+    dist = exp / np.sum(exp)
+    return max(dist)
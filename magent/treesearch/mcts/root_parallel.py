@@ -0,0 +1,175 @@
+import datetime
+import logging
+import os
+import random
+import time
+from multiprocessing import Pipe, Process
+
+import numpy as np
+
+from magent.mancala import MancalaEnv
+from magent.move import Move
+from magent.treesearch.mcts.graph import node_utils
+from magent.treesearch.mcts.graph.node import Node
+from magent.treesearch.mcts.mcts import MCTS
+from magent.treesearch.mcts.policies.default_policy import MonteCarloDefaultPolicy, BatchMonteCarloDefaultPolicy
+from magent.treesearch.mcts.policies.rollout_policy import MonteCarloRollOutPolicy
+from magent.treesearch.mcts.policies.tree_policy import MonteCarloTreePolicy
+from magent.treesearch.treesearch import TreeSearch
+
+# The MCTS of each worker process, kept between searches with its tree, and the generators its policies draw from
+_mcts = None
+_random = None
+_np_random = None
+
+
+def _start_worker(playouts: int):
+    global _mcts, _random, _np_random
+    _random = random.Random()
+    _np_random = np.random.RandomState()
+    if playouts > 1:
+        default_policy = BatchMonteCarloDefaultPolicy(playouts, rng=_np_random)
+    else:
+        default_policy = MonteCarloDefaultPolicy(rng=_random)
+    _mcts = MCTS(MonteCarloTreePolicy(), default_policy, MonteCarloRollOutPolicy(), time_sec=0)
+
+
+def _run_worker(connection, playouts: int):
+    """The loop of a worker process: searches every task it receives and sends back the result, until None."""
+    _start_worker(playouts)
+    while True:
+        task = connection.recv()
+        if task is None:
+            break
+        connection.send(_search(task))
+    connection.close()
+
+
+def _search(task) -> [(int, int, float, float or None)]:
+    """Searches the position in a worker until the deadline. Returns the action, visits, reward and proven outcome
+    of each child of the root; nothing if the deadline has passed or came before the root was expanded."""
+    pits, side_to_move, north_moved, our_side, deadline, seed = task
+    time_left = deadline - time.time()
+    if time_left <= 0:
+        return []
+    state = MancalaEnv()
+    state.board.pits[:] = pits
+    state.board.rehash()
+    state.side_to_move = side_to_move
+    state.north_moved = north_moved
+    state.our_side = our_side
+
+    # The tree policy draws from the random module
+    random.seed(seed)
+    _random.seed(seed)
+    _np_random.seed(seed % 2 ** 32)
+    # The deadline is on the wall clock, which unlike utcnow differences is the same in every process
+    _mcts.calculation_time = datetime.timedelta(seconds=time_left)
+    try:
+        _mcts.search(state)
+    except ValueError:
+        # select_robust_child has no child to choose from if the time ran out before the first simulation
+        if len(_mcts.root.children) > 0:
+            raise
+    root = _mcts.root
+    if len(root.children) == 0:
+        return []
+    return [(move.action, child.visits, child.reward, child.proven)
+            for move, child in zip(root.child_moves, root.children)]
+
+
+class RootParallelMCTS(TreeSearch):
+    """
+    Root-parallel MCTS: every worker process searches the position with its own MCTS (with MonteCarloTreePolicy,
+    the Monte Carlo default policy of playouts games per leaf and MonteCarloRollOutPolicy) and its own random seed,
+    until the same deadline. The visits and rewards of the children of the roots are then added up, move by move,
+    and the move is chosen from the sums as MCTS does (a proven child, or the most visited one).
+
+    There are workers processes (one per core by default), started by the first search before its clock starts and
+    kept until close(). Each gets exactly one task per search over its own pipe, and keeps its tree between searches
+    as MCTS does, so a worker that searched the position before goes on from its subtree.
+    """
+
+    def __init__(self, time_sec: float, workers: int = None, playouts: int = 1, seed: int = None):
+        if workers is None:
+            workers = os.cpu_count() or 1
+        if workers < 1:
+            raise ValueError('There has to be at least one worker')
+        self.time_sec = time_sec
+        self.workers = workers
+        self.playouts = playouts
+        self._random = random.Random(seed)
+        # The worker processes and the ends of their pipes on this side
+        self._processes = []
+        self._connections = []
+        # The merged children of the root of the last search
+        self.root: Node = None
+
+    def close(self):
+        """Stops the worker processes, including any that have already exited."""
+        for connection in self._connections:
+            try:
+                connection.send(None)
+            except OSError:
+                # The worker is gone and its end of the pipe with it
+                pass
+            connection.close()
+        for process in self._processes:
+            process.join(timeout=1)
+            if process.is_alive():
+                process.terminate()
+                process.join()
+        self._processes = []
+        self._connections = []
+
+    def search(self, state: MancalaEnv) -> Move:
+        # short circuit last move
+        if len(state.get_legal_moves()) == 1:
+            return state.get_legal_moves()[0]
+
+        # The workers are started before the clock, so that starting them does not eat into the search
+        self._start_workers()
+        deadline = time.time() + self.time_sec
+        position = (bytes(state.board.pits), state.side_to_move, state.north_moved, state.our_side)
+        for connection in self._connections:
+            connection.send(position + (deadline, self._random.getrandbits(64)))
+        results = [connection.recv() for connection in self._connections]
+
+        self.root = root = Node(state=MancalaEnv.clone(state))
+        children = {}
+        for worker_children in results:
+            for action, visits, reward, proven in worker_children:
+                child = children.get(action)
+                if child is None:
+                    move = Move.from_action(action)
+                    child_state = MancalaEnv.clone(state)
+                    child_state.perform_move(move)
+                    child = children[action] = Node(state=child_state, move=move, parent=root)
+                    root.put_child(child)
+                child.visits += visits
+                child.reward += reward
+                if proven is not None:
+                    child.proven = proven
+        root.visits = sum(child.visits for child in root.children)
+        logging.info("RootParallelMCTS: %d workers, %d simulations" % (self.workers, root.visits))
+        if len(root.children) == 0:
+            # Only if the time is too short for the workers to search at all
+            logging.warning("RootParallelMCTS: no simulations, playing the first legal move")
+            return state.get_legal_moves()[0]
+
+        chosen_child = root.proven_child()
+        if chosen_child is None:
+            chosen_child = node_utils.select_robust_child(root)
+        logging.info("Choosing: %s" % chosen_child)
+        return root.move_to(chosen_child)
+
+    def _start_workers(self):
+        if len(self._processes) > 0:
+            return
+        for _ in range(self.workers):
+            connection, worker_connection = Pipe()
+            process = Process(target=_run_worker, args=(worker_connection, self.playouts), daemon=True)
+            process.start()
+            worker_connection.close()
+            self._processes.append(process)
+            self._connections.append(connection)
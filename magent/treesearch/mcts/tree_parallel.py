@@ -0,0 +1,178 @@
+import datetime
+import logging
+from collections import Counter
+
+import numpy as np
+
+from magent.batch_mancala import BatchMancalaEnv
+from magent.mancala import MancalaEnv
+from magent.move import Move
+from magent.treesearch.mcts.batch_playout import PlayoutResults
+from magent.treesearch.mcts.graph import node_utils
+from magent.treesearch.mcts.graph.node import AlphaNode
+from magent.treesearch.mcts.policies.rollout_policy import AlphaGoRollOutPolicy
+from magent.treesearch.treesearch import TreeSearch
+from models.network_client import NetworkClient
+
+
+class TreeParallelMCTS(TreeSearch):
+    """
+    Tree-parallel MCTS with the policies of TreesFactory.alpha_mcts, in which the network runs on batches of
+    positions instead of one position at a time.
+
+    The search keeps batch_size slots, each a game of a BatchMancalaEnv. Selectors go down the tree in turn as
+    AlphaGoTreePolicy does, each adding a virtual loss to the nodes it goes through (see AlphaNode.virtual_losses)
+    so that the next ones take other paths, and put the leaves they reach in the free slots. A selector that reaches
+    a leaf already waiting to be expanded leaves its virtual losses in place until the slots are filled. A selector
+    that reaches the end of the game backpropagates it at once and leaves its slot free; filling stops after
+    batch_size of these collisions and ends of the game together. Then a single evaluator runs the network once on
+    the positions of all the busy slots:
+
+    - a slot with a new leaf expands it with the priors and starts the playout with the move to the child the leaf
+      picks, as AlphaGoTreePolicy.expand does,
+    - every other slot plays the next move of its playout, sampled as AlphaGoDefaultPolicy does.
+
+    The playouts that end are backpropagated as AlphaGoRollOutPolicy does, their virtual losses are taken back, and
+    their slots are free for the next leaves; so every run of the network is on all the slots, however long the
+    playouts are. Playouts still going when the time is up are dropped.
+
+    The selectors take turns in one thread: under the GIL threads would not go down the tree any faster, and what
+    batching saves is the round trips to the network.
+    """
+
+    def __init__(self, network: NetworkClient, time_sec: int, batch_size: int = 16, rng: np.random.RandomState = None):
+        if batch_size < 1:
+            raise ValueError('The batch size must be at least 1, not %d' % batch_size)
+        self.network = network
+        self.calculation_time = datetime.timedelta(seconds=time_sec)
+        self.batch_size = batch_size
+        self.rollout_policy = AlphaGoRollOutPolicy(network)
+        self._rng = rng or np.random.RandomState()
+        self._games = BatchMancalaEnv(batch_size)
+        # The path from the root to the leaf of each slot, and the node its playout started from (the leaf until it
+        # is expanded); None for a free slot
+        self._paths = [None] * batch_size
+        self._starts = [None] * batch_size
+        self.root: AlphaNode = None
+        # Statistics of the last search: playouts backpropagated and the number of runs of the network of each size
+        self.leaves = 0
+        self.batch_sizes = Counter()
+
+    def search(self, state: MancalaEnv) -> Move:
+        # short circuit last move
+        if len(state.get_legal_moves()) == 1:
+            return state.get_legal_moves()[0]
+
+        self.root = root = AlphaNode(state=MancalaEnv.clone(state), prior=1.0)
+        self.leaves = 0
+        self.batch_sizes = Counter()
+        self._games.done[:] = True
+        start_time = datetime.datetime.utcnow()
+        while datetime.datetime.utcnow() - start_time < self.calculation_time:
+            self._fill_slots(root)
+            self._step()
+        for slot in range(self.batch_size):
+            if self._paths[slot] is not None:
+                self._free(slot)
+        logging.info("TreeParallelMCTS: %d playouts; network runs by batch size: %s" % (
+            self.leaves, sorted(self.batch_sizes.items())))
+
+        chosen_child = node_utils.select_robust_child(root)
+        logging.info("Choosing: %s" % chosen_child)
+        return root.move_to(chosen_child)
+
+    def _fill_slots(self, root: AlphaNode):
+        """Puts a leaf in every free slot, unless too many selectors collide or reach the end of the game."""
+        queued = set()
+        collisions = []
+        # Selections that did not fill a slot: the collisions and the ends of the game, which keep a slot free. Once
+        # every leaf within reach is the end of the game, only this bound stops the filling.
+        stalled = 0
+        free = [slot for slot in range(self.batch_size) if self._paths[slot] is None]
+        while len(free) > 0 and stalled < self.batch_size:
+            path = [root]
+            node = root
+            while len(node.children) > 0:
+                node = node_utils.select_child_with_maximum_action_value(node)
+                node.virtual_losses += 1
+                path.append(node)
+            if id(node) in queued:
+                # The virtual losses stay until the slots are filled to steer the next selectors away
+                collisions.append(path)
+                stalled += 1
+                continue
+            slot = free.pop()
+            self._paths[slot] = path
+            self._starts[slot] = node
+            state = node.state
+            final_reward = state.probe_tablebase()
+            if final_reward is not None:
+                state = MancalaEnv.clone(state)
+                state.finish_game(final_reward)
+            self._games.load(state, slot)
+            if self._games.done[slot]:
+                # The end of the game can be played out by several selectors at once
+                self._finish(slot)
+                free.append(slot)
+                stalled += 1
+            else:
+                queued.add(id(node))
+        for path in collisions:
+            _remove_virtual_losses(path)
+
+    def _step(self):
+        """Runs the network on the busy slots, expands the new leaves and plays a move in every playout."""
+        games = self._games
+        busy = np.flatnonzero(~games.done)
+        if len(busy) == 0:
+            return
+        self.batch_sizes[len(busy)] += 1
+        dists, _ = self.network.evaluate_games(games, busy)
+
+        # Sample a move of each game from its distribution; the network does not play the pie move
+        cumulative = np.cumsum(dists, axis=1)
+        thresholds = self._rng.random_sample(len(busy)) * cumulative[:, -1]
+        actions = np.zeros(games.games, dtype=np.int64)
+        actions[busy] = np.argmax(cumulative > thresholds[:, np.newaxis], axis=1) + 1
+        for slot, dist in zip(busy, dists):
+            leaf = self._starts[slot]
+            if leaf is self._paths[slot][-1] and len(leaf.children) == 0:
+                _expand(leaf, dist)
+                child = node_utils.select_child_with_maximum_action_value(leaf)
+                self._starts[slot] = child
+                actions[slot] = child.move.index
+
+        games.step(actions)
+        for slot in busy[games.done[busy]]:
+            self._finish(slot)
+
+    def _finish(self, slot: int):
+        """Backpropagates the result of the playout of slot and frees it."""
+        # The parents of the nodes are the ones they were created under, so the path is followed up
+        self.rollout_policy.backpropagate(self._starts[slot], PlayoutResults(self._games.boards[slot:slot + 1]))
+        self.leaves += 1
+        self._free(slot)
+
+    def _free(self, slot: int):
+        _remove_virtual_losses(self._paths[slot])
+        self._paths[slot] = None
+        self._starts[slot] = None
+        self._games.done[slot] = True
+
+
+def _expand(node: AlphaNode, dist: np.ndarray):
+    """Creates the children of node as AlphaGoTreePolicy.expand does, with the priors of dist."""
+    node.unexplored_moves &= ~1
+    legal_moves = node.state.get_legal_moves_bitmask()
+    for index, prior in enumerate(dist):
+        # The network does not output the pie move, so its action i is the hole i + 1
+        if legal_moves >> (index + 1) & 1:
+            expansion_move = Move.of(node.state.side_to_move, index + 1)
+            child_state = MancalaEnv.clone(node.state)
+            child_state.perform_move(expansion_move)
+            node.put_child(AlphaNode(state=child_state, prior=prior, move=expansion_move, parent=node))
+
+
+def _remove_virtual_losses(path: [AlphaNode]):
+    for node in path[1:]:
+        node.virtual_losses -= 1
@@ -5,3 +5,11 @@ from magent.move import Move
 class TreeSearch(object):
     def search(self, state: MancalaEnv) -> Move:
         raise NotImplementedError("search method is not implemented")
+
+    def play(self, move: Move):
+        """Tells the search that move was made in the game, by either side. Nothing by default."""
+        pass
+
+    def close(self):
+        """Releases what the search holds on to between moves, such as worker processes. Nothing by default."""
+        pass
@@ -0,0 +1,36 @@
+"""
+Zobrist keys of Kalah positions.
+
+The key of a position is the XOR of one random 64-bit number per (pit, seed count) pair, plus SOUTH_TO_MOVE when
+SOUTH is to move and NORTH_MOVED once NORTH has moved. The numbers are drawn from a fixed seed, so keys are the same
+in every process and can be written to files.
+"""
+import random
+
+# Seed counts are stored in bytes, so a pit can hold at most 255 seeds
+_MAX_SEEDS = 256
+
+_rng = random.Random(0x4B616C6168)
+
+SOUTH_TO_MOVE = _rng.getrandbits(64)
+NORTH_MOVED = _rng.getrandbits(64)
+
+# _pit_keys[pit][seeds] where pit is a position in Board.pits. Rows are drawn on demand, in order, so a row never
+# changes once it exists.
+_pit_keys = []
+
+
+def pit_keys(pits: int) -> list:
+    """Returns the key table for a board with the given number of pits (stores included)."""
+    while len(_pit_keys) < pits:
+        _pit_keys.append([_rng.getrandbits(64) for _ in range(_MAX_SEEDS)])
+    return _pit_keys
+
+
+def board_key(pits) -> int:
+    """Computes the key of the seeds in pits from scratch."""
+    keys = pit_keys(len(pits))
+    key = 0
+    for pit, seeds in enumerate(pits):
+        key ^= keys[pit][seeds]
+    return key
@@ -47,14 +47,14 @@ class EnvironmentRunner(object):
 
                 action, value = self.ac_net.sample(state, mask)
                 # Because the pie move with index 0 is ignored, the action indexes must be shifted by one
-                reward = self.env.perform_move(Move(self.trainer_side, action + 1))
+                reward = self.env.perform_move(Move.of(self.trainer_side, action + 1))
                 rollout.add(state, action, reward, value, mask)
             else:
                 assert self.env.side_to_move == Side.opposite(self.trainer_side)
                 action = self.opp_agent.produce_action(self.env.board.get_board_image(),
                                                        self.env.get_action_mask_with_no_pie(),
                                                        self.env.side_to_move)
-                self.env.perform_move(Move(self.env.side_to_move, action + 1))
+                self.env.perform_move(Move.of(self.env.side_to_move, action + 1))
 
         # We replace the partial reward of the last move with the final reward of the game
         final_reward = self.env.compute_final_reward(self.trainer_side)
@@ -0,0 +1,42 @@
+"""
+Exports the weights of the ACNetwork of a checkpoint to an npz file for NumpyACNetwork, so that the agent can play
+with models.network_client.NumpyClient and without TensorFlow. Needs TensorFlow.
+
+Run from the repository root: python -m models.a3c.export
+"""
+import argparse
+import os
+
+import numpy as np
+import tensorflow as tf
+
+from models.a3c.numpy_model import NumpyACNetwork, DEFAULT_PATH
+from models.client import CHECKPOINT_DIR, read_weights
+
+parser = argparse.ArgumentParser(description="Export the weights of an ACNetwork checkpoint for NumpyACNetwork")
+parser.add_argument('-c', '--checkpoint-dir', default=CHECKPOINT_DIR, type=str,
+                    help="Directory of the checkpoint, whose latest model is exported")
+parser.add_argument('-o', '--output', default=DEFAULT_PATH, type=str, help="The npz file to write")
+# A3Client builds the network under the global scope
+parser.add_argument('-s', '--scope', default='global', type=str, help="Variable scope of the network")
+
+
+def main():
+    args = parser.parse_args()
+    checkpoint_state = tf.train.get_checkpoint_state(checkpoint_dir=args.checkpoint_dir)
+    if checkpoint_state is None:
+        raise ValueError('No checkpoint in %s' % args.checkpoint_dir)
+    checkpoint_path = checkpoint_state.model_checkpoint_path
+    if not os.path.isabs(checkpoint_path):
+        checkpoint_path = os.path.join(args.checkpoint_dir, checkpoint_path)
+    weights = read_weights(checkpoint_path, args.scope)
+    # Fails on weights that do not make an ACNetwork
+    network = NumpyACNetwork(weights)
+
+    np.savez(args.output, **weights)
+    print('Exported %s to %s: %d inputs, %d actions' % (checkpoint_path, args.output, network.num_inputs,
+                                                       network.num_act))
+
+
+if __name__ == '__main__':
+    main()
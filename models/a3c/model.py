@@ -53,3 +53,20 @@ class ACNetwork(object):
             raise ZeroDivisionError('There is no valid action. This should not happen')
 
         return dist, logits, value
+
+    def evaluate_moves(self, masks, states) -> (np.array, np.array):
+        """evaluate_move of a batch of states with one run of the network: a distribution per state and the values"""
+        sess = tf.get_default_session()
+        feed_dict = {
+            self.state: states,
+            self.mask: masks,
+        }
+        logits, value = sess.run([self.logits, self.value], feed_dict)
+        logits = np.asarray(logits, dtype=np.float64)
+        exp = np.exp(logits - np.max(logits, axis=1, keepdims=True))
+        total = np.sum(exp, axis=1, keepdims=True)
+
+        if np.any(total == 0):
+            raise ZeroDivisionError('There is no valid action. This should not happen')
+
+        return exp / total, value[:, 0]
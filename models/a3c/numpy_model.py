@@ -0,0 +1,101 @@
+import numpy as np
+
+# The weights exported by models.a3c.export from the checkpoint the agent plays with
+DEFAULT_PATH = './saved_ckpt/a3c_random_0.9.npz'
+# The dense layers of ACNetwork, as tf.layers names them: three hidden layers, then the policy and the value heads
+HIDDEN_LAYERS = ('dense', 'dense_1', 'dense_2')
+POLICY_LAYER = 'dense_3'
+VALUE_LAYER = 'dense_4'
+LAYERS = HIDDEN_LAYERS + (POLICY_LAYER, VALUE_LAYER)
+_INVALID_LOGIT = np.float32(-1e35)
+
+
+class NumpyACNetwork(object):
+    """
+    The forward pass of ACNetwork in NumPy, for playing without a TensorFlow session. weights maps 'layer/kernel' and
+    'layer/bias' of each layer in LAYERS to its values, as models.a3c.export writes them.
+
+    It computes in float32 like the TensorFlow graph. The activations of every layer are kept in buffers that are
+    allocated for the largest batch seen so far and reused by the later calls.
+    """
+
+    def __init__(self, weights: dict):
+        missing = [name for layer in LAYERS for name in (layer + '/kernel', layer + '/bias') if name not in weights]
+        if len(missing) > 0:
+            raise ValueError('Missing weights: %s' % ', '.join(missing))
+        self._hidden = [(np.asarray(weights[layer + '/kernel'], dtype=np.float32),
+                         np.asarray(weights[layer + '/bias'], dtype=np.float32)) for layer in HIDDEN_LAYERS]
+        # The heads are run as one layer: the logits are its first num_act outputs and the value its last
+        self._heads = tuple(np.hstack([weights[POLICY_LAYER + part], weights[VALUE_LAYER + part]]).astype(np.float32)
+                            for part in ('/kernel', '/bias'))
+        self.num_inputs = self._hidden[0][0].shape[0]
+        self.num_act = self._heads[0].shape[1] - 1
+        self._capacity = 0
+        self._inputs = self._masks = self._activations = self._outputs = None
+
+    @staticmethod
+    def load(path: str = DEFAULT_PATH):
+        with np.load(path) as weights:
+            return NumpyACNetwork(dict(weights))
+
+    def sample(self, state: np.array, mask: np.array) -> (int, int):
+        """Renormalises the logits by taking into account only the valid actions and generates a sample"""
+        dist, logits, value = self.evaluate_move(mask, state)
+
+        return np.random.choice(range(logits.size), p=dist), value[0][0]
+
+    def evaluate_move(self, mask, state):
+        """ACNetwork.evaluate_move: the distribution, the masked logits and the value, shaped [[value]]."""
+        logits, value = self._forward(np.asarray(state)[np.newaxis], np.asarray(mask)[np.newaxis])
+        logits = logits[0].astype(np.float64)
+        exp = np.exp(logits - logits.max())
+        total = exp.sum()
+
+        if total == 0:
+            raise ZeroDivisionError('There is no valid action. This should not happen')
+
+        return exp / total, logits, value.copy()
+
+    def evaluate_moves(self, masks, states) -> (np.array, np.array):
+        """evaluate_move of a batch of states: a distribution per state and the values"""
+        logits, value = self._forward(np.asarray(states), np.asarray(masks))
+        logits = logits.astype(np.float64)
+        exp = np.exp(logits - np.max(logits, axis=1, keepdims=True))
+        total = np.sum(exp, axis=1, keepdims=True)
+
+        if np.any(total == 0):
+            raise ZeroDivisionError('There is no valid action. This should not happen')
+
+        return exp / total, value[:, 0].copy()
+
+    def _forward(self, states: np.ndarray, masks: np.ndarray) -> (np.ndarray, np.ndarray):
+        """The masked logits and the values of a batch, as views of the buffers."""
+        size = len(states)
+        if size > self._capacity:
+            self._allocate(size)
+        inputs, invalid, outputs = self._inputs[:size], self._masks[:size], self._outputs[:size]
+        inputs[:] = states.reshape(size, self.num_inputs)
+        np.equal(masks, 0, out=invalid)
+
+        layer_input = inputs
+        for (kernel, bias), activation in zip(self._hidden, self._activations):
+            activation = activation[:size]
+            np.dot(layer_input, kernel, out=activation)
+            activation += bias
+            np.maximum(activation, 0, out=activation)
+            layer_input = activation
+
+        kernel, bias = self._heads
+        np.dot(layer_input, kernel, out=outputs)
+        outputs += bias
+        logits = outputs[:, :self.num_act]
+        # Invalid actions get a logit of -1e35, so they have a probability of 0
+        np.copyto(logits, _INVALID_LOGIT, where=invalid)
+        return logits, outputs[:, self.num_act:]
+
+    def _allocate(self, size: int):
+        self._capacity = size
+        self._inputs = np.empty((size, self.num_inputs), dtype=np.float32)
+        self._masks = np.empty((size, self.num_act), dtype=bool)
+        self._activations = [np.empty((size, kernel.shape[1]), dtype=np.float32) for kernel, _ in self._hidden]
+        self._outputs = np.empty((size, self.num_act + 1), dtype=np.float32)
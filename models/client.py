@@ -2,41 +2,42 @@ import logging
 
 import tensorflow as tf
 
-from magent.mancala import MancalaEnv
-from magent.side import Side
+from models import evaluation_cache
 from models.a3c.helpers import FastSaver
 from models.a3c.model import ACNetwork
+from models.a3c.numpy_model import LAYERS
+from models.evaluation_cache import EvaluationCache
+from models.network_client import NetworkClient
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
 
+CHECKPOINT_DIR = "./saved_ckpt/a3c_random_0.9"
 
-# TODO separate A3Client into client interface and A3 implementation 
-class A3Client(object):
-    def __init__(self, sess):
+
+def read_weights(checkpoint_path: str, scope: str) -> dict:
+    """The kernels and biases of the layers of ACNetwork in the checkpoint, by their names without the scope."""
+    reader = tf.train.NewCheckpointReader(checkpoint_path)
+    return {name: reader.get_tensor('%s/%s' % (scope, name))
+            for layer in LAYERS for name in (layer + '/kernel', layer + '/bias')}
+
+
+class A3Client(NetworkClient):
+    """A NetworkClient on the ACNetwork of a TensorFlow session, restored from the checkpoint."""
+
+    def __init__(self, sess, cache: EvaluationCache = None):
+        super().__init__(ACNetwork(state_shape=[2, 8, 1], num_act=7), cache)
         self.sess = sess
-        self.network = ACNetwork(state_shape=[2, 8, 1], num_act=7)
         self._restore_model()
 
     def _restore_model(self):
         saver = FastSaver()
         try:
             logger.debug('Loading Model...')
-            checkpoint_path = tf.train.get_checkpoint_state(checkpoint_dir="./saved_ckpt/a3c_random_0.9")
+            checkpoint_path = tf.train.get_checkpoint_state(checkpoint_dir=CHECKPOINT_DIR)
             saver.restore(sess=self.sess, save_path=checkpoint_path.model_checkpoint_path)
+            # The network is built under the global scope; its weights are the ones models.a3c.export writes
+            self.fingerprint = evaluation_cache.fingerprint(read_weights(checkpoint_path.model_checkpoint_path,
+                                                                         'global'))
         except Exception as e:
             logger.error("Failed to restore models", str(e))
-
-    def evaluate_state(self, env: MancalaEnv) -> (float, float):
-        flip_board = env.side_to_move == Side.NORTH
-        state = env.board.get_board_image(flipped=flip_board)
-        mask = env.get_action_mask_with_no_pie()
-        dist, _, value = self.network.evaluate_move(state=state, mask=mask)
-
-        return dist, float(value)
-
-    def sample_state(self, env: MancalaEnv) -> (int, float):
-        flip_board = env.side_to_move == Side.NORTH
-        state = env.board.get_board_image(flipped=flip_board)
-        mask = env.get_action_mask_with_no_pie()
-        return self.network.sample(state=state, mask=mask)
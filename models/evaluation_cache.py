@@ -0,0 +1,114 @@
+"""
+Cache of the evaluations of the network by position.
+
+The network sees the board from the side to move (see A3Client.evaluate_state): the board is flipped when NORTH is
+to move, and the mask of the legal moves follows from the holes of the side to move. So two positions with the same
+flipped board get the same evaluation, whichever side is to move, and the cache is keyed by the pits of the flipped
+board. The least recently used entries are dropped once the cache is full.
+
+The cache can be saved between games with save and read back with open: an npz file of the keys, distributions and
+values, from the least to the most recently used, and the fingerprint of the weights of the network that evaluated
+them. open discards a saved cache of other weights, so a retrained or another network does not serve stale entries.
+"""
+import hashlib
+import logging
+import os
+from collections import OrderedDict
+
+import numpy as np
+
+from magent.mancala import MancalaEnv
+from magent.side import Side
+
+DEFAULT_PATH = './saved_ckpt/evaluations.npz'
+
+
+def fingerprint(weights: dict) -> str:
+    """A digest of the weights of a network, given by name as models.a3c.export writes them."""
+    digest = hashlib.sha1()
+    for name in sorted(weights):
+        digest.update(name.encode())
+        digest.update(np.ascontiguousarray(weights[name], dtype=np.float32).tobytes())
+    return digest.hexdigest()
+
+
+class EvaluationCache(object):
+    def __init__(self, capacity: int = 2 ** 16, fingerprint: str = ''):
+        if capacity < 1:
+            raise ValueError('The capacity of the cache must be at least 1, not %d' % capacity)
+        self.capacity = capacity
+        # The fingerprint of the weights of the network the entries come from
+        self.fingerprint = fingerprint
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    @staticmethod
+    def key(env: MancalaEnv) -> bytes:
+        """The pits of the board as the network sees it, with the side to move at the bottom."""
+        pits = env.board.pits
+        if env.side_to_move == Side.NORTH:
+            stride = len(pits) // 2
+            return bytes(pits[stride:] + pits[:stride])
+        return bytes(pits)
+
+    def get(self, key: bytes) -> (np.ndarray, float) or None:
+        """Returns the distribution and value stored for key, or None."""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return entry
+
+    def put(self, key: bytes, dist: np.ndarray, value: float):
+        self._entries[key] = (dist, value)
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.capacity:
+            self._entries.popitem(last=False)
+
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups > 0 else 0.0
+
+    def statistics(self) -> str:
+        return 'EvaluationCache: %d of %d entries, %d hits and %d misses (%.0f%%)' % (
+            len(self), self.capacity, self.hits, self.misses, 100 * self.hit_rate())
+
+    def save(self, path: str = DEFAULT_PATH):
+        """Writes the entries to path. The file is replaced atomically, so readers never see a partial cache."""
+        keys = list(self._entries.keys())
+        entries = list(self._entries.values())
+        temp_path = path + '.tmp'
+        with open(temp_path, 'wb') as file:
+            np.savez(file,
+                     fingerprint=np.array(self.fingerprint),
+                     keys=np.array([np.frombuffer(key, dtype=np.uint8) for key in keys], dtype=np.uint8),
+                     dists=np.array([dist for dist, _ in entries], dtype=np.float64),
+                     values=np.array([value for _, value in entries], dtype=np.float64))
+        os.replace(temp_path, path)
+
+    @staticmethod
+    def open(path: str = DEFAULT_PATH, capacity: int = 2 ** 16, fingerprint: str = ''):
+        """Reads the cache saved at path by a network with the weights of fingerprint, or returns an empty cache if
+        there is no such file or it was saved with other weights."""
+        cache = EvaluationCache(capacity, fingerprint)
+        try:
+            with np.load(path) as saved:
+                # Caches saved before the fingerprint was stored are of unknown weights
+                saved_fingerprint = str(saved['fingerprint']) if 'fingerprint' in saved.files else None
+                keys, dists, values = saved['keys'], saved['dists'], saved['values']
+        except FileNotFoundError:
+            logging.warning('No evaluation cache at %s' % path)
+            return cache
+        if saved_fingerprint != fingerprint:
+            logging.warning('Discarding evaluation cache %s: it was saved with other weights' % path)
+            return cache
+        for key, dist, value in zip(keys, dists, values):
+            cache.put(key.tobytes(), dist, float(value))
+        logging.info('Loaded evaluation cache %s: %d positions' % (path, len(cache)))
+        return cache
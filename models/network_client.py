@@ -0,0 +1,88 @@
+import numpy as np
+
+from magent.batch_mancala import BatchMancalaEnv
+from magent.mancala import MancalaEnv
+from magent.side import Side, NORTH_INDEX
+from models import evaluation_cache
+from models.a3c.numpy_model import NumpyACNetwork, DEFAULT_PATH
+from models.evaluation_cache import EvaluationCache
+
+
+class NetworkClient(object):
+    """
+    Evaluates positions with an actor-critic network for the search: the network sees the board from the side to
+    move and its policy covers the holes 1 to 7 (the pie move is never suggested). The network is anything with the
+    evaluate_move, evaluate_moves and sample methods of ACNetwork.
+    """
+
+    def __init__(self, network, cache: EvaluationCache = None):
+        self.network = network
+        # Evaluations of the positions seen before, if given
+        self.cache = cache
+        # The evaluation_cache.fingerprint of the weights of the network, None if they are not known
+        self.fingerprint = None
+
+    def evaluate_state(self, env: MancalaEnv) -> (float, float):
+        if self.cache is not None:
+            key = EvaluationCache.key(env)
+            entry = self.cache.get(key)
+            if entry is not None:
+                return entry
+
+        flip_board = env.side_to_move == Side.NORTH
+        state = env.board.get_board_image(flipped=flip_board)
+        mask = env.get_action_mask_with_no_pie()
+        dist, _, value = self.network.evaluate_move(state=state, mask=mask)
+        # The value comes shaped [[value]]
+        value = float(np.squeeze(value))
+
+        if self.cache is not None:
+            self.cache.put(key, dist, value)
+        return dist, value
+
+    def sample_state(self, env: MancalaEnv) -> (int, float):
+        if self.cache is not None:
+            # Sample from the cached distribution, as ACNetwork.sample does from a new one
+            dist, value = self.evaluate_state(env)
+            return np.random.choice(range(dist.size), p=dist), value
+        flip_board = env.side_to_move == Side.NORTH
+        state = env.board.get_board_image(flipped=flip_board)
+        mask = env.get_action_mask_with_no_pie()
+        return self.network.sample(state=state, mask=mask)
+
+    def evaluate_games(self, batch: BatchMancalaEnv, games: np.ndarray) -> (np.ndarray, np.ndarray):
+        """evaluate_state of the selected games of batch in one run of the network: a dist per game, and values."""
+        images = batch.get_board_image(flipped=batch.side_to_move == NORTH_INDEX)
+        masks = batch.get_action_mask_with_no_pie()
+        if self.cache is None:
+            return self.network.evaluate_moves(states=images[games], masks=masks[games])
+
+        # The flipped images hold the pits of the cache keys; only the games not in the cache go to the network
+        keys = [images[game, :, :, 0].astype(np.uint8).tobytes() for game in games]
+        dists = np.zeros((len(games), masks.shape[1]))
+        values = np.zeros(len(games))
+        missing = []
+        for row, key in enumerate(keys):
+            entry = self.cache.get(key)
+            if entry is None:
+                missing.append(row)
+            else:
+                dists[row], values[row] = entry
+        if len(missing) > 0:
+            missing_games = np.asarray(games)[missing]
+            new_dists, new_values = self.network.evaluate_moves(states=images[missing_games],
+                                                                masks=masks[missing_games])
+            dists[missing], values[missing] = new_dists, new_values
+            for row, dist, value in zip(missing, new_dists, new_values):
+                self.cache.put(keys[row], dist, float(value))
+        return dists, values
+
+
+class NumpyClient(NetworkClient):
+    """A NetworkClient on the weights exported by models.a3c.export, which runs without TensorFlow."""
+
+    def __init__(self, path: str = DEFAULT_PATH, cache: EvaluationCache = None):
+        with np.load(path) as weights:
+            weights = dict(weights)
+        super().__init__(NumpyACNetwork(weights), cache)
+        self.fingerprint = evaluation_cache.fingerprint(weights)
@@ -55,7 +55,7 @@ class PolicyGradientTrainer(object):
         action = self.agent.sample_action(state, valid_actions_mask)
 
         seeds_in_store_before = self.env.board.get_seeds_in_store(self.agent_side)
-        self.env.perform_move(Move(self.agent_side, action))
+        self.env.perform_move(Move.of(self.agent_side, action))
 
         seeds_in_store_after = self.env.board.get_seeds_in_store(self.agent_side)
         reward = (seeds_in_store_after - seeds_in_store_before) / 10.0
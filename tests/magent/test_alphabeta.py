@@ -0,0 +1,143 @@
+import random
+import unittest
+from unittest import mock
+
+from magent.board import Board
+from magent.mancala import MancalaEnv
+from magent.side import Side
+from magent.treesearch.alphabeta import alphabeta
+from magent.treesearch.alphabeta.alphabeta import AlphaBeta
+
+
+def _minimax(state: MancalaEnv, depth: int, nodes: list = None, quiescence: bool = False) -> float:
+    """Full width minimax with the depth rules of AlphaBeta. Appends the depth of each node searched to nodes."""
+    if nodes is not None:
+        nodes.append(depth)
+    if depth == 0 and quiescence and not state.is_game_over():
+        return _quiescence_minimax(state, 8)
+    if state.is_game_over() or depth == 0:
+        return state.get_player_utility()
+    values = []
+    for move in state.get_legal_moves():
+        side = state.side_to_move
+        record = state.apply_move(move)
+        values.append(_minimax(state, depth if state.side_to_move == side else depth - 1, nodes, quiescence))
+        state.undo_move(record)
+    return max(values) if state.side_to_move == Side.SOUTH else min(values)
+
+
+def _quiescence_minimax(state: MancalaEnv, plies: int) -> float:
+    """Full width minimax over the noisy moves, where the side to move may also keep the utility of the position."""
+    values = [state.get_player_utility()]
+    if plies == 0 or state.is_game_over():
+        return values[0]
+    for move in AlphaBeta._noisy_moves(state):
+        record = state.apply_move(move)
+        values.append(_quiescence_minimax(state, plies - 1))
+        state.undo_move(record)
+    return max(values) if state.side_to_move == Side.SOUTH else min(values)
+
+
+def _random_position(rng: random.Random, moves: int) -> MancalaEnv:
+    state = MancalaEnv()
+    for _ in range(moves):
+        if state.is_game_over():
+            break
+        state.perform_move(rng.choice(state.get_legal_moves()))
+    return state
+
+
+class TestAlphaBeta(unittest.TestCase):
+
+    def test_value_matches_minimax(self):
+        rng = random.Random(1)
+        for _ in range(15):
+            state = _random_position(rng, rng.randint(0, 30))
+            if state.is_game_over():
+                continue
+            # The table can return results of deeper searches, so it is left out to compare with a fixed depth
+            _, value = AlphaBeta(depth=3, tt_memory_mb=0).evaluate(state)
+            self.assertEqual(value, _minimax(MancalaEnv.clone(state), 3))
+
+    def test_quiescence_value_matches_minimax(self):
+        rng = random.Random(8)
+        for _ in range(15):
+            state = _random_position(rng, rng.randint(0, 30))
+            if state.is_game_over():
+                continue
+            _, value = AlphaBeta(depth=2, tt_memory_mb=0, quiescence=True).evaluate(state)
+            self.assertEqual(value, _minimax(MancalaEnv.clone(state), 2, quiescence=True))
+
+    def test_quiescence_resolves_capture_at_horizon(self):
+        # If SOUTH plays hole 1, NORTH captures the 9 seeds in SOUTH's hole 3 by sowing hole 4 into its empty hole 5.
+        # A depth 1 search stops before NORTH's reply; the quiescence search plays the capture and saves the seeds.
+        state = MancalaEnv()
+        board = Board(7, 0)
+        board.set_seeds(Side.SOUTH, 1, 1)
+        board.set_seeds(Side.SOUTH, 3, 9)
+        board.set_seeds(Side.NORTH, 4, 1)
+        board.set_seeds(Side.NORTH, 7, 2)
+        state.board = board
+        state.side_to_move = Side.SOUTH
+        state.north_moved = True
+
+        self.assertEqual(AlphaBeta(depth=1, tt_memory_mb=0).search(state).index, 1)
+        move, value = AlphaBeta(depth=1, tt_memory_mb=0, quiescence=True).evaluate(state)
+        self.assertEqual(move.index, 3)
+        self.assertEqual(value, _minimax(MancalaEnv.clone(state), 1, quiescence=True))
+
+    def test_search_leaves_state_unchanged(self):
+        state = _random_position(random.Random(2), 6)
+        before = MancalaEnv.clone(state)
+        for search in [AlphaBeta(depth=4), AlphaBeta(depth=4, quiescence=True)]:
+            move = search.search(state)
+            self.assertTrue(state.is_legal(move))
+            self.assertEqual(state, before)
+
+    def test_pruning_searches_fewer_nodes(self):
+        state = _random_position(random.Random(3), 10)
+        nodes = []
+        _minimax(MancalaEnv.clone(state), 4, nodes)
+        search = AlphaBeta(depth=4, tt_memory_mb=0)
+        search.search(state)
+
+        self.assertEqual(search.completed_depth, 4)
+        # Even counting the nodes of the shallower iterations, pruning leaves out most of the tree
+        self.assertLess(search.nodes * 4, len(nodes))
+
+    def test_transposition_table_saves_nodes(self):
+        state = _random_position(random.Random(4), 8)
+        without_table = AlphaBeta(depth=5, tt_memory_mb=0)
+        with_table = AlphaBeta(depth=5, tt_memory_mb=1)
+        without_table.search(state)
+        move = with_table.search(state)
+
+        self.assertTrue(state.is_legal(move))
+        self.assertGreater(with_table.table.hits, 0)
+        self.assertGreater(with_table.tt_cutoffs, 0)
+        self.assertLess(with_table.nodes, without_table.nodes)
+
+        # A second search of the same position starts from the stored results
+        nodes = with_table.nodes
+        with_table.search(state)
+        self.assertLess(with_table.nodes, nodes)
+
+    def test_time_budget_returns_best_move_of_completed_depth(self):
+        state = MancalaEnv()
+        search = AlphaBeta(depth=40, time_sec=0.2)
+        move = search.search(state)
+
+        self.assertTrue(state.is_legal(move))
+        self.assertGreaterEqual(search.completed_depth, 1)
+        self.assertLess(search.completed_depth, 40)
+
+    def test_depth_one_completes_without_time(self):
+        state = MancalaEnv()
+        search = AlphaBeta(depth=5, time_sec=0, quiescence=True)
+        # Check the clock at every node, so that any depth the clock applies to times out
+        with mock.patch.object(alphabeta, '_TIME_CHECK_NODES', 1):
+            move, value = search.evaluate(state)
+
+        self.assertTrue(state.is_legal(move))
+        self.assertIsNotNone(value)
+        self.assertEqual(search.completed_depth, 1)
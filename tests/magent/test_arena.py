@@ -0,0 +1,83 @@
+import random
+import unittest
+
+import numpy as np
+
+from magent.mancala import MancalaEnv
+from magent.move import HOLES_IN_MASK
+from magent.treesearch.mcts.graph import node_utils
+from magent.treesearch.mcts.graph.arena import NodeArena
+from magent.treesearch.mcts.graph.node import Node
+from tests.magent.test_alphabeta import _random_position
+
+
+class TestNodeArena(unittest.TestCase):
+
+    def test_children_hold_the_states_after_their_moves(self):
+        arena = NodeArena()
+        state = _random_position(random.Random(1), 9)
+        root = arena.add_root(MancalaEnv.clone(state))
+        self.assertEqual(arena.state(root), state)
+
+        indexes = HOLES_IN_MASK[state.get_legal_moves_bitmask()]
+        first = arena.add_children(root, state, indexes)
+        children = arena.children(root)
+        self.assertEqual((children.start, children.stop), (first, first + len(indexes)))
+        for child in range(children.start, children.stop):
+            expected = MancalaEnv.clone(state)
+            expected.perform_move(state.get_legal_moves()[child - first])
+            child_state = arena.state(child)
+            self.assertEqual(child_state, expected)
+            self.assertEqual(child_state.our_side, expected.our_side)
+            self.assertEqual(child_state.key, expected.key)
+            self.assertEqual(arena.parents[child], root)
+            self.assertEqual(arena.visits[child], 0)
+
+    def test_grows_when_full(self):
+        arena = NodeArena(capacity=2)
+        state = MancalaEnv()
+        root = arena.add_root(state)
+        arena.visits[root] = 5
+        first = arena.add_children(root, state, HOLES_IN_MASK[state.get_legal_moves_bitmask()])
+
+        self.assertGreaterEqual(arena.capacity, 8)
+        self.assertEqual(arena.size, 8)
+        self.assertEqual(arena.visits[root], 5)
+        self.assertEqual(arena.first_child[root], first)
+        self.assertEqual(arena.state(root), state)
+
+    def test_add_root_empties_the_arena(self):
+        arena = NodeArena()
+        state = MancalaEnv()
+        arena.add_children(arena.add_root(state), state, [1, 2])
+        arena.add_root(state)
+
+        self.assertEqual(arena.size, 1)
+        self.assertEqual(arena.first_child[0], -1)
+
+
+class TestVectorizedSelection(unittest.TestCase):
+
+    def setUp(self):
+        self.parent = Node(state=MancalaEnv())
+        self.parent.visits = 30
+        self.parent.children = []
+        rng = random.Random(2)
+        for _ in range(5):
+            child = Node(state=MancalaEnv(), parent=self.parent)
+            child.visits = rng.randint(1, 10)
+            child.reward = rng.uniform(-child.visits, child.visits)
+            child.value = rng.random()
+            self.parent.children.append(child)
+        self.rewards = np.array([child.reward for child in self.parent.children])
+        self.visits = np.array([child.visits for child in self.parent.children])
+        self.values = np.array([child.value for child in self.parent.children])
+
+    def test_uct_scores(self):
+        expected = [node_utils._uct_reward(self.parent, child) for child in self.parent.children]
+        np.testing.assert_allclose(node_utils.uct_scores(self.rewards, self.visits, self.parent.visits), expected)
+
+    def test_rave_scores(self):
+        expected = [node_utils._uct_rave_reward(self.parent, child) for child in self.parent.children]
+        scores = node_utils.rave_scores(self.rewards, self.visits, self.values, self.parent.visits)
+        np.testing.assert_allclose(scores, expected)
@@ -0,0 +1,30 @@
+import unittest
+
+import numpy as np
+
+from magent.mancala import MancalaEnv
+from magent.treesearch.mcts.arena_mcts import ArenaMCTS, UCT, RAVE, PUCT
+from magent.treesearch.mcts.policies.default_policy import MonteCarloDefaultPolicy
+
+
+class TestArenaMCTS(unittest.TestCase):
+
+    def test_search_generates_legal_move_and_keeps_state(self):
+        for selection in [RAVE, UCT]:
+            state = MancalaEnv()
+            before = MancalaEnv.clone(state)
+            mcts = ArenaMCTS(MonteCarloDefaultPolicy(), time_sec=0.5, selection=selection)
+            move = mcts.search(state)
+
+            self.assertTrue(state.is_legal(move))
+            self.assertEqual(state, before)
+            arena = mcts.arena
+            self.assertGreater(mcts.simulations, 0)
+            self.assertEqual(arena.visits[0], mcts.simulations)
+            # Every visit of a node went on to one of its children
+            children = arena.children(0)
+            self.assertEqual(np.sum(arena.visits[children]), mcts.simulations)
+
+    def test_unknown_selection(self):
+        self.assertRaises(ValueError, ArenaMCTS, MonteCarloDefaultPolicy(), 1, 'ucb')
+        self.assertRaises(ValueError, ArenaMCTS, MonteCarloDefaultPolicy(), 1, PUCT)
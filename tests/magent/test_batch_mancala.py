@@ -0,0 +1,70 @@
+import unittest
+
+import numpy as np
+
+from magent.batch_mancala import BatchMancalaEnv
+from magent.mancala import MancalaEnv
+from magent.move import Move
+from magent.side import Side, NORTH_INDEX
+
+
+class TestBatchMancalaEnv(unittest.TestCase):
+
+    def test_initial_state_matches_mancala_env(self):
+        batch = BatchMancalaEnv(3)
+        env = MancalaEnv()
+
+        for game in range(3):
+            self.assertEqual(batch.boards[game].tolist(), env.board.board)
+        self.assertTrue((batch.get_action_mask_with_no_pie() == env.get_action_mask_with_no_pie()).all())
+
+    def test_step_matches_mancala_env_on_random_games(self):
+        rng = np.random.RandomState(3)
+        games = 64
+        batch = BatchMancalaEnv(games)
+        envs = [MancalaEnv() for _ in range(games)]
+
+        while not batch.done.all():
+            mask = batch.get_legal_moves_mask()
+            actions = np.argmax(rng.random_sample(mask.shape) * mask, axis=1)
+            flipped = batch.side_to_move == NORTH_INDEX
+            images = batch.get_board_image(flipped=flipped)
+            no_pie_masks = batch.get_action_mask_with_no_pie()
+
+            expected_rewards = np.zeros(games)
+            for game, env in enumerate(envs):
+                if env.is_game_over():
+                    continue
+                self.assertTrue((images[game] == env.board.get_board_image(flipped=bool(flipped[game]))).all())
+                self.assertTrue((no_pie_masks[game] == env.get_action_mask_with_no_pie()).all())
+                expected_rewards[game] = env.perform_move(Move(env.side_to_move, int(actions[game])))
+
+            rewards, done = batch.step(actions)
+
+            self.assertTrue(np.allclose(rewards, expected_rewards))
+            for game, env in enumerate(envs):
+                self.assertEqual(batch.boards[game].tolist(), env.board.board)
+                self.assertEqual(batch.side_to_move[game], Side.get_index(env.side_to_move))
+                self.assertEqual(batch.our_side[game], Side.get_index(env.our_side))
+                self.assertEqual(batch.north_moved[game], env.north_moved)
+                self.assertEqual(done[game], env.is_game_over())
+
+        winners = batch.get_winner()
+        for game, env in enumerate(envs):
+            winner = env.get_winner()
+            self.assertEqual(winners[game], -1 if winner is None else Side.get_index(winner))
+
+    def test_step_rejects_illegal_actions(self):
+        batch = BatchMancalaEnv(2)
+        with self.assertRaises(ValueError):
+            batch.step(np.array([1, 0]))
+
+    def test_finished_games_are_not_stepped(self):
+        batch = BatchMancalaEnv(2)
+        batch.done[0] = True
+        boards = batch.boards.copy()
+
+        rewards, _ = batch.step(np.array([0, 1]))
+
+        self.assertEqual(rewards[0], 0)
+        self.assertEqual(batch.boards[0].tolist(), boards[0].tolist())
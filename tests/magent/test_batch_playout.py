@@ -0,0 +1,70 @@
+import random
+import unittest
+
+import numpy as np
+
+from magent.batch_mancala import BatchMancalaEnv
+from magent.mancala import MancalaEnv
+from magent.side import Side
+from magent.treesearch import evaluation
+from magent.treesearch.mcts.batch_playout import BatchPlayoutEngine, PlayoutResults, batch_scores, RANDOM, SOFTMAX
+from tests.magent.test_alphabeta import _random_position
+
+
+class TestBatchPlayout(unittest.TestCase):
+    def test_batch_scores_match_get_score(self):
+        rng = random.Random(0)
+        batch = BatchMancalaEnv(1)
+        boards, sides, our_sides, expected = [], [], [], []
+        for _ in range(100):
+            state = _random_position(rng, rng.randint(0, 60))
+            side = state.side_to_move
+            for move in state.get_legal_moves():
+                record = state.apply_move(move)
+                batch.load(state)
+                boards.append(batch.boards[0].copy())
+                sides.append(Side.get_index(side))
+                our_sides.append(Side.get_index(state.our_side))
+                expected.append(evaluation.get_score(state, side))
+                state.undo_move(record)
+        scores = batch_scores(np.array(boards), np.array(sides), np.array(our_sides))
+        self.assertEqual(scores.tolist(), expected)
+
+    def test_load_matches_mancala_env(self):
+        state = _random_position(random.Random(1), 9)
+        batch = BatchMancalaEnv(3)
+        batch.load(state, np.array([1]))
+        self.assertEqual(batch.boards[1].tolist(), state.board.board)
+        self.assertEqual(batch.side_to_move[1], Side.get_index(state.side_to_move))
+        self.assertEqual(batch.north_moved[1], state.north_moved)
+        self.assertEqual(batch.boards[0].tolist(), MancalaEnv().board.board)
+
+    def test_play_finishes_every_game(self):
+        for policy in (RANDOM, SOFTMAX):
+            engine = BatchPlayoutEngine(16, policy, rng=np.random.RandomState(0))
+            state = MancalaEnv()
+            results = engine.play(state)
+            self.assertTrue(engine._games.done.all())
+            self.assertEqual((engine._games.boards[:, :, 0].sum(axis=1) == 98).sum(), 16)
+            self.assertEqual(results.playouts, 16)
+            self.assertEqual(results.compute_end_game_reward(Side.NORTH) +
+                             results.compute_end_game_reward(Side.SOUTH), 1.0)
+            # The position played from is not changed
+            self.assertEqual(state, MancalaEnv())
+
+    def test_results_average_the_game_rewards(self):
+        boards = np.zeros((4, 2, 8), dtype=np.int16)
+        # NORTH wins two games, SOUTH one and one is a tie
+        boards[:, 0, 0] = [60, 50, 40, 49]
+        boards[:, 1, 0] = [38, 48, 58, 49]
+        results = PlayoutResults(boards)
+        self.assertEqual(results.compute_end_game_reward(Side.NORTH), 0.625)
+        self.assertEqual(results.compute_end_game_reward(Side.SOUTH), 0.375)
+
+    def test_finished_position_gives_its_result(self):
+        state = MancalaEnv()
+        while not state.is_game_over():
+            state.perform_move(state.get_legal_moves()[-1])
+        results = BatchPlayoutEngine(4, rng=np.random.RandomState(0)).play(state)
+        for side in (Side.NORTH, Side.SOUTH):
+            self.assertEqual(results.compute_end_game_reward(side), state.compute_end_game_reward(side))
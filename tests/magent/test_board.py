@@ -1,4 +1,6 @@
+import copy
 import unittest
+from magent import zobrist
 from magent.side import Side
 from magent.board import Board
 
@@ -17,3 +19,47 @@ class TestBoard(unittest.TestCase):
         self.assertEqual(board.get_seeds_in_store(Side.SOUTH), clone.get_seeds_in_store(Side.SOUTH))
         self.assertEqual(board.get_seeds_in_store(Side.NORTH), clone.get_seeds_in_store(Side.NORTH))
 
+    def test_clone_copies_stores(self):
+        board = Board(7, 7)
+        board.set_seeds_in_store(Side.NORTH, 3)
+        board.set_seeds_in_store(Side.SOUTH, 11)
+        clone = Board.clone(board)
+
+        self.assertEqual(clone.get_seeds_in_store(Side.NORTH), 3)
+        self.assertEqual(clone.get_seeds_in_store(Side.SOUTH), 11)
+
+    def test_clone_does_not_share_pits(self):
+        board = Board(7, 7)
+        clone = Board.clone(board)
+        clone.set_seeds(Side.NORTH, 2, 0)
+
+        self.assertEqual(board.get_seeds(Side.NORTH, 2), 7)
+
+    def test_board_rows_match_pits(self):
+        board = Board(7, 7)
+        board.set_seeds(Side.SOUTH, 1, 4)
+        board.set_seeds_in_store(Side.NORTH, 2)
+
+        self.assertEqual(board.board, [[2, 7, 7, 7, 7, 7, 7, 7], [0, 4, 7, 7, 7, 7, 7, 7]])
+        self.assertEqual(board.get_board_image(flipped=True)[0, 1, 0], 4)
+
+    def test_setters_keep_key_in_sync(self):
+        board = Board(7, 7)
+        board.set_seeds(Side.SOUTH, 1, 4)
+        board.set_seeds_op(Side.SOUTH, 3, 9)
+        board.add_seeds(Side.NORTH, 7, 2)
+        board.add_seeds_to_store(Side.SOUTH, 5)
+        board.set_seeds_in_store(Side.NORTH, 1)
+
+        self.assertEqual(board.key, zobrist.board_key(board.pits))
+
+    def test_deepcopy_shares_tables(self):
+        board = Board(7, 7)
+        board.set_seeds(Side.NORTH, 2, 5)
+        board_copy = copy.deepcopy(board)
+
+        self.assertEqual(board_copy.board, board.board)
+        self.assertEqual(board_copy.key, board.key)
+        self.assertIsNot(board_copy.pits, board.pits)
+        self.assertIs(board_copy.sowing, board.sowing)
+        self.assertIs(board_copy.pit_keys, board.pit_keys)
@@ -0,0 +1,113 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from magent.mancala import MancalaEnv
+from magent.side import Side
+from models import evaluation_cache
+from models.evaluation_cache import EvaluationCache
+
+
+def _position(pits: bytes, side_to_move: Side) -> MancalaEnv:
+    state = MancalaEnv()
+    state.board.pits[:] = pits
+    state.board.rehash()
+    state.side_to_move = side_to_move
+    return state
+
+
+class TestEvaluationCache(unittest.TestCase):
+    def test_key_is_the_board_seen_by_the_side_to_move(self):
+        north_pits = bytes([3, 1, 2, 3, 4, 5, 6, 7, 5, 0, 9, 8, 7, 6, 5, 4])
+        south_pits = north_pits[8:] + north_pits[:8]
+        north_to_move = _position(north_pits, Side.NORTH)
+        south_to_move = _position(south_pits, Side.SOUTH)
+        self.assertEqual(EvaluationCache.key(north_to_move), EvaluationCache.key(south_to_move))
+        self.assertEqual(EvaluationCache.key(north_to_move),
+                         north_to_move.board.get_board_image(flipped=True).astype(np.uint8).tobytes())
+        self.assertNotEqual(EvaluationCache.key(_position(north_pits, Side.SOUTH)),
+                            EvaluationCache.key(north_to_move))
+
+    def test_counts_hits_and_misses(self):
+        cache = EvaluationCache(4)
+        key = EvaluationCache.key(MancalaEnv())
+        self.assertIsNone(cache.get(key))
+        cache.put(key, np.full(7, 1 / 7), 0.25)
+        dist, value = cache.get(key)
+        self.assertEqual(value, 0.25)
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+        self.assertEqual(cache.hit_rate(), 0.5)
+
+    def test_drops_the_least_recently_used_entry(self):
+        cache = EvaluationCache(2)
+        cache.put(b'a', np.zeros(7), 0.0)
+        cache.put(b'b', np.zeros(7), 1.0)
+        cache.get(b'a')
+        cache.put(b'c', np.zeros(7), 2.0)
+        self.assertEqual(len(cache), 2)
+        self.assertIsNone(cache.get(b'b'))
+        self.assertIsNotNone(cache.get(b'a'))
+        self.assertIsNotNone(cache.get(b'c'))
+
+    def test_save_and_open(self):
+        cache = EvaluationCache(8)
+        state = MancalaEnv()
+        keys = []
+        for move in state.get_legal_moves():
+            child = MancalaEnv.clone(state)
+            child.perform_move(move)
+            keys.append(EvaluationCache.key(child))
+            cache.put(keys[-1], np.arange(7) / 21, float(move.index))
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'evaluations.npz')
+            cache.save(path)
+            loaded = EvaluationCache.open(path, capacity=8)
+        self.assertEqual(len(loaded), len(keys))
+        for key in keys:
+            dist, value = loaded.get(key)
+            np.testing.assert_array_equal(dist, np.arange(7) / 21)
+            self.assertEqual(value, cache.get(key)[1])
+
+    def test_cache_of_other_weights_is_discarded(self):
+        weights = {'dense/kernel': np.ones((16, 20), dtype=np.float32), 'dense/bias': np.zeros(20, dtype=np.float32)}
+        retrained = dict(weights, **{'dense/bias': np.full(20, 0.5, dtype=np.float32)})
+        fingerprint = evaluation_cache.fingerprint(weights)
+        self.assertEqual(fingerprint, evaluation_cache.fingerprint(dict(weights)))
+        self.assertNotEqual(fingerprint, evaluation_cache.fingerprint(retrained))
+
+        cache = EvaluationCache(8, fingerprint=fingerprint)
+        key = EvaluationCache.key(MancalaEnv())
+        cache.put(key, np.full(7, 1 / 7), 0.25)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'evaluations.npz')
+            cache.save(path)
+            same = EvaluationCache.open(path, fingerprint=fingerprint)
+            other = EvaluationCache.open(path, fingerprint=evaluation_cache.fingerprint(retrained))
+        self.assertEqual(len(same), 1)
+        self.assertEqual(len(other), 0)
+        self.assertIsNone(other.get(key))
+        self.assertEqual(other.fingerprint, evaluation_cache.fingerprint(retrained))
+
+    def test_cache_without_a_fingerprint_is_discarded(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'evaluations.npz')
+            # A cache saved before the fingerprint was stored
+            np.savez(path, keys=np.zeros((1, 16), dtype=np.uint8), dists=np.zeros((1, 7)), values=np.zeros(1))
+            self.assertEqual(len(EvaluationCache.open(path, fingerprint='0' * 40)), 0)
+
+    def test_open_without_a_file_is_empty(self):
+        with tempfile.TemporaryDirectory() as directory:
+            cache = EvaluationCache.open(os.path.join(directory, 'missing.npz'))
+        self.assertEqual(len(cache), 0)
+
+    def test_save_empty(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'evaluations.npz')
+            EvaluationCache().save(path)
+            self.assertEqual(len(EvaluationCache.open(path)), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,8 +1,11 @@
+import random
 import unittest
+from magent.board import Board
 from magent.mancala import MancalaEnv
 from magent.side import Side
 from magent.move import Move
-from magent.alphabeta.alphabeta import search_action
+from magent.treesearch.alphabeta.alphabeta import AlphaBeta
+from magent import zobrist
 
 
 class TestMancalaGameState(unittest.TestCase):
@@ -92,6 +95,19 @@ class TestMancalaGameState(unittest.TestCase):
         self.game.perform_move(Move(Side.SOUTH, 3))
         self.assertEqual(len(set(self.game.get_legal_moves())), 8)
 
+    def test_legal_moves_bitmask_matches_legal_moves_on_random_games(self):
+        rng = random.Random(3)
+        for _ in range(20):
+            game = MancalaEnv()
+            while not game.is_game_over():
+                moves = game.get_legal_moves()
+                mask = game.get_legal_moves_bitmask()
+                self.assertEqual(mask, sum(1 << move.index for move in moves))
+                self.assertEqual(game.get_legal_actions(), [move.action for move in moves])
+                self.assertEqual(list(game.get_actions_mask()), [mask >> i & 1 for i in range(8)])
+                game.perform_move(rng.choice(moves))
+            self.assertEqual(game.get_legal_moves_bitmask(), 0)
+
     def test_side_to_move_doesnt_change(self):
         self.game.perform_move(Move(Side.SOUTH, 1))
         self.assertEqual(self.game.side_to_move, Side.NORTH)
@@ -108,6 +124,142 @@ class TestMancalaGameState(unittest.TestCase):
         board.set_seeds(Side.SOUTH, 2, 4)
         board.set_seeds_op(Side.SOUTH, 4, 5)
         print(self.game)
-        print(search_action(self.game))
+        print(AlphaBeta(depth=5).search(self.game))
+
+    def test_undo_move_restores_pie_move(self):
+        self.game.perform_move(Move(Side.SOUTH, 2))
+        before = MancalaEnv.clone(self.game)
+        record = self.game.apply_move(Move(Side.NORTH, 0))
+        self.assertEqual(self.game.our_side, Side.NORTH)
+
+        self.game.undo_move(record)
+        self._assert_same_state(before, self.game)
+
+    def test_apply_move_matches_perform_move_on_random_games(self):
+        rng = random.Random(7)
+        for _ in range(100):
+            game = MancalaEnv()
+            while not game.is_game_over():
+                before = MancalaEnv.clone(game)
+                for move in game.get_legal_moves():
+                    expected = MancalaEnv.clone(game)
+                    expected.perform_move(move)
+
+                    record = game.apply_move(move)
+                    self._assert_same_state(expected, game)
+                    self._assert_summaries_are_up_to_date(game.board)
+                    game.undo_move(record)
+                    self._assert_same_state(before, game)
+                    self._assert_summaries_are_up_to_date(game.board)
+                game.perform_move(rng.choice(game.get_legal_moves()))
+
+    def test_key_is_updated_incrementally(self):
+        rng = random.Random(3)
+        for _ in range(50):
+            game = MancalaEnv()
+            while not game.is_game_over():
+                game.perform_move(rng.choice(game.get_legal_moves()))
+                self.assertEqual(game.board.key, zobrist.board_key(game.board.pits))
+
+    def test_key_depends_on_side_to_move_and_north_moved(self):
+        other = MancalaEnv.clone(self.game)
+        other.side_to_move = Side.NORTH
+        self.assertNotEqual(self.game.key, other.key)
+        self.assertNotEqual(self.game, other)
+
+        other = MancalaEnv.clone(self.game)
+        other.north_moved = True
+        self.assertNotEqual(self.game.key, other.key)
+        self.assertNotEqual(self.game, other)
+
+    def test_transposed_positions_are_equal(self):
+        board = self.game.board
+        for hole in range(1, board.holes + 1):
+            board.set_seeds(Side.SOUTH, hole, 0)
+            board.set_seeds(Side.NORTH, hole, 0)
+        board.set_seeds(Side.SOUTH, 1, 1)
+        board.set_seeds(Side.SOUTH, 3, 1)
+        board.set_seeds(Side.NORTH, 1, 1)
+        board.set_seeds(Side.NORTH, 3, 1)
+        self.game.north_moved = True
+
+        first = MancalaEnv.clone(self.game)
+        for move in [Move(Side.SOUTH, 1), Move(Side.NORTH, 1), Move(Side.SOUTH, 3)]:
+            first.perform_move(move)
+        second = MancalaEnv.clone(self.game)
+        for move in [Move(Side.SOUTH, 3), Move(Side.NORTH, 1), Move(Side.SOUTH, 1)]:
+            second.perform_move(move)
+
+        self.assertEqual(first.board.board, second.board.board)
+        self.assertEqual(first, second)
+        self.assertEqual(first.key, second.key)
+        self.assertEqual(hash(first), hash(second))
+
+    def test_undo_move_restores_key(self):
+        key = self.game.key
+        record = self.game.apply_move(Move(Side.SOUTH, 4))
+        self.assertNotEqual(self.game.key, key)
+        self.game.undo_move(record)
+        self.assertEqual(self.game.key, key)
+
+    def test_make_move_matches_reference_on_random_boards(self):
+        rng = random.Random(5)
+        for _ in range(2000):
+            board = self.game.board
+            for hole in range(1, board.holes + 1):
+                board.set_seeds(Side.SOUTH, hole, rng.choice([0, 1, rng.randint(0, 6), rng.randint(0, 17)]))
+                board.set_seeds(Side.NORTH, hole, rng.choice([0, 1, rng.randint(0, 6), rng.randint(0, 17)]))
+            board.set_seeds_in_store(Side.SOUTH, rng.randint(0, 5))
+            board.set_seeds_in_store(Side.NORTH, rng.randint(0, 5))
+            north_moved = rng.random() < 0.5
+
+            for side in (Side.SOUTH, Side.NORTH):
+                for move in MancalaEnv.get_state_legal_actions(board, side, north_moved):
+                    expected = Board.clone(board)
+                    actual = Board.clone(board)
+                    expected_side = MancalaEnv.make_move_reference(expected, move, north_moved)
+                    actual_side = MancalaEnv.make_move(actual, move, north_moved)
+
+                    self.assertEqual(expected.board, actual.board)
+                    self.assertEqual(expected.key, actual.key)
+                    self.assertEqual(expected_side, actual_side)
+                    self._assert_summaries_are_up_to_date(actual)
+
+    def test_summaries_follow_pie_move_and_end_game_sweep(self):
+        self.game.perform_move(Move(Side.SOUTH, 1))
+        clone = MancalaEnv.clone(self.game)
+        self.game.perform_move(Move(Side.NORTH, 0))
+        self._assert_summaries_are_up_to_date(self.game.board)
+        self._assert_summaries_are_up_to_date(clone.board)
+        self.assertNotEqual(self.game.board.side_seeds, clone.board.side_seeds)
+
+        board = self.game.board
+        for hole in range(1, board.holes + 1):
+            board.set_seeds(Side.SOUTH, hole, 0)
+            board.set_seeds(Side.NORTH, hole, 2)
+        board.set_seeds(Side.SOUTH, board.holes, 1)
+        self.game.side_to_move = Side.SOUTH
+        self.assertEqual(self.game.get_legal_moves_bitmask(), 1 << board.holes)
+        self.assertFalse(self.game.is_game_over())
+
+        self.game.perform_move(Move(Side.SOUTH, board.holes))
+        self.assertTrue(self.game.is_game_over())
+        self.assertEqual(board.side_seeds, [0, 0])
+        self.assertEqual(board.filled, [0, 0])
+        self.assertEqual(self.game.get_legal_moves_bitmask(), 0)
+        self._assert_summaries_are_up_to_date(board)
+
+    def _assert_summaries_are_up_to_date(self, board):
+        expected = Board.clone(board)
+        expected.rehash()
+        self.assertEqual(expected.side_seeds, board.side_seeds)
+        self.assertEqual(expected.filled, board.filled)
+
+    def _assert_same_state(self, expected, actual):
+        self.assertEqual(expected.board.board, actual.board.board)
+        self.assertEqual(expected.side_to_move, actual.side_to_move)
+        self.assertEqual(expected.north_moved, actual.north_moved)
+        self.assertEqual(expected.our_side, actual.our_side)
+        self.assertEqual(expected.key, actual.key)
 
 
@@ -0,0 +1,77 @@
+import unittest
+
+from magent.mancala import MancalaEnv
+from magent.move import Move
+from magent.side import Side
+from magent.treesearch.mcts.mcts import MCTS
+from magent.treesearch.mcts.policies.default_policy import MonteCarloDefaultPolicy
+from magent.treesearch.mcts.policies.rollout_policy import MonteCarloRollOutPolicy
+from magent.treesearch.mcts.policies.tree_policy import MonteCarloTreePolicy
+
+
+def _mcts(time_sec: float) -> MCTS:
+    return MCTS(tree_policy=MonteCarloTreePolicy(),
+                default_policy=MonteCarloDefaultPolicy(),
+                rollout_policy=MonteCarloRollOutPolicy(),
+                time_sec=time_sec)
+
+
+class TestMCTSReuse(unittest.TestCase):
+
+    def test_search_continues_from_the_subtree_of_the_new_position(self):
+        state = MancalaEnv()
+        mcts = _mcts(0.5)
+        move = mcts.search(state)
+        state.perform_move(move)
+        if state.side_to_move == Side.NORTH:
+            state.perform_move(Move.of(Side.NORTH, 3))
+        subtree = mcts._find_root(state)
+        self.assertIsNotNone(subtree)
+        inherited = subtree.visits
+
+        mcts.search(state)
+        self.assertIs(mcts.root, subtree)
+        self.assertIsNone(mcts.root.parent)
+        self.assertGreater(mcts.root.visits, inherited)
+
+    def test_played_moves_are_followed(self):
+        state = MancalaEnv()
+        mcts = _mcts(0.5)
+        move = mcts.search(state)
+        state.perform_move(move)
+        mcts.play(move)
+        expected = mcts.root.children[mcts.root.child_moves.index(move)]
+        if state.side_to_move == Side.NORTH:
+            reply = Move.of(Side.NORTH, 3)
+            state.perform_move(reply)
+            mcts.play(reply)
+            expected = expected.children[expected.child_moves.index(reply)]
+
+        self.assertIs(mcts._follow_played_moves(), expected)
+        self.assertIs(mcts._find_root(state), expected)
+        mcts.search(state)
+        self.assertIs(mcts.root, expected)
+        self.assertEqual(mcts._played_moves, [])
+
+    def test_swap_is_followed(self):
+        state = MancalaEnv()
+        state.perform_move(Move.of(Side.SOUTH, 1))
+        mcts = _mcts(0.5)
+        mcts.search(state)
+        state.perform_move(Move.of(Side.NORTH, 0))
+
+        subtree = mcts._find_root(state)
+        self.assertIsNotNone(subtree)
+        self.assertEqual(subtree.state, state)
+        self.assertEqual(subtree.state.our_side, state.our_side)
+
+    def test_unknown_position_starts_a_new_tree(self):
+        mcts = _mcts(0.2)
+        mcts.search(MancalaEnv())
+        state = MancalaEnv()
+        state.board.set_seeds_in_store(Side.SOUTH, 20)
+
+        self.assertIsNone(mcts._find_root(state))
+        move = mcts.search(state)
+        self.assertTrue(state.is_legal(move))
+        self.assertEqual(mcts.root.state, state)
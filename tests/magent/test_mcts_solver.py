@@ -0,0 +1,128 @@
+import os
+import random
+import tempfile
+import unittest
+
+from magent import tablebase
+from magent.mancala import MancalaEnv
+from magent.side import Side
+from magent.tablebase_builder import build
+from magent.treesearch.mcts.graph.node import Node, exact_outcome
+from magent.treesearch.mcts.mcts import MCTS
+from magent.treesearch.mcts.policies.default_policy import MonteCarloDefaultPolicy
+from magent.treesearch.mcts.policies.rollout_policy import MonteCarloRollOutPolicy
+from magent.treesearch.mcts.policies.tree_policy import MonteCarloTreePolicy
+from tests.magent.test_tablebase import _final_reward_with_perfect_play
+
+
+def _endgame(rng: random.Random, seeds: int) -> MancalaEnv:
+    """A position with seeds seeds left in the holes, at least one on each side, after NORTH has moved."""
+    state = MancalaEnv()
+    board = state.board
+    for hole in range(1, board.holes + 1):
+        board.set_seeds(Side.SOUTH, hole, 0)
+        board.set_seeds(Side.NORTH, hole, 0)
+    for seed in range(seeds):
+        side = [Side.NORTH, Side.SOUTH][seed] if seed < 2 else rng.choice([Side.NORTH, Side.SOUTH])
+        board.add_seeds(side, rng.randint(1, board.holes), 1)
+    north_store = rng.randint(40, 98 - seeds - 40)
+    board.set_seeds_in_store(Side.NORTH, north_store)
+    board.set_seeds_in_store(Side.SOUTH, 98 - seeds - north_store)
+    state.side_to_move = rng.choice([Side.NORTH, Side.SOUTH])
+    state.north_moved = True
+    state.board.rehash()
+    return state
+
+
+class _RecordingDefaultPolicy(MonteCarloDefaultPolicy):
+    """MonteCarloDefaultPolicy that keeps the outcome the nodes it plays out from were proven to have, if any."""
+
+    def __init__(self):
+        super(_RecordingDefaultPolicy, self).__init__()
+        self.proven = []
+
+    def simulate(self, root: Node) -> MancalaEnv:
+        self.proven.append(root.proven)
+        return super(_RecordingDefaultPolicy, self).simulate(root)
+
+
+def _outcome(final_reward: int) -> float:
+    return 1 if final_reward > 0 else 0 if final_reward < 0 else 0.5
+
+
+class TestMCTSSolver(unittest.TestCase):
+
+    def test_finished_game_is_proven(self):
+        state = MancalaEnv()
+        while not state.is_game_over():
+            state.perform_move(state.get_legal_moves()[-1])
+        parent = Node(state=MancalaEnv())
+        for side in (Side.NORTH, Side.SOUTH):
+            parent.state.side_to_move = side
+            self.assertEqual(Node(state=state, parent=parent).proven, state.compute_end_game_reward(side))
+        self.assertIsNone(Node(state=MancalaEnv()).proven)
+
+    def test_prove_backs_up_the_outcomes_of_the_children(self):
+        state = _endgame(random.Random(0), 6)
+        root = Node(state=state)
+        for move in state.get_legal_moves():
+            child_state = MancalaEnv.clone(state)
+            child_state.perform_move(move)
+            child = Node(state=child_state, move=move, parent=root)
+            child.proven = 0
+            root.put_child(child)
+        root.prove(Side.opposite(state.side_to_move))
+        self.assertEqual(root.proven_child().proven, 0)
+        self.assertEqual(root.proven, 1)
+
+        root.proven = None
+        root.children[-1].proven = None
+        root.prove(state.side_to_move)
+        self.assertIsNone(root.proven)
+
+        root.children[0].proven = 1
+        root.prove(state.side_to_move)
+        self.assertIs(root.proven_child(), root.children[0])
+        self.assertEqual(root.proven, 1)
+
+    def test_search_stops_with_the_outcome_of_perfect_play(self):
+        rng = random.Random(3)
+        mcts = MCTS(MonteCarloTreePolicy(), MonteCarloDefaultPolicy(), MonteCarloRollOutPolicy(), time_sec=60)
+        for _ in range(5):
+            state = _endgame(rng, 5)
+            if len(state.get_legal_moves()) == 1:
+                continue
+            mcts.root = None
+            move = mcts.search(state)
+            chosen = mcts.root.proven_child()
+            self.assertIsNotNone(chosen)
+            self.assertEqual(mcts.root.move_to(chosen), move)
+            self.assertEqual(chosen.proven, _outcome(_final_reward_with_perfect_play(state)))
+
+    def test_proven_nodes_are_not_played_out(self):
+        rng = random.Random(4)
+        default_policy = _RecordingDefaultPolicy()
+        mcts = MCTS(MonteCarloTreePolicy(), default_policy, MonteCarloRollOutPolicy(), time_sec=60)
+        games = 0
+        for _ in range(5):
+            state = _endgame(rng, 6)
+            mcts.root = None
+            mcts.search(state)
+            games += mcts.root.visits
+        self.assertLess(len(default_policy.proven), games)
+        self.assertEqual(default_policy.proven, [None] * len(default_policy.proven))
+
+    def test_exact_outcome_reads_the_tablebase(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'endgame.tb')
+            build(path, holes=7, max_seeds=3, processes=1)
+            tablebase.load(path)
+            try:
+                rng = random.Random(5)
+                for _ in range(20):
+                    state = _endgame(rng, 3)
+                    expected = _outcome(_final_reward_with_perfect_play(state))
+                    self.assertEqual(exact_outcome(state, state.side_to_move), expected)
+                    self.assertEqual(exact_outcome(state, Side.opposite(state.side_to_move)), 1 - expected)
+            finally:
+                tablebase.unload()
@@ -0,0 +1,28 @@
+import unittest
+from magent.move import Move, encode_action, decode_action
+from magent.side import Side
+
+
+class TestMove(unittest.TestCase):
+
+    def test_moves_with_different_holes_are_not_equal(self):
+        self.assertNotEqual(Move(Side.SOUTH, 1), Move(Side.SOUTH, 2))
+        self.assertNotEqual(Move(Side.SOUTH, 1), Move(Side.NORTH, 1))
+        self.assertEqual(Move(Side.NORTH, 3), Move(Side.NORTH, 3))
+
+    def test_of_returns_the_shared_move(self):
+        self.assertIs(Move.of(Side.NORTH, 4), Move.of(Side.NORTH, 4))
+        self.assertEqual(Move.of(Side.NORTH, 4), Move(Side.NORTH, 4))
+        self.assertIs(Move.of(Side.SOUTH, 2).clone(), Move.of(Side.SOUTH, 2))
+
+    def test_action_round_trips(self):
+        for side in [Side.NORTH, Side.SOUTH]:
+            for index in range(8):
+                action = encode_action(side, index)
+                self.assertEqual(decode_action(action), (side, index))
+                self.assertIs(Move.from_action(action), Move.of(side, index))
+                self.assertEqual(Move(side, index).action, action)
+
+    def test_invalid_index_raises(self):
+        self.assertRaises(ValueError, Move.of, Side.SOUTH, 8)
+        self.assertRaises(ValueError, Move, Side.SOUTH, -1)
@@ -0,0 +1,109 @@
+import random
+import unittest
+
+import numpy as np
+
+from magent.mancala import MancalaEnv
+from magent.treesearch.mcts.graph.node import Node, AlphaNode
+from magent.treesearch.mcts.graph.node_store import NodeStore
+from magent.treesearch.mcts.policies.tree_policy import AlphaGoTreePolicy
+from tests.magent.test_alphabeta import _random_position
+
+
+def _expand(parent: Node, move) -> Node:
+    """Expands parent like the tree policies: a position already in the graph is linked, not created again."""
+    state = MancalaEnv.clone(parent.state)
+    state.perform_move(move)
+    child = parent.store.get(state, parent)
+    if child is None:
+        child = Node(state=state, move=move, parent=parent)
+        parent.store.put(child)
+    parent.put_child(child, move)
+    return child
+
+
+class _UniformNetwork(object):
+    """Stands in for a NetworkClient: every move is equally likely."""
+
+    def evaluate_state(self, state: MancalaEnv):
+        return np.full(state.board.holes, 1 / state.board.holes), 0.5
+
+
+def _transposition(state: MancalaEnv, plies: int) -> ([], []):
+    """Returns two different lines of play from state that reach the same node key, or None."""
+    store = NodeStore()
+    lines = {}
+    root = Node(state=MancalaEnv.clone(state))
+    frontier = [(root, [])]
+    for _ in range(plies):
+        next_frontier = []
+        for node, line in frontier:
+            for move in node.state.get_legal_moves():
+                child_state = MancalaEnv.clone(node.state)
+                child_state.perform_move(move)
+                key = NodeStore.key(child_state, node)
+                if key in lines:
+                    return lines[key], line + [move]
+                lines[key] = line + [move]
+                next_frontier.append((Node(state=child_state, move=move, parent=node), line + [move]))
+        frontier = next_frontier
+    return None
+
+
+class TestNodeStore(unittest.TestCase):
+
+    def setUp(self):
+        # Positions reached in a different order are rare early in the game, so this one is after 30 moves
+        self.state = _random_position(random.Random(0), 30)
+        self.lines = _transposition(self.state, 3)
+
+    def test_transposed_position_has_one_node(self):
+        self.assertIsNotNone(self.lines)
+        root = Node(state=MancalaEnv.clone(self.state))
+        root.store = NodeStore()
+        first_line, second_line = self.lines
+
+        nodes = [root]
+        for move in first_line:
+            nodes.append(_expand(nodes[-1], move))
+        leaf = nodes[-1]
+        self.assertEqual(root.store.hits, 0)
+
+        node = root
+        for move in second_line:
+            node = _expand(node, move)
+        self.assertIs(node, leaf)
+        self.assertEqual(root.store.hits, 1)
+        # The shared node now hangs from two parents and backpropagation follows the last one
+        self.assertIn(leaf, nodes[-2].children)
+        self.assertIn(leaf, leaf.parent.children)
+        self.assertEqual(leaf.parent.move_to(leaf), second_line[-1])
+
+    def test_alpha_go_expansion_shares_transposed_nodes(self):
+        self.assertIsNotNone(self.lines)
+        policy = AlphaGoTreePolicy(_UniformNetwork())
+        root = AlphaNode(state=MancalaEnv.clone(self.state), prior=1.0)
+        root.store = NodeStore()
+        leaves = []
+        for line in self.lines:
+            node = root
+            for move in line:
+                if len(node.children) == 0:
+                    policy.expand(node)
+                node = node.children[node.child_moves.index(move)]
+            leaves.append(node)
+        self.assertIsInstance(leaves[0], AlphaNode)
+        self.assertIs(leaves[0], leaves[1])
+        self.assertGreater(root.store.hits, 0)
+
+    def test_rebuild_keeps_the_nodes_below_the_new_root(self):
+        root = Node(state=MancalaEnv.clone(self.state))
+        root.store = NodeStore()
+        children = [_expand(root, move) for move in self.state.get_legal_moves()]
+        grandchildren = [_expand(children[0], move) for move in children[0].state.get_legal_moves()]
+
+        root.store.rebuild(children[0])
+        self.assertEqual(len(root.store.nodes), len(grandchildren))
+        for grandchild in grandchildren:
+            self.assertIs(root.store.get(grandchild.state, children[0]), grandchild)
+        self.assertIsNone(root.store.get(children[1].state, root))
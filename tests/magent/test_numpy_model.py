@@ -0,0 +1,132 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from magent.batch_mancala import BatchMancalaEnv
+from magent.mancala import MancalaEnv
+from magent.side import Side
+from models.a3c.numpy_model import NumpyACNetwork
+from models import evaluation_cache
+from models.network_client import NetworkClient, NumpyClient
+
+
+def _random_weights(seed: int) -> dict:
+    rng = np.random.RandomState(seed)
+    shapes = [('dense', 16, 20), ('dense_1', 20, 20), ('dense_2', 20, 10), ('dense_3', 10, 7), ('dense_4', 10, 1)]
+    weights = {}
+    for layer, inputs, units in shapes:
+        weights[layer + '/kernel'] = rng.normal(scale=0.5, size=(inputs, units)).astype(np.float32)
+        weights[layer + '/bias'] = rng.normal(scale=0.1, size=units).astype(np.float32)
+    return weights
+
+
+def _reference(weights: dict, state: np.ndarray, mask: np.ndarray) -> (np.ndarray, float):
+    """The forward pass of ACNetwork, written out in float64."""
+    layer_input = state.reshape(-1).astype(np.float64)
+    for layer in ('dense', 'dense_1', 'dense_2'):
+        layer_input = np.maximum(layer_input @ weights[layer + '/kernel'] + weights[layer + '/bias'], 0)
+    logits = layer_input @ weights['dense_3/kernel'] + weights['dense_3/bias']
+    logits = np.where(mask == 1, logits, -np.inf)
+    exp = np.exp(logits - logits.max())
+    value = layer_input @ weights['dense_4/kernel'] + weights['dense_4/bias']
+    return exp / exp.sum(), value[0]
+
+
+def _positions(count: int, seed: int) -> [MancalaEnv]:
+    rng = np.random.RandomState(seed)
+    states = []
+    state = MancalaEnv()
+    while len(states) < count:
+        if state.is_game_over():
+            state = MancalaEnv()
+        moves = [move for move in state.get_legal_moves() if move.index != 0]
+        if len(moves) == 0:
+            state.perform_move(state.get_legal_moves()[0])
+            continue
+        state.perform_move(moves[rng.randint(len(moves))])
+        if not state.is_game_over():
+            states.append(MancalaEnv.clone(state))
+    return states
+
+
+class TestNumpyACNetwork(unittest.TestCase):
+    def setUp(self):
+        self.weights = _random_weights(0)
+        self.network = NumpyACNetwork(self.weights)
+
+    def test_matches_the_forward_pass(self):
+        for state in _positions(20, 1):
+            image = state.board.get_board_image()
+            mask = state.get_action_mask_with_no_pie()
+            dist, _, value = self.network.evaluate_move(mask, image)
+            expected_dist, expected_value = _reference(self.weights, image, mask)
+            np.testing.assert_allclose(dist, expected_dist, atol=1e-5)
+            self.assertAlmostEqual(value[0][0], expected_value, places=4)
+            self.assertTrue(np.all(dist[mask == 0] == 0))
+
+    def test_batches_match_single_positions(self):
+        states = _positions(9, 2)
+        images = np.array([state.board.get_board_image() for state in states])
+        masks = np.array([state.get_action_mask_with_no_pie() for state in states])
+        dists, values = self.network.evaluate_moves(masks, images)
+        # The buffers of the batch are reused for the single positions
+        for image, mask, dist, value in zip(images, masks, dists, values):
+            single_dist, _, single_value = self.network.evaluate_move(mask, image)
+            np.testing.assert_allclose(dist, single_dist, atol=1e-6)
+            self.assertAlmostEqual(value, single_value[0][0], places=5)
+
+    def test_load(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'weights.npz')
+            np.savez(path, **self.weights)
+            loaded = NumpyACNetwork.load(path)
+        state = MancalaEnv()
+        image, mask = state.board.get_board_image(), state.get_action_mask_with_no_pie()
+        np.testing.assert_array_equal(loaded.evaluate_move(mask, image)[0], self.network.evaluate_move(mask, image)[0])
+
+    def test_missing_weights(self):
+        del self.weights['dense_4/bias']
+        with self.assertRaises(ValueError):
+            NumpyACNetwork(self.weights)
+
+
+class TestNumpyClient(unittest.TestCase):
+    def setUp(self):
+        self.weights = _random_weights(3)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'weights.npz')
+            np.savez(path, **self.weights)
+            self.client = NumpyClient(path)
+
+    def test_evaluates_from_the_side_to_move(self):
+        for state in _positions(20, 4):
+            dist, value = self.client.evaluate_state(state)
+            image = state.board.get_board_image(flipped=state.side_to_move == Side.NORTH)
+            expected_dist, expected_value = _reference(self.weights, image, state.get_action_mask_with_no_pie())
+            np.testing.assert_allclose(dist, expected_dist, atol=1e-5)
+            self.assertAlmostEqual(value, expected_value, places=4)
+
+    def test_evaluate_games_matches_evaluate_state(self):
+        states = _positions(6, 5)
+        batch = BatchMancalaEnv(len(states))
+        for game, state in enumerate(states):
+            batch.load(state, game)
+        games = np.array([0, 2, 3, 5])
+        dists, values = self.client.evaluate_games(batch, games)
+        for game, dist, value in zip(games, dists, values):
+            expected_dist, expected_value = self.client.evaluate_state(states[game])
+            np.testing.assert_allclose(dist, expected_dist)
+            self.assertAlmostEqual(value, expected_value)
+
+    def test_is_a_network_client(self):
+        self.assertIsInstance(self.client, NetworkClient)
+
+    def test_fingerprint_is_of_the_weights(self):
+        self.assertEqual(self.client.fingerprint, evaluation_cache.fingerprint(self.weights))
+        self.assertNotEqual(self.client.fingerprint, evaluation_cache.fingerprint(_random_weights(4)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,56 @@
+import os
+import tempfile
+import unittest
+from magent import opening_book
+from magent.mancala import MancalaEnv
+from magent.move import Move
+from magent.opening_book import OpeningBook
+from magent.opening_book_builder import extend, opening_lines
+from magent.side import Side
+
+
+class TestOpeningBook(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'opening.book')
+
+    def tearDown(self):
+        opening_book.unload()
+        self.directory.cleanup()
+
+    def test_opening_lines_cover_the_pie_decision(self):
+        lines = opening_lines(2)
+        self.assertEqual(len(lines), 8)
+        self.assertEqual(lines[0], [])
+        self.assertEqual(sorted(line[0] for line in lines[1:]), [Move.of(Side.SOUTH, hole).action
+                                                                 for hole in range(1, 8)])
+
+    def test_lookup_answers_book_positions(self):
+        extend(OpeningBook.empty(), plies=2, depth=1, processes=1).save(self.path)
+        self.assertTrue(opening_book.load(self.path))
+
+        state = MancalaEnv()
+        self.assertTrue(state.is_legal(opening_book.lookup(state)))
+        state.perform_move(Move(Side.SOUTH, 3))
+        move = opening_book.lookup(state)
+        self.assertEqual(move.side, Side.NORTH)
+        self.assertTrue(state.is_legal(move))
+
+        state.perform_move(move)
+        self.assertIsNone(opening_book.lookup(state))
+
+    def test_extend_keeps_deeper_entries(self):
+        book = extend(OpeningBook.empty(), plies=1, depth=2, processes=1)
+        book.save(self.path)
+        book = OpeningBook.open(self.path)
+        self.assertEqual(len(book), 1)
+
+        extended = extend(book, plies=2, depth=1, processes=1)
+        self.assertEqual(len(extended), 8)
+        position = extended.find(MancalaEnv().key)
+        self.assertEqual(extended.depths[position], 2)
+        self.assertEqual(extended.moves[position], book.moves[book.find(MancalaEnv().key)])
+
+    def test_missing_book(self):
+        self.assertFalse(opening_book.load(self.path))
+        self.assertIsNone(opening_book.lookup(MancalaEnv()))
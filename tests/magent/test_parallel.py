@@ -0,0 +1,47 @@
+import random
+import unittest
+from magent.mancala import MancalaEnv
+from magent.treesearch.alphabeta.alphabeta import AlphaBeta
+from magent.treesearch.alphabeta.parallel import ParallelAlphaBeta
+from tests.magent.test_alphabeta import _random_position
+
+
+class TestParallelAlphaBeta(unittest.TestCase):
+
+    def setUp(self):
+        self.search = ParallelAlphaBeta(depth=4, tt_memory_mb=0, workers=2)
+
+    def tearDown(self):
+        self.search.close()
+
+    def test_matches_alphabeta(self):
+        rng = random.Random(10)
+        for _ in range(6):
+            state = _random_position(rng, rng.randint(0, 30))
+            if state.is_game_over():
+                continue
+            self.assertEqual(self.search.evaluate(state), AlphaBeta(depth=4, tt_memory_mb=0).evaluate(state))
+
+    def test_search_leaves_state_unchanged(self):
+        state = _random_position(random.Random(11), 6)
+        before = MancalaEnv.clone(state)
+        move = self.search.search(state)
+
+        self.assertTrue(state.is_legal(move))
+        self.assertEqual(self.search.completed_depth, 4)
+        self.assertEqual(state, before)
+
+    def test_time_budget(self):
+        search = ParallelAlphaBeta(depth=40, time_sec=0.5, workers=2)
+        try:
+            state = MancalaEnv()
+            move = search.search(state)
+        finally:
+            search.close()
+
+        self.assertTrue(state.is_legal(move))
+        self.assertGreaterEqual(search.completed_depth, 1)
+        self.assertLess(search.completed_depth, 40)
+
+    def test_needs_a_worker(self):
+        self.assertRaises(ValueError, ParallelAlphaBeta, 4, workers=0)
@@ -0,0 +1,51 @@
+import random
+import unittest
+
+from magent.mancala import MancalaEnv
+from magent.side import Side
+from magent.treesearch import evaluation
+from magent.treesearch.mcts.playout import PlayoutEngine
+from tests.magent.test_alphabeta import _random_position
+
+
+class TestPlayoutEngine(unittest.TestCase):
+
+    def test_sowing_scores_match_get_score(self):
+        engine = PlayoutEngine()
+        rng = random.Random(0)
+        for _ in range(200):
+            state = _random_position(rng, rng.randint(0, 60))
+            side = state.side_to_move
+            for move in state.get_legal_moves():
+                if move.index == 0:
+                    continue
+                score = engine._score_sowing(state, side, move.index)
+                record = state.apply_move(move)
+                self.assertEqual(score, evaluation.get_score(state, side))
+                state.undo_move(record)
+
+    def test_pie_move_score_matches_get_score(self):
+        state = MancalaEnv()
+        state.perform_move(state.get_legal_moves()[0])
+        pie = state.get_legal_moves()[0]
+        self.assertEqual(pie.index, 0)
+        side = state.side_to_move
+        state.perform_move(pie)
+        board = state.board
+        self.assertEqual(PlayoutEngine._score(board.pits, board.offset(side), side != state.our_side),
+                         evaluation.get_score(state, side))
+
+    def test_play_ends_the_game_in_place(self):
+        engine = PlayoutEngine(rng=random.Random(1))
+        for _ in range(20):
+            state = MancalaEnv()
+            final_state = engine.play(state)
+            self.assertIs(final_state, state)
+            self.assertTrue(final_state.is_game_over())
+            self.assertEqual(final_state.board.get_seeds_in_store(Side.NORTH) +
+                             final_state.board.get_seeds_in_store(Side.SOUTH), 98)
+
+    def test_play_is_deterministic_with_a_seeded_rng(self):
+        first = PlayoutEngine(rng=random.Random(7)).play(MancalaEnv())
+        second = PlayoutEngine(rng=random.Random(7)).play(MancalaEnv())
+        self.assertEqual(first.board.pits, second.board.pits)
@@ -0,0 +1,54 @@
+import random
+import unittest
+from magent.mancala import MancalaEnv
+from magent.treesearch.alphabeta.pvs import PrincipalVariationSearch, MTDF
+from tests.magent.test_alphabeta import _minimax, _random_position
+
+
+class TestPrincipalVariationSearch(unittest.TestCase):
+
+    def test_values_match_minimax(self):
+        rng = random.Random(5)
+        for _ in range(12):
+            state = _random_position(rng, rng.randint(0, 30))
+            if state.is_game_over():
+                continue
+            expected = _minimax(MancalaEnv.clone(state), 3)
+            self.assertEqual(PrincipalVariationSearch(depth=3, tt_memory_mb=0).evaluate(state)[1], expected)
+            self.assertEqual(MTDF(depth=3).evaluate(state)[1], expected)
+
+    def test_quiescence_values_match_minimax(self):
+        rng = random.Random(9)
+        for _ in range(8):
+            state = _random_position(rng, rng.randint(0, 30))
+            if state.is_game_over():
+                continue
+            expected = _minimax(MancalaEnv.clone(state), 2, quiescence=True)
+            search = PrincipalVariationSearch(depth=2, tt_memory_mb=0, quiescence=True)
+            self.assertEqual(search.evaluate(state)[1], expected)
+            self.assertEqual(MTDF(depth=2, quiescence=True).evaluate(state)[1], expected)
+
+    def test_search_leaves_state_unchanged(self):
+        state = _random_position(random.Random(6), 7)
+        before = MancalaEnv.clone(state)
+        for search in [PrincipalVariationSearch(depth=5), MTDF(depth=5)]:
+            move = search.search(state)
+            self.assertTrue(state.is_legal(move))
+            self.assertEqual(search.completed_depth, 5)
+            self.assertEqual(state, before)
+
+    def test_mtdf_reuses_its_bounds(self):
+        state = _random_position(random.Random(7), 5)
+        search = MTDF(depth=4)
+        search.search(state)
+        nodes = search.nodes
+        self.assertGreater(len(search.bounds.entries), 0)
+
+        search.search(state)
+        self.assertLess(search.nodes, nodes)
+
+    def test_time_budget(self):
+        for search in [PrincipalVariationSearch(depth=40, time_sec=0.2), MTDF(depth=40, time_sec=0.2)]:
+            move = search.search(MancalaEnv())
+            self.assertTrue(MancalaEnv().is_legal(move))
+            self.assertGreaterEqual(search.completed_depth, 1)
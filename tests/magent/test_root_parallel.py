@@ -0,0 +1,75 @@
+import time
+import unittest
+from unittest import mock
+
+from magent.mancala import MancalaEnv
+from magent.move import Move
+from magent.side import Side
+from magent.treesearch.mcts import root_parallel
+from magent.treesearch.mcts.root_parallel import RootParallelMCTS
+
+
+class TestRootParallelMCTS(unittest.TestCase):
+
+    def setUp(self):
+        self.search = RootParallelMCTS(time_sec=0.5, workers=2, seed=0)
+
+    def tearDown(self):
+        self.search.close()
+
+    def test_search_generates_legal_move_and_keeps_state(self):
+        state = MancalaEnv()
+        state.perform_move(Move.of(Side.SOUTH, 3))
+        before = MancalaEnv.clone(state)
+        move = self.search.search(state)
+
+        self.assertTrue(state.is_legal(move))
+        self.assertEqual(state, before)
+        root = self.search.root
+        self.assertGreater(root.visits, 0)
+        self.assertEqual(len(root.children), len(state.get_legal_moves()))
+        self.assertEqual(move, root.move_to(max(root.children, key=lambda child: child.visits)))
+
+    def test_workers_are_kept_between_searches(self):
+        state = MancalaEnv()
+        self.search.search(state)
+        pids = [process.pid for process in self.search._processes]
+        self.assertEqual(len(pids), 2)
+        state.perform_move(Move.of(Side.SOUTH, 1))
+        self.search.search(state)
+        self.assertEqual([process.pid for process in self.search._processes], pids)
+
+    def test_no_time_left_still_gives_a_legal_move(self):
+        state = MancalaEnv()
+        search = RootParallelMCTS(time_sec=0, workers=2, seed=0)
+        try:
+            move = search.search(state)
+        finally:
+            search.close()
+        self.assertTrue(state.is_legal(move))
+
+    def test_worker_returns_nothing_after_the_deadline(self):
+        root_parallel._start_worker(1)
+        state = MancalaEnv()
+        task = (bytes(state.board.pits), state.side_to_move, state.north_moved, state.our_side, time.time() - 1, 0)
+        self.assertEqual(root_parallel._search(task), [])
+
+    def test_worker_returns_nothing_before_the_root_is_expanded(self):
+        root_parallel._start_worker(1)
+        state = MancalaEnv()
+        task = (bytes(state.board.pits), state.side_to_move, state.north_moved, state.our_side, 100.0, 0)
+        # Less than a microsecond is left, too little for a single simulation
+        with mock.patch.object(root_parallel, 'time') as clock:
+            clock.time.return_value = 100.0 - 1e-7
+            self.assertEqual(root_parallel._search(task), [])
+
+    def test_close_tolerates_a_dead_worker(self):
+        self.search._start_workers()
+        process = self.search._processes[0]
+        process.terminate()
+        process.join()
+        self.search.close()
+        self.assertEqual(self.search._processes, [])
+
+    def test_needs_a_worker(self):
+        self.assertRaises(ValueError, RootParallelMCTS, 1, workers=0)
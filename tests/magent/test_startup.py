@@ -0,0 +1,33 @@
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Imports the agent and builds its searches, then fails if TensorFlow was imported on the way
+_SCRIPT = '''
+import sys
+import magent.main
+from magent.treesearch.factory import TreesFactory
+TreesFactory.standard_mcts()
+TreesFactory.arena_mcts()
+magent.main.prewarm()
+assert 'tensorflow' not in sys.modules, 'TensorFlow was imported'
+'''
+
+
+class TestStartup(unittest.TestCase):
+    def test_agent_does_not_import_tensorflow(self):
+        with tempfile.TemporaryDirectory() as directory:
+            # magent.main logs to the logs directory of the working directory
+            os.makedirs(os.path.join(directory, 'logs'))
+            environment = dict(os.environ, PYTHONPATH=_ROOT)
+            result = subprocess.run([sys.executable, '-c', _SCRIPT], cwd=directory, env=environment,
+                                    stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True)
+        self.assertEqual(result.returncode, 0, result.stderr)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+import os
+import random
+import tempfile
+import unittest
+from magent import tablebase
+from magent.mancala import MancalaEnv
+from magent.side import Side
+from magent.tablebase import Tablebase
+from magent.tablebase_builder import build, unrank
+
+
+def _final_reward_with_perfect_play(state: MancalaEnv) -> int:
+    """Plain minimax over the whole game tree: the final reward of the side to move."""
+    if state.is_game_over():
+        return state.compute_final_reward(state.side_to_move)
+    side = state.side_to_move
+    best = None
+    for move in state.get_legal_moves():
+        record = state.apply_move(move)
+        reward = _final_reward_with_perfect_play(state)
+        if state.side_to_move != side and not state.is_game_over():
+            reward = -reward
+        elif state.is_game_over():
+            reward = state.compute_final_reward(side)
+        state.undo_move(record)
+        if best is None or reward > best:
+            best = reward
+    return best
+
+
+class TestTablebase(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = tempfile.TemporaryDirectory()
+        cls.path = os.path.join(cls.directory.name, 'endgame.tb')
+        build(cls.path, holes=7, max_seeds=4, processes=1)
+        cls.tablebase = Tablebase.open(cls.path)
+
+    @classmethod
+    def tearDownClass(cls):
+        tablebase.unload()
+        cls.tablebase.values.release()
+        cls.directory.cleanup()
+
+    def setUp(self):
+        tablebase.load(self.path)
+
+    def _random_endgame(self, rng: random.Random, seeds: int) -> MancalaEnv:
+        state = MancalaEnv()
+        board = state.board
+        for hole in range(1, board.holes + 1):
+            board.set_seeds(Side.SOUTH, hole, 0)
+            board.set_seeds(Side.NORTH, hole, 0)
+        # Put at least one seed on each side, otherwise the game would already be over
+        for seed in range(seeds):
+            side = [Side.NORTH, Side.SOUTH][seed] if seed < 2 else rng.choice([Side.NORTH, Side.SOUTH])
+            board.add_seeds(side, rng.randint(1, board.holes), 1)
+        board.set_seeds_in_store(Side.NORTH, rng.randint(0, 40))
+        board.set_seeds_in_store(Side.SOUTH, rng.randint(0, 40))
+        state.side_to_move = rng.choice([Side.NORTH, Side.SOUTH])
+        state.north_moved = True
+        return state
+
+    def test_index_and_unrank_are_inverse(self):
+        for seeds in range(5):
+            offset = self.tablebase.offset(seeds)
+            for rank in range(self.tablebase.offset(seeds + 1) - offset):
+                parts = unrank(self.tablebase, seeds, rank)
+                self.assertEqual(sum(parts), seeds)
+                self.assertEqual(self.tablebase.index(parts, seeds), offset + rank)
+
+    def test_probe_matches_minimax(self):
+        rng = random.Random(11)
+        for _ in range(300):
+            state = self._random_endgame(rng, rng.randint(2, 4))
+            self.assertEqual(state.probe_tablebase(), _final_reward_with_perfect_play(state))
+
+    def test_probe_misses_positions_with_too_many_seeds(self):
+        state = self._random_endgame(random.Random(1), 5)
+        self.assertIsNone(state.probe_tablebase())
+        self.assertIsNone(MancalaEnv().probe_tablebase())
+
+        tablebase.unload()
+        self.assertIsNone(self._random_endgame(random.Random(1), 2).probe_tablebase())
+
+    def test_finish_game_ends_with_the_probed_reward(self):
+        state = self._random_endgame(random.Random(4), 4)
+        side = state.side_to_move
+        reward = state.probe_tablebase()
+        state.finish_game(reward)
+
+        self.assertTrue(state.is_game_over())
+        self.assertEqual(state.compute_final_reward(side), reward)
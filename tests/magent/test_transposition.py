@@ -0,0 +1,48 @@
+import unittest
+from magent.treesearch.alphabeta.transposition import TranspositionTable, EXACT, LOWER, UPPER
+
+
+class TestTranspositionTable(unittest.TestCase):
+    def setUp(self):
+        self.table = TranspositionTable(memory_mb=0.01)
+        # Keys that differ only above the bucket mask share a bucket
+        self.buckets = self.table.size // 2
+
+    def test_size_respects_memory_cap(self):
+        self.assertLessEqual(self.table.size * 19, 0.01 * 2 ** 20)
+        self.assertGreater(self.table.size, 0)
+
+    def test_store_and_probe(self):
+        self.assertEqual(self.table.probe(12345), -1)
+        self.table.store(12345, 4, 2.5, LOWER, 3)
+        entry = self.table.probe(12345)
+
+        self.assertGreaterEqual(entry, 0)
+        self.assertEqual(self.table.depths[entry], 4)
+        self.assertEqual(self.table.scores[entry], 2.5)
+        self.assertEqual(self.table.bounds[entry], LOWER)
+        self.assertEqual(self.table.moves[entry], 3)
+        self.assertEqual(self.table.hit_rate(), 0.5)
+
+    def test_deeper_entry_is_kept_and_shallower_one_goes_to_always_replace(self):
+        deep, shallow, other = 7, 7 + self.buckets, 7 + 2 * self.buckets
+        self.table.store(deep, 6, 1.0, EXACT, 1)
+        self.table.store(shallow, 2, 2.0, UPPER, 2)
+        self.assertEqual(self.table.scores[self.table.probe(deep)], 1.0)
+        self.assertEqual(self.table.scores[self.table.probe(shallow)], 2.0)
+
+        # Another shallow result replaces the always-replace entry only
+        self.table.store(other, 1, 3.0, EXACT, 3)
+        self.assertEqual(self.table.probe(shallow), -1)
+        self.assertGreaterEqual(self.table.probe(deep), 0)
+
+        # A deeper result takes the depth-preferred entry and moves the old one to the other entry
+        self.table.store(shallow, 9, 4.0, EXACT, 4)
+        self.assertEqual(self.table.scores[self.table.probe(shallow)], 4.0)
+        self.assertEqual(self.table.scores[self.table.probe(deep)], 1.0)
+        self.assertEqual(self.table.probe(other), -1)
+
+    def test_clear(self):
+        self.table.store(99, 3, 1.0, EXACT, 1)
+        self.table.clear()
+        self.assertEqual(self.table.probe(99), -1)
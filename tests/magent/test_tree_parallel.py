@@ -0,0 +1,94 @@
+import time
+import unittest
+
+import numpy as np
+
+from magent.board import Board
+from magent.mancala import MancalaEnv
+from magent.side import Side
+from magent.treesearch.mcts.graph.node import AlphaNode
+from magent.treesearch.mcts.tree_parallel import TreeParallelMCTS
+
+
+class _UniformNetwork(object):
+    """Stands in for NetworkClient: every legal move is equally likely. Keeps the sizes of the batches it is given."""
+
+    def __init__(self):
+        self.batch_sizes = []
+
+    def _evaluate(self, masks: np.ndarray) -> (np.ndarray, np.ndarray):
+        self.batch_sizes.append(len(masks))
+        masks = np.asarray(masks, dtype=np.float64)
+        return masks / masks.sum(axis=1, keepdims=True), np.zeros(len(masks))
+
+    def evaluate_games(self, batch, games: np.ndarray) -> (np.ndarray, np.ndarray):
+        return self._evaluate(batch.get_action_mask_with_no_pie()[games])
+
+
+class TestTreeParallelMCTS(unittest.TestCase):
+
+    def test_search_generates_legal_move_and_keeps_state(self):
+        state = MancalaEnv()
+        before = MancalaEnv.clone(state)
+        network = _UniformNetwork()
+        mcts = TreeParallelMCTS(network, time_sec=0.5, batch_size=8, rng=np.random.RandomState(0))
+        move = mcts.search(state)
+
+        self.assertTrue(state.is_legal(move))
+        self.assertEqual(state, before)
+        root = mcts.root
+        self.assertEqual(root.visits, mcts.leaves)
+        self.assertEqual(sum(child.visits for child in root.children), mcts.leaves)
+        self.assertEqual(sorted(network.batch_sizes), sorted(mcts.batch_sizes.elements()))
+
+    def test_search_ends_when_every_leaf_is_terminal(self):
+        # Every move of SOUTH ends the game or leaves NORTH a move that ends it, so the selectors soon reach only
+        # terminal leaves, which are backpropagated at once without a run of the network
+        state = MancalaEnv()
+        board = Board(7, 0)
+        board.set_seeds(Side.SOUTH, 1, 1)
+        board.set_seeds(Side.SOUTH, 3, 1)
+        board.set_seeds(Side.NORTH, 7, 1)
+        board.set_seeds_in_store(Side.SOUTH, 48)
+        board.set_seeds_in_store(Side.NORTH, 47)
+        state.board = board
+        state.side_to_move = Side.SOUTH
+        state.north_moved = True
+
+        mcts = TreeParallelMCTS(_UniformNetwork(), time_sec=0.5, batch_size=4, rng=np.random.RandomState(0))
+        start = time.perf_counter()
+        move = mcts.search(state)
+        self.assertLess(time.perf_counter() - start, 2)
+        self.assertTrue(state.is_legal(move))
+
+    def test_network_runs_on_batches(self):
+        network = _UniformNetwork()
+        mcts = TreeParallelMCTS(network, time_sec=0.5, batch_size=8, rng=np.random.RandomState(0))
+        mcts.search(MancalaEnv())
+        # Only the root is expanded on its own; after that every slot is always busy
+        self.assertEqual(network.batch_sizes[0], 1)
+        self.assertGreater(len(network.batch_sizes), 10)
+        self.assertTrue(all(size == 8 for size in network.batch_sizes[1:]))
+
+    def test_virtual_losses_are_taken_back(self):
+        mcts = TreeParallelMCTS(_UniformNetwork(), time_sec=0.3, batch_size=8, rng=np.random.RandomState(1))
+        mcts.search(MancalaEnv())
+        frontier = [mcts.root]
+        while frontier:
+            node = frontier.pop()
+            self.assertEqual(node.virtual_losses, 0)
+            frontier.extend(node.children)
+
+    def test_virtual_loss_lowers_action_value(self):
+        parent = AlphaNode(state=MancalaEnv(), prior=1.0)
+        parent.visits = 10
+        child = AlphaNode(state=MancalaEnv(), prior=0.5, parent=parent)
+        child.update(1.0)
+        value = child.calculate_action_value()
+        child.virtual_losses = 1
+        self.assertLess(child.calculate_action_value(), value)
+        child.virtual_losses = 0
+        self.assertEqual(child.calculate_action_value(), value)
+
+    def test_batch_size_must_be_positive(self):
+        self.assertRaises(ValueError, TreeParallelMCTS, _UniformNetwork(), 1, 0)